@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Iterator
+from uuid import uuid4
+
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+from common.resources import ResourceRegistry
+from core.conversation import auto_title, serialize_sources
+from core.jobs import GenerationJob
+from ui.resources import RESOURCES, register_offline_resources
+
+# Run from the project root: `python -m api.server [--offline] [--workers N]`.
+#
+# Worker processes import create_app themselves, so options reach them through
+# the environment rather than arguments.
+OFFLINE_ENV = "LEGAL_API_OFFLINE"
+TOKEN_LATENCY_ENV = "LEGAL_API_TOKEN_LATENCY"
+
+
+class InvokeRequest(BaseModel):
+    query: str
+    act: str = "All"
+    chat_history: str | None = None
+
+
+class ThreadCreate(BaseModel):
+    title: str = "New Chat"
+    scope_act: str = "All"
+
+
+class TurnRequest(BaseModel):
+    query: str
+
+
+def sse(event: str, data: Any, event_id: int | None = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _chain_events(chain, request: InvokeRequest) -> Iterator[str]:
+    started = time.perf_counter()
+    first_token = None
+    try:
+        for event in chain.stream(request.model_dump()):
+            if event["type"] == "token":
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                yield sse("token", {"content": event["content"]})
+            elif event["type"] == "done":
+                yield sse(
+                    "done",
+                    {
+                        "content": event["content"],
+                        "sources": serialize_sources(event["sources"]),
+                        "timings": {
+                            "first_token_seconds": first_token,
+                            "total_seconds": time.perf_counter() - started,
+                        },
+                    },
+                )
+    except Exception as exc:
+        yield sse("error", {"detail": f"{type(exc).__name__}: {exc}"})
+
+
+def _structured_events(chain, request: InvokeRequest) -> Iterator[str]:
+    try:
+        for event in chain.stream_structured(request.model_dump()):
+            if event["type"] == "done":
+                yield sse(
+                    "done",
+                    {
+                        "answer": event["answer"].model_dump(),
+                        "recovered": event["recovered"],
+                        "sources": serialize_sources(event["sources"]),
+                        "timings": event["timings"],
+                    },
+                )
+            else:
+                yield sse(event["type"], {"content": event["content"]})
+    except Exception as exc:
+        yield sse("error", {"detail": f"{type(exc).__name__}: {exc}"})
+
+
+def _job_events(job: GenerationJob, since: int) -> Iterator[str]:
+    # Event ids are buffer sequence numbers, so a client that drops can
+    # reattach with Last-Event-ID (or ?since=) and miss nothing still buffered.
+    _, _, gap = job.buffer.read(since)
+    if gap:
+        text, since = job.checkpoint()
+        yield sse("resync", {"content": text}, event_id=since)
+    seq = since
+    for chunk in job.stream(since):
+        seq += 1
+        yield sse("token", {"content": chunk}, event_id=seq)
+    job.wait()
+    if job.status == "failed":
+        yield sse("error", {"detail": job.error})
+    else:
+        yield sse("done", job.snapshot())
+
+
+def _streaming(events: Iterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        iterate_in_threadpool(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def create_app(registry: ResourceRegistry = RESOURCES) -> FastAPI:
+    """The HTTP API over the same registry-built chain, chat store and job pool as the UI.
+
+    Generation jobs live in the worker process that started them; with
+    several workers, reattaching to a job needs sticky routing by thread.
+    """
+    if os.environ.get(OFFLINE_ENV) == "1":
+        register_offline_resources(
+            registry,
+            token_latency=float(os.environ.get(TOKEN_LATENCY_ENV, "0")),
+        )
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        # Build before accepting traffic so the first request doesn't pay for it.
+        await run_in_threadpool(registry.get, "conversation")
+        yield
+        registry.close()
+
+    app = FastAPI(title="Indian Legal Advisor API", lifespan=lifespan)
+
+    def owned_thread(user_id: str, thread_id: str) -> dict[str, Any]:
+        thread = registry.get("chat_store").get_thread(user_id=user_id, thread_id=thread_id)
+        if thread is None:
+            raise HTTPException(status_code=404, detail="Thread not found")
+        return thread
+
+    @app.get("/health")
+    def health() -> dict[str, Any]:
+        return {"status": "ok", "active_jobs": len(registry.get("jobs").active())}
+
+    @app.post("/invoke")
+    def invoke(request: InvokeRequest) -> dict[str, Any]:
+        started = time.perf_counter()
+        result = registry.get("chain").invoke(request.model_dump())
+        return {
+            "answer": result["answer"].model_dump(),
+            "sources": serialize_sources(result["sources"]),
+            "recovered": result["recovered"],
+            "timings": {**result["timings"], "total_seconds": time.perf_counter() - started},
+        }
+
+    @app.post("/invoke/stream")
+    def invoke_stream(request: InvokeRequest) -> StreamingResponse:
+        """The structured answer over SSE: "answer" deltas, "citation" events, then "done"."""
+        return _streaming(_structured_events(registry.get("chain"), request))
+
+    @app.post("/stream")
+    def stream(request: InvokeRequest) -> StreamingResponse:
+        return _streaming(_chain_events(registry.get("chain"), request))
+
+    @app.get("/threads")
+    def list_threads(
+        x_user_id: str = Header(...),
+        search: str = "",
+    ) -> list[dict[str, Any]]:
+        store = registry.get("chat_store")
+        if search.strip():
+            return store.search_threads(user_id=x_user_id, text=search)
+        return store.list_threads(user_id=x_user_id)
+
+    @app.post("/threads", status_code=201)
+    def create_thread(body: ThreadCreate, x_user_id: str = Header(...)) -> dict[str, Any]:
+        return registry.get("chat_store").create_thread(
+            user_id=x_user_id,
+            thread_id=str(uuid4()),
+            title=body.title,
+            scope_act=body.scope_act,
+        )
+
+    @app.get("/threads/{thread_id}")
+    def get_thread(thread_id: str, x_user_id: str = Header(...)) -> dict[str, Any]:
+        thread = owned_thread(x_user_id, thread_id)
+        job = registry.get("jobs").get(thread_id)
+        return {**thread, "job": job.snapshot() if job else None}
+
+    @app.delete("/threads/{thread_id}", status_code=204)
+    def delete_thread(thread_id: str, x_user_id: str = Header(...)) -> None:
+        owned_thread(x_user_id, thread_id)
+        registry.get("chat_store").delete_thread(user_id=x_user_id, thread_id=thread_id)
+
+    @app.get("/threads/{thread_id}/messages")
+    def get_messages(
+        thread_id: str,
+        x_user_id: str = Header(...),
+        limit: int = Query(20, ge=1, le=200),
+        before_id: int | None = None,
+        with_sources: bool = False,
+    ) -> list[dict[str, Any]]:
+        owned_thread(x_user_id, thread_id)
+        store = registry.get("chat_store")
+        messages = store.get_recent_messages(thread_id, limit=limit, before_id=before_id)
+        if with_sources:
+            sources = store.get_message_sources([m["message_id"] for m in messages if m["source_count"]])
+            for message in messages:
+                message["sources"] = sources.get(message["message_id"], [])
+        return messages
+
+    @app.post("/threads/{thread_id}/messages")
+    def post_message(
+        thread_id: str,
+        body: TurnRequest,
+        x_user_id: str = Header(...),
+    ) -> StreamingResponse:
+        """Start a turn on the job pool and stream it; the turn is saved even if the client goes away."""
+        thread = owned_thread(x_user_id, thread_id)
+        conversation = registry.get("conversation")
+        title = auto_title(body.query) if thread["title"] == "New Chat" else None
+        try:
+            job = registry.get("jobs").submit(
+                thread_id,
+                body.query,
+                lambda: conversation.stream_turn(
+                    thread_id,
+                    body.query,
+                    act=thread.get("scope_act") or "All",
+                    title=title,
+                ),
+            )
+        except RuntimeError as exc:
+            raise HTTPException(status_code=409, detail=str(exc)) from exc
+        return _streaming(_job_events(job, 0))
+
+    @app.get("/threads/{thread_id}/job")
+    def attach_job(
+        thread_id: str,
+        x_user_id: str = Header(...),
+        since: int = 0,
+        last_event_id: int | None = Header(None),
+    ) -> StreamingResponse:
+        owned_thread(x_user_id, thread_id)
+        job = registry.get("jobs").get(thread_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="No generation for this thread")
+        return _streaming(_job_events(job, last_event_id if last_event_id is not None else since))
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the legal advisor chain over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--keep-alive", type=int, default=30, help="Idle keep-alive timeout in seconds.")
+    parser.add_argument("--offline", action="store_true", help="Use the local LLM and vector store stand-ins.")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Offline only: delay per streamed token.")
+    args = parser.parse_args()
+
+    if args.offline:
+        os.environ[OFFLINE_ENV] = "1"
+        os.environ[TOKEN_LATENCY_ENV] = str(args.token_latency)
+    uvicorn.run(
+        "api.server:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_keep_alive=args.keep_alive,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,70 @@
-import boto3
-from common.config import REGION
-from langchain_aws import BedrockEmbeddings
-from requests_aws4auth import AWS4Auth
-
-session = boto3.Session(profile_name="sandbox")
-
-bedrock_client = session.client(
-    service_name="bedrock-runtime",
-    region_name=REGION
-)
-
-embedding_function = BedrockEmbeddings(
-    client=bedrock_client,
-    model_id="amazon.titan-embed-text-v2:0"
-)
-
-credentials = session.get_credentials()
-awsauth = AWS4Auth(
-    credentials.access_key,
-    credentials.secret_key,
-    REGION,
-    "aoss",
-    session_token=credentials.token
-)
+# boto3, langchain_aws and requests_aws4auth are imported inside the factories,
+# so importing this module is cheap and needs no credentials. The old
+# module-level names (session, bedrock_client, embedding_function, awsauth)
+# resolve lazily through __getattr__.
+from functools import lru_cache
+
+from common.config import AWS_PROFILE, EMBEDDING_DIMENSION, REGION
+
+EMBEDDING_MODEL_ID = "amazon.titan-embed-text-v2:0"
+TITAN_V2_DIMENSIONS = (256, 512, 1024)
+
+
+@lru_cache(maxsize=None)
+def get_session():
+    import boto3
+
+    return boto3.Session(profile_name=AWS_PROFILE or None)
+
+
+@lru_cache(maxsize=None)
+def get_bedrock_client():
+    return get_session().client(
+        service_name="bedrock-runtime",
+        region_name=REGION
+    )
+
+
+def build_embedding_function(dimensions: int = EMBEDDING_DIMENSION):
+    if dimensions not in TITAN_V2_DIMENSIONS:
+        raise ValueError(f"Titan v2 supports {TITAN_V2_DIMENSIONS} dimensions, got {dimensions}")
+    from langchain_aws import BedrockEmbeddings
+
+    return BedrockEmbeddings(
+        client=get_bedrock_client(),
+        model_id=EMBEDDING_MODEL_ID,
+        model_kwargs={"dimensions": dimensions, "normalize": True},
+    )
+
+
+@lru_cache(maxsize=None)
+def get_embedding_function():
+    return build_embedding_function()
+
+
+@lru_cache(maxsize=None)
+def get_awsauth():
+    from requests_aws4auth import AWS4Auth
+
+    credentials = get_session().get_credentials()
+    return AWS4Auth(
+        credentials.access_key,
+        credentials.secret_key,
+        REGION,
+        "aoss",
+        session_token=credentials.token
+    )
+
+
+_LAZY = {
+    "session": get_session,
+    "bedrock_client": get_bedrock_client,
+    "embedding_function": get_embedding_function,
+    "awsauth": get_awsauth,
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        return _LAZY[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import sqlite3
+import statistics
+import time
+from typing import Any
+
+from common.chat_store import ChatStore
+
+
+@dataclass
+class RetentionPolicy:
+    """What the maintenance job is allowed to do to a chat database.
+
+    `None` disables a step. Ages are in days and measured from the thread's
+    last update (archiving) or from when it was archived (purging).
+    """
+
+    archive_after_days: int | None = 90
+    purge_archive_after_days: int | None = None
+    include_pinned: bool = False
+    compress_min_bytes: int | None = 1024
+    vacuum_pages: int | None = None  # None frees every free page
+    analyze: bool = True
+
+
+@dataclass
+class MaintenanceReport:
+    archived_threads: int = 0
+    purged_threads: int = 0
+    compressed_chunks: int = 0
+    compressed_bytes_saved: int = 0
+    converted_to_incremental: bool = False
+    file_bytes_before: int = 0
+    file_bytes_after: int = 0
+    free_pages_before: int = 0
+    free_pages_after: int = 0
+    latency_ms_before: dict[str, float] = field(default_factory=dict)
+    latency_ms_after: dict[str, float] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        return self.file_bytes_before - self.file_bytes_after
+
+    def summary(self) -> str:
+        lines = [
+            f"archived {self.archived_threads} threads, purged {self.purged_threads} archived threads",
+            f"compressed {self.compressed_chunks} source chunks, saving {self.compressed_bytes_saved:,} bytes",
+            f"file size {self.file_bytes_before:,} -> {self.file_bytes_after:,} bytes "
+            f"(reclaimed {self.reclaimed_bytes:,}; free pages {self.free_pages_before} -> {self.free_pages_after})",
+        ]
+        if self.converted_to_incremental:
+            lines.append("converted database to auto_vacuum=INCREMENTAL (one full VACUUM)")
+        for name, before in self.latency_ms_before.items():
+            after = self.latency_ms_after.get(name, before)
+            lines.append(f"{name:<16} {before:>8.2f} ms -> {after:>8.2f} ms")
+        lines.append(f"took {self.seconds:.1f}s")
+        return "\n".join(lines)
+
+
+def _file_bytes(db_path: Path) -> int:
+    total = 0
+    for suffix in ("", "-wal", "-shm"):
+        path = Path(f"{db_path}{suffix}")
+        if path.exists():
+            total += path.stat().st_size
+    return total
+
+
+def _pragma(conn: sqlite3.Connection, name: str) -> int:
+    return int(conn.execute(f"PRAGMA {name}").fetchone()[0])
+
+
+def _median_ms(fn, repeats: int = 5) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def sample_threads(
+    store: ChatStore,
+    sample: int = 10,
+    *,
+    archive_cutoff: str | None = None,
+    include_pinned: bool = False,
+) -> list[tuple[str, str, str]]:
+    """(thread_id, user_id, title) of the busiest threads an archive pass at `archive_cutoff` keeps."""
+    query = """
+        SELECT t.thread_id, t.user_id, t.title
+        FROM threads AS t
+        JOIN messages AS m ON m.thread_id = t.thread_id
+    """
+    params: list[Any] = []
+    if archive_cutoff is not None:
+        query += " WHERE t.updated_at >= ?" + ("" if include_pinned else " OR t.pinned = 1")
+        params.append(archive_cutoff)
+    query += " GROUP BY t.thread_id ORDER BY COUNT(*) DESC LIMIT ?"
+    params.append(sample)
+    with sqlite3.connect(store.db_path) as conn:
+        return [tuple(row) for row in conn.execute(query, params).fetchall()]
+
+
+def probe_latency(store: ChatStore, threads: list[tuple[str, str, str]]) -> dict[str, float]:
+    """Median latency of the queries a UI rerun makes, over `threads` (see `sample_threads`)."""
+    if not threads:
+        return {}
+
+    def each(fn) -> float:
+        return statistics.median(_median_ms(lambda: fn(*thread)) for thread in threads)
+
+    return {
+        "list_threads": each(lambda thread_id, user_id, title: store.list_threads(user_id)),
+        "recent_messages": each(
+            lambda thread_id, user_id, title: store.get_recent_messages(thread_id, limit=20)
+        ),
+        "message_sources": each(
+            lambda thread_id, user_id, title: store.get_message_sources(
+                [message["message_id"] for message in store.get_recent_messages(thread_id, limit=20)]
+            )
+        ),
+        "search_threads": each(
+            lambda thread_id, user_id, title: store.search_threads(user_id, title.split()[0] if title else "")
+        ),
+    }
+
+
+def _compact(db_path: Path, policy: RetentionPolicy, report: MaintenanceReport) -> None:
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    try:
+        report.free_pages_before = _pragma(conn, "freelist_count")
+        # auto_vacuum can only be switched on an existing file by a full VACUUM;
+        # after that, freed pages are returned with cheap incremental passes.
+        if _pragma(conn, "auto_vacuum") != 2:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            report.converted_to_incremental = True
+        elif policy.vacuum_pages is None:
+            conn.execute("PRAGMA incremental_vacuum")
+        else:
+            conn.execute(f"PRAGMA incremental_vacuum({int(policy.vacuum_pages)})")
+
+        conn.execute("INSERT INTO messages_fts(messages_fts) VALUES ('optimize')")
+        conn.execute("INSERT INTO threads_fts(threads_fts) VALUES ('optimize')")
+        if policy.analyze:
+            conn.execute("ANALYZE")
+            conn.execute("PRAGMA optimize")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        report.free_pages_after = _pragma(conn, "freelist_count")
+    finally:
+        conn.close()
+
+
+def run_maintenance(
+    store: ChatStore,
+    policy: RetentionPolicy | None = None,
+    *,
+    now: datetime | None = None,
+) -> MaintenanceReport:
+    policy = policy or RetentionPolicy()
+    now = now or datetime.now(timezone.utc)
+    report = MaintenanceReport()
+    started = time.perf_counter()
+
+    archive_cutoff = None
+    if policy.archive_after_days is not None:
+        archive_cutoff = (now - timedelta(days=policy.archive_after_days)).isoformat()
+    # One sample for both probes, of threads that stay live, so "before" and
+    # "after" time the same work.
+    probe_threads = sample_threads(
+        store,
+        archive_cutoff=archive_cutoff,
+        include_pinned=policy.include_pinned,
+    )
+
+    report.file_bytes_before = _file_bytes(store.db_path)
+    report.latency_ms_before = probe_latency(store, probe_threads)
+
+    if archive_cutoff is not None:
+        report.archived_threads = len(
+            store.archive_threads(archive_cutoff, include_pinned=policy.include_pinned)
+        )
+    if policy.purge_archive_after_days is not None:
+        cutoff = (now - timedelta(days=policy.purge_archive_after_days)).isoformat()
+        report.purged_threads = store.purge_archive(cutoff)
+    if policy.compress_min_bytes is not None:
+        compressed = store.compress_source_chunks(policy.compress_min_bytes)
+        report.compressed_chunks = compressed["chunks"]
+        report.compressed_bytes_saved = compressed["bytes_before"] - compressed["bytes_after"]
+
+    _compact(store.db_path, policy, report)
+
+    report.latency_ms_after = probe_latency(store, probe_threads)
+    report.file_bytes_after = _file_bytes(store.db_path)
+    report.seconds = time.perf_counter() - started
+    return report
@@ -1,30 +1,136 @@
 from __future__ import annotations
 
 from pathlib import Path
+from array import array
+from contextlib import nullcontext
+import base64
 from datetime import datetime, timezone
+import hashlib
 import json
+import re
 import sqlite3
-from typing import Any
+import zlib
+from typing import Any, Callable, ContextManager, Iterable, Iterator
+from uuid import uuid4
+
+from common.sqlite_pool import SQLitePool
+
+
+# Bumped with every data migration; stored in the database's user_version.
+SCHEMA_VERSION = 3
+_BATCH_SIZE = 500
+_SNIPPET_TOKENS = 12
+EXPORT_FORMAT = "chat-ndjson/1"
+# bm25 scores are negative (lower is better); scaling favours title matches.
+_TITLE_WEIGHT = 2.0
+
+# Full-text search over thread titles and messages (schema version 2).
+_SEARCH_INDEX_SQL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS threads_fts USING fts5(
+        title,
+        thread_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+        content,
+        content = 'messages',
+        content_rowid = 'message_id',
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS threads_fts_insert AFTER INSERT ON threads BEGIN
+        INSERT INTO threads_fts(title, thread_id) VALUES (new.title, new.thread_id);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS threads_fts_delete AFTER DELETE ON threads BEGIN
+        DELETE FROM threads_fts WHERE thread_id = old.thread_id;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS threads_fts_update AFTER UPDATE OF title ON threads BEGIN
+        UPDATE threads_fts SET title = new.title WHERE thread_id = old.thread_id;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts(rowid, content) VALUES (new.message_id, new.content);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content)
+        VALUES ('delete', old.message_id, old.content);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content)
+        VALUES ('delete', old.message_id, old.content);
+        INSERT INTO messages_fts(rowid, content) VALUES (new.message_id, new.content);
+    END;
+    """,
+    "DELETE FROM threads_fts",
+    "INSERT INTO threads_fts(title, thread_id) SELECT title, thread_id FROM threads",
+    "INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')",
+)
 
 
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def fts_query(text: str) -> str:
+    """Turn free text from a search box into a safe FTS5 query.
+
+    Every word must match; the last one is a prefix so results update while
+    the user is still typing.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return ""
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _decode_content(value: Any, encoding: str | None) -> str:
+    if encoding == "zlib":
+        return zlib.decompress(value).decode("utf-8")
+    return value
+
+
+def chunk_id(source: dict[str, Any]) -> str:
+    """Content address of a retrieved chunk: the hash of its metadata and text."""
+    metadata = json.dumps(source.get("metadata") or {}, ensure_ascii=False, sort_keys=True)
+    content = source.get("page_content") or ""
+    return hashlib.sha256(f"{metadata}\x1e{content}".encode("utf-8")).hexdigest()
+
+
 class ChatStore:
-    def __init__(self, db_path: Path | str):
+    def __init__(self, db_path: Path | str, *, pool_size: int = 4):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._pool = SQLitePool(self.db_path, size=pool_size)
         self._initialize()
 
-    def _connect(self) -> sqlite3.Connection:
-        connection = sqlite3.connect(self.db_path)
-        connection.row_factory = sqlite3.Row
-        connection.execute("PRAGMA foreign_keys = ON")
-        return connection
+    def _connect(self) -> ContextManager[sqlite3.Connection]:
+        return self._pool.connection()
+
+    def close(self) -> None:
+        self._pool.close()
 
     def _initialize(self) -> None:
         with self._connect() as conn:
+            # Only takes effect on a new, empty database; existing files are
+            # converted by the maintenance job (common/chat_maintenance.py).
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
             conn.executescript(
                 """
                 CREATE TABLE IF NOT EXISTS threads (
@@ -53,16 +159,179 @@ class ChatStore:
                 CREATE INDEX IF NOT EXISTS idx_messages_thread_created
                 ON messages(thread_id, created_at ASC);
 
+                CREATE INDEX IF NOT EXISTS idx_messages_thread_id
+                ON messages(thread_id, message_id);
+
                 CREATE TABLE IF NOT EXISTS thread_memory (
                     thread_id TEXT PRIMARY KEY,
                     summary TEXT NOT NULL DEFAULT '',
+                    summarized_through INTEGER NOT NULL DEFAULT 0,
                     updated_at TEXT NOT NULL,
                     FOREIGN KEY(thread_id) REFERENCES threads(thread_id) ON DELETE CASCADE
                 );
+
+                CREATE TABLE IF NOT EXISTS source_chunks (
+                    chunk_id TEXT PRIMARY KEY,
+                    metadata_json TEXT NOT NULL,
+                    page_content TEXT NOT NULL,
+                    encoding TEXT,
+                    created_at TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS message_sources (
+                    message_id INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    PRIMARY KEY(message_id, position),
+                    FOREIGN KEY(message_id) REFERENCES messages(message_id) ON DELETE CASCADE,
+                    FOREIGN KEY(chunk_id) REFERENCES source_chunks(chunk_id)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_message_sources_chunk
+                ON message_sources(chunk_id);
+
+                CREATE TABLE IF NOT EXISTS turn_embeddings (
+                    message_id INTEGER PRIMARY KEY,
+                    answer_id INTEGER NOT NULL,
+                    thread_id TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    FOREIGN KEY(message_id) REFERENCES messages(message_id) ON DELETE CASCADE
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_turn_embeddings_thread
+                ON turn_embeddings(thread_id, message_id);
+
+                CREATE TABLE IF NOT EXISTS archived_threads (
+                    thread_id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    archived_at TEXT NOT NULL,
+                    payload BLOB NOT NULL
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_archived_threads_user
+                ON archived_threads(user_id, updated_at DESC);
                 """
             )
             self._ensure_column(conn, "threads", "scope_act", "TEXT NOT NULL DEFAULT 'All'")
             self._ensure_column(conn, "threads", "pinned", "INTEGER NOT NULL DEFAULT 0")
+            self._ensure_column(conn, "source_chunks", "encoding", "TEXT")
+            self._ensure_column(conn, "thread_memory", "summarized_through", "INTEGER NOT NULL DEFAULT 0")
+            self._migrate(conn)
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        # sqlite3 opens transactions only before DML; begin explicitly so the
+        # DDL below is part of the same all-or-nothing migration.
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        if version < 1:
+            self._migrate_sources_json(conn)
+        if version < 2:
+            self._create_search_index(conn)
+        if version < 3:
+            self._seed_summary_watermarks(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _migrate_sources_json(self, conn: sqlite3.Connection) -> None:
+        # Move the per-message sources_json blobs into source_chunks, keeping
+        # one copy of each chunk however many answers cited it.
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                """
+                SELECT message_id, sources_json
+                FROM messages
+                WHERE sources_json IS NOT NULL AND message_id > ?
+                ORDER BY message_id
+                LIMIT ?
+                """,
+                (last_id, _BATCH_SIZE),
+            ).fetchall()
+            if not rows:
+                break
+            for row in rows:
+                try:
+                    sources = json.loads(row["sources_json"])
+                except json.JSONDecodeError:
+                    sources = []
+                if isinstance(sources, list):
+                    self._insert_sources(conn, row["message_id"], sources)
+            last_id = rows[-1]["message_id"]
+        conn.execute("UPDATE messages SET sources_json = NULL WHERE sources_json IS NOT NULL")
+
+    @staticmethod
+    def _seed_summary_watermarks(conn: sqlite3.Connection) -> None:
+        # Summaries written before the watermark existed already cover every
+        # message except the 8 most recent ones.
+        conn.execute(
+            """
+            UPDATE thread_memory
+            SET summarized_through = COALESCE(
+                (
+                    SELECT message_id FROM messages
+                    WHERE messages.thread_id = thread_memory.thread_id
+                    ORDER BY message_id DESC
+                    LIMIT 1 OFFSET 8
+                ),
+                0
+            )
+            WHERE summary != ''
+            """
+        )
+
+    @staticmethod
+    def _create_search_index(conn: sqlite3.Connection) -> None:
+        # One execute per statement: executescript would commit the migration's
+        # open transaction first and run the rest outside it.
+        # messages_fts borrows its text from messages (message_id is a stable
+        # rowid). Thread titles are stored in threads_fts itself, because the
+        # implicit rowid of a TEXT-keyed table may be renumbered by VACUUM.
+        for statement in _SEARCH_INDEX_SQL:
+            conn.execute(statement)
+
+    @staticmethod
+    def _insert_sources(conn: sqlite3.Connection, message_id: int, sources: list[dict[str, Any]]) -> None:
+        if not sources:
+            return
+        now = utc_now_iso()
+        chunks: dict[str, tuple[str, str, str, str]] = {}
+        refs = []
+        for position, source in enumerate(sources):
+            key = chunk_id(source)
+            if key not in chunks:
+                chunks[key] = (
+                    key,
+                    json.dumps(source.get("metadata") or {}, ensure_ascii=False),
+                    source.get("page_content") or "",
+                    now,
+                )
+            refs.append((message_id, position, key))
+        conn.executemany(
+            """
+            INSERT OR IGNORE INTO source_chunks(chunk_id, metadata_json, page_content, created_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            list(chunks.values()),
+        )
+        conn.executemany(
+            "INSERT INTO message_sources(message_id, position, chunk_id) VALUES (?, ?, ?)",
+            refs,
+        )
+
+    @staticmethod
+    def _prune_chunks(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            DELETE FROM source_chunks
+            WHERE NOT EXISTS (
+                SELECT 1 FROM message_sources WHERE message_sources.chunk_id = source_chunks.chunk_id
+            )
+            """
+        )
 
     @staticmethod
     def _ensure_column(conn: sqlite3.Connection, table: str, column: str, ddl: str) -> None:
@@ -114,14 +383,84 @@ class ChatStore:
         """
         params: list[Any] = [user_id]
         if search.strip():
-            query += " AND LOWER(title) LIKE ?"
-            params.append(f"%{search.strip().lower()}%")
+            match = fts_query(search)
+            if not match:
+                return []
+            query += " AND thread_id IN (SELECT thread_id FROM threads_fts WHERE threads_fts MATCH ?)"
+            params.append(match)
         query += " ORDER BY pinned DESC, updated_at DESC"
 
         with self._connect() as conn:
             rows = conn.execute(query, params).fetchall()
         return [dict(row) for row in rows]
 
+    def search_threads(self, user_id: str, text: str, limit: int = 20) -> list[dict[str, Any]]:
+        """Threads whose title or messages match `text`, best match first.
+
+        Each result is the thread row plus `snippet` (matched terms wrapped in
+        ** for markdown), `message_id` of the matching message (None for a
+        title match) and the bm25 `score`.
+        """
+        match = fts_query(text)
+        if not match or limit <= 0:
+            return []
+        with self._connect() as conn:
+            # Rank first and only build snippets for the hits that are returned;
+            # SQLite fills the bare columns from the row holding MIN(score).
+            hits = conn.execute(
+                f"""
+                SELECT thread_id, message_id, MIN(score) AS score
+                FROM (
+                    SELECT t.thread_id AS thread_id, NULL AS message_id,
+                        bm25(threads_fts) * {_TITLE_WEIGHT} AS score
+                    FROM threads_fts
+                    JOIN threads AS t ON t.thread_id = threads_fts.thread_id
+                    WHERE threads_fts MATCH ? AND t.user_id = ?
+                    UNION ALL
+                    SELECT m.thread_id, m.message_id, bm25(messages_fts)
+                    FROM messages_fts
+                    JOIN messages AS m ON m.message_id = messages_fts.rowid
+                    JOIN threads AS t ON t.thread_id = m.thread_id
+                    WHERE messages_fts MATCH ? AND t.user_id = ?
+                )
+                GROUP BY thread_id
+                ORDER BY score
+                LIMIT ?
+                """,
+                (match, user_id, match, user_id, limit),
+            ).fetchall()
+
+            results = []
+            for hit in hits:
+                thread = conn.execute(
+                    """
+                    SELECT thread_id, user_id, title, scope_act, pinned, created_at, updated_at
+                    FROM threads
+                    WHERE thread_id = ?
+                    """,
+                    (hit["thread_id"],),
+                ).fetchone()
+                if hit["message_id"] is None:
+                    snippet = conn.execute(
+                        f"""
+                        SELECT snippet(threads_fts, 0, '**', '**', '…', {_SNIPPET_TOKENS})
+                        FROM threads_fts
+                        WHERE threads_fts MATCH ? AND thread_id = ?
+                        """,
+                        (match, hit["thread_id"]),
+                    ).fetchone()
+                else:
+                    snippet = conn.execute(
+                        f"""
+                        SELECT snippet(messages_fts, 0, '**', '**', '…', {_SNIPPET_TOKENS})
+                        FROM messages_fts
+                        WHERE messages_fts MATCH ? AND rowid = ?
+                        """,
+                        (match, hit["message_id"]),
+                    ).fetchone()
+                results.append({**dict(thread), **dict(hit), "snippet": snippet[0] if snippet else ""})
+        return results
+
     def get_thread(self, user_id: str, thread_id: str) -> dict[str, Any] | None:
         with self._connect() as conn:
             row = conn.execute(
@@ -175,6 +514,7 @@ class ChatStore:
                 "DELETE FROM threads WHERE user_id = ? AND thread_id = ?",
                 (user_id, thread_id),
             )
+            self._prune_chunks(conn)
 
     def touch_thread(self, thread_id: str) -> None:
         now = utc_now_iso()
@@ -184,51 +524,214 @@ class ChatStore:
                 (now, thread_id),
             )
 
+    @classmethod
+    def _insert_message(
+        cls,
+        conn: sqlite3.Connection,
+        thread_id: str,
+        role: str,
+        content: str,
+        sources: list[dict[str, Any]] | None,
+        now: str,
+    ) -> int:
+        cursor = conn.execute(
+            """
+            INSERT INTO messages(thread_id, role, content, sources_json, created_at)
+            VALUES (?, ?, ?, NULL, ?)
+            """,
+            (thread_id, role, content, now),
+        )
+        message_id = int(cursor.lastrowid)
+        cls._insert_sources(conn, message_id, sources or [])
+        return message_id
+
     def add_message(
         self,
         thread_id: str,
         role: str,
         content: str,
         sources: list[dict[str, Any]] | None = None,
-    ) -> None:
+    ) -> int:
         now = utc_now_iso()
-        serialized_sources = json.dumps(sources or [], ensure_ascii=False)
         with self._connect() as conn:
-            conn.execute(
-                """
-                INSERT INTO messages(thread_id, role, content, sources_json, created_at)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (thread_id, role, content, serialized_sources, now),
-            )
+            message_id = self._insert_message(conn, thread_id, role, content, sources, now)
             conn.execute(
                 "UPDATE threads SET updated_at = ? WHERE thread_id = ?",
                 (now, thread_id),
             )
+        return message_id
+
+    def record_turn(
+        self,
+        thread_id: str,
+        question: str,
+        answer: str,
+        sources: list[dict[str, Any]] | None = None,
+        *,
+        title: str | None = None,
+        summary: str | None = None,
+        summarized_through: int | None = None,
+        turn_embedding: list[float] | None = None,
+    ) -> dict[str, int]:
+        """Store a question/answer pair in one write transaction.
+
+        `title` renames the thread and `summary` replaces its running summary
+        (with `summarized_through` as its new watermark); each is left alone
+        when None. `turn_embedding` is kept for relevance-based memory
+        (see `get_turns`). Nothing is written if any step fails.
+        """
+        now = utc_now_iso()
+        with self._connect() as conn:
+            user_message_id = self._insert_message(conn, thread_id, "user", question, None, now)
+            assistant_message_id = self._insert_message(conn, thread_id, "assistant", answer, sources, now)
+            if title is not None:
+                conn.execute(
+                    "UPDATE threads SET title = ?, updated_at = ? WHERE thread_id = ?",
+                    (title, now, thread_id),
+                )
+            else:
+                conn.execute(
+                    "UPDATE threads SET updated_at = ? WHERE thread_id = ?",
+                    (now, thread_id),
+                )
+            if summary is not None:
+                self._upsert_summary(conn, thread_id, summary, summarized_through, now)
+            if turn_embedding is not None:
+                conn.execute(
+                    "INSERT INTO turn_embeddings(message_id, answer_id, thread_id, vector) VALUES (?, ?, ?, ?)",
+                    (user_message_id, assistant_message_id, thread_id, array("f", turn_embedding).tobytes()),
+                )
+        return {
+            "user_message_id": user_message_id,
+            "assistant_message_id": assistant_message_id,
+        }
 
     def get_messages(self, thread_id: str) -> list[dict[str, Any]]:
         with self._connect() as conn:
             rows = conn.execute(
                 """
-                SELECT message_id, thread_id, role, content, sources_json, created_at
+                SELECT message_id, thread_id, role, content, created_at
                 FROM messages
                 WHERE thread_id = ?
                 ORDER BY created_at ASC, message_id ASC
                 """,
                 (thread_id,),
             ).fetchall()
+            sources = self._hydrate_sources(conn, [row["message_id"] for row in rows])
 
         messages: list[dict[str, Any]] = []
         for row in rows:
             data = dict(row)
-            raw_sources = data.pop("sources_json")
-            try:
-                data["sources"] = json.loads(raw_sources) if raw_sources else []
-            except json.JSONDecodeError:
-                data["sources"] = []
+            data["sources"] = sources.get(data["message_id"], [])
             messages.append(data)
         return messages
 
+    def get_recent_messages(
+        self,
+        thread_id: str,
+        limit: int = 20,
+        *,
+        before_id: int | None = None,
+        with_content: bool = True,
+    ) -> list[dict[str, Any]]:
+        """Up to `limit` messages older than `before_id` (or the newest), oldest first.
+
+        Sources are not loaded; each message carries a `source_count` instead and
+        the caller fetches them with `get_message_sources` when it renders them.
+        With `with_content=False` the text is left out too, for callers that
+        cache it by message id (see `get_message_contents`).
+        """
+        content = "m.content" if with_content else "NULL AS content"
+        query = f"""
+            SELECT
+                m.message_id, m.thread_id, m.role, {content}, m.created_at,
+                (SELECT COUNT(*) FROM message_sources AS ms WHERE ms.message_id = m.message_id)
+                    AS source_count
+            FROM messages AS m
+            WHERE m.thread_id = ?
+        """
+        params: list[Any] = [thread_id]
+        if before_id is not None:
+            query += " AND m.message_id < ?"
+            params.append(before_id)
+        query += " ORDER BY m.message_id DESC LIMIT ?"
+        params.append(max(limit, 0))
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def get_message_contents(self, message_ids: list[int]) -> dict[int, str]:
+        if not message_ids:
+            return {}
+        contents: dict[int, str] = {}
+        with self._connect() as conn:
+            for start in range(0, len(message_ids), _BATCH_SIZE):
+                batch = list(message_ids[start : start + _BATCH_SIZE])
+                placeholders = ", ".join("?" for _ in batch)
+                rows = conn.execute(
+                    f"SELECT message_id, content FROM messages WHERE message_id IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                contents.update((row["message_id"], row["content"]) for row in rows)
+        return contents
+
+    def get_message_sources(self, message_ids: list[int]) -> dict[int, list[dict[str, Any]]]:
+        with self._connect() as conn:
+            return self._hydrate_sources(conn, list(message_ids))
+
+    def get_thread_stats(self, thread_id: str) -> dict[str, Any]:
+        """Message count and newest message id, without reading any content."""
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT COUNT(*) AS message_count, MAX(message_id) AS last_message_id
+                FROM messages
+                WHERE thread_id = ?
+                """,
+                (thread_id,),
+            ).fetchone()
+        return dict(row)
+
+    @staticmethod
+    def _hydrate_sources(conn: sqlite3.Connection, message_ids: list[int]) -> dict[int, list[dict[str, Any]]]:
+        """Sources of many messages in one query; each distinct chunk is decoded once."""
+        if not message_ids:
+            return {}
+        sources: dict[int, list[dict[str, Any]]] = {}
+        decoded: dict[str, dict[str, Any]] = {}
+        # Stay well under SQLite's bound-parameter limit on long threads.
+        for start in range(0, len(message_ids), _BATCH_SIZE):
+            batch = message_ids[start : start + _BATCH_SIZE]
+            placeholders = ", ".join("?" for _ in batch)
+            rows = conn.execute(
+                f"""
+                SELECT ms.message_id, ms.chunk_id, sc.metadata_json, sc.page_content, sc.encoding
+                FROM message_sources AS ms
+                JOIN source_chunks AS sc ON sc.chunk_id = ms.chunk_id
+                WHERE ms.message_id IN ({placeholders})
+                ORDER BY ms.message_id, ms.position
+                """,
+                batch,
+            ).fetchall()
+            for row in rows:
+                key = row["chunk_id"]
+                if key not in decoded:
+                    try:
+                        metadata = json.loads(row["metadata_json"])
+                    except json.JSONDecodeError:
+                        metadata = {}
+                    decoded[key] = {
+                        "metadata": metadata,
+                        "page_content": _decode_content(row["page_content"], row["encoding"]),
+                    }
+                # Copy so callers can mutate one message's sources safely.
+                source = decoded[key]
+                sources.setdefault(row["message_id"], []).append(
+                    {"metadata": dict(source["metadata"]), "page_content": source["page_content"]}
+                )
+        return sources
+
     def get_summary(self, thread_id: str) -> str:
         with self._connect() as conn:
             row = conn.execute(
@@ -237,18 +740,75 @@ class ChatStore:
             ).fetchone()
         return row["summary"] if row else ""
 
-    def set_summary(self, thread_id: str, summary: str) -> None:
-        now = utc_now_iso()
+    def get_turns(self, thread_id: str, limit: int = 200) -> list[dict[str, Any]]:
+        """The newest `limit` embedded turns of a thread, oldest first.
+
+        Each turn has the question's `message_id`, `question`, `answer` and its
+        `vector`. Turns stored without an embedding are not returned.
+        """
         with self._connect() as conn:
-            conn.execute(
+            rows = conn.execute(
                 """
-                INSERT INTO thread_memory(thread_id, summary, updated_at)
-                VALUES (?, ?, ?)
-                ON CONFLICT(thread_id)
-                DO UPDATE SET summary = excluded.summary, updated_at = excluded.updated_at
+                SELECT te.message_id, q.content AS question, a.content AS answer, te.vector
+                FROM turn_embeddings AS te
+                JOIN messages AS q ON q.message_id = te.message_id
+                JOIN messages AS a ON a.message_id = te.answer_id
+                WHERE te.thread_id = ?
+                ORDER BY te.message_id DESC
+                LIMIT ?
                 """,
-                (thread_id, summary, now),
+                (thread_id, limit),
+            ).fetchall()
+        turns = []
+        for row in reversed(rows):
+            vector = array("f")
+            vector.frombytes(row["vector"])
+            turns.append(
+                {
+                    "message_id": row["message_id"],
+                    "question": row["question"],
+                    "answer": row["answer"],
+                    "vector": vector.tolist(),
+                }
             )
+        return turns
+
+    def get_memory(self, thread_id: str) -> dict[str, Any]:
+        """The running summary and the id of the last message folded into it."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT summary, summarized_through FROM thread_memory WHERE thread_id = ?",
+                (thread_id,),
+            ).fetchone()
+        if not row:
+            return {"summary": "", "summarized_through": 0}
+        return dict(row)
+
+    def set_summary(self, thread_id: str, summary: str, summarized_through: int | None = None) -> None:
+        with self._connect() as conn:
+            self._upsert_summary(conn, thread_id, summary, summarized_through, utc_now_iso())
+
+    @staticmethod
+    def _upsert_summary(
+        conn: sqlite3.Connection,
+        thread_id: str,
+        summary: str,
+        summarized_through: int | None,
+        now: str,
+    ) -> None:
+        # A None watermark keeps the stored one.
+        conn.execute(
+            """
+            INSERT INTO thread_memory(thread_id, summary, summarized_through, updated_at)
+            VALUES (?, ?, COALESCE(?, 0), ?)
+            ON CONFLICT(thread_id)
+            DO UPDATE SET
+                summary = excluded.summary,
+                summarized_through = COALESCE(?, thread_memory.summarized_through),
+                updated_at = excluded.updated_at
+            """,
+            (thread_id, summary, summarized_through, now, summarized_through),
+        )
 
     def export_thread(self, user_id: str, thread_id: str) -> dict[str, Any] | None:
         thread = self.get_thread(user_id=user_id, thread_id=thread_id)
@@ -259,3 +819,394 @@ class ChatStore:
             "summary": self.get_summary(thread_id),
             "messages": self.get_messages(thread_id),
         }
+
+    def _iter_message_pages(self, thread_id: str) -> Iterator[list[dict[str, Any]]]:
+        # Each page leases its own connection, so a slow consumer of the
+        # export never holds a pooled connection between pages.
+        last_id = 0
+        while True:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    """
+                    SELECT message_id, thread_id, role, content, created_at
+                    FROM messages
+                    WHERE thread_id = ? AND message_id > ?
+                    ORDER BY message_id
+                    LIMIT ?
+                    """,
+                    (thread_id, last_id, _BATCH_SIZE),
+                ).fetchall()
+                sources = self._hydrate_sources(conn, [row["message_id"] for row in rows])
+            if not rows:
+                return
+            page = []
+            for row in rows:
+                data = dict(row)
+                data["sources"] = sources.get(data["message_id"], [])
+                page.append(data)
+            yield page
+            last_id = rows[-1]["message_id"]
+
+    def _turn_embeddings(self, message_ids: list[int]) -> dict[int, dict[str, Any]]:
+        # Keyed by question message id; vectors stay raw float32, base64-encoded.
+        if not message_ids:
+            return {}
+        placeholders = ",".join("?" for _ in message_ids)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT message_id, answer_id, vector FROM turn_embeddings WHERE message_id IN ({placeholders})",
+                message_ids,
+            ).fetchall()
+        return {
+            row["message_id"]: {
+                "answer_id": row["answer_id"],
+                "vector": base64.b64encode(row["vector"]).decode("ascii"),
+            }
+            for row in rows
+        }
+
+    def iter_thread_export(
+        self,
+        user_id: str,
+        thread_id: str,
+        *,
+        include_embeddings: bool = False,
+    ) -> Iterator[str]:
+        """NDJSON lines for one thread: a thread header, then one line per message.
+
+        With `include_embeddings`, questions carry their `turn_embedding` so
+        relevance-based memory survives an archive round trip.
+        """
+        thread = self.get_thread(user_id=user_id, thread_id=thread_id)
+        if not thread:
+            return
+        memory = self.get_memory(thread_id)
+        header = {
+            "type": "thread",
+            "format": EXPORT_FORMAT,
+            "thread": thread,
+            "summary": memory["summary"],
+            "summarized_through": memory["summarized_through"],
+        }
+        yield json.dumps(header, ensure_ascii=False) + "\n"
+        for page in self._iter_message_pages(thread_id):
+            embeddings = (
+                self._turn_embeddings([message["message_id"] for message in page]) if include_embeddings else {}
+            )
+            for message in page:
+                record = {"type": "message", **message}
+                if message["message_id"] in embeddings:
+                    record["turn_embedding"] = embeddings[message["message_id"]]
+                yield json.dumps(record, ensure_ascii=False) + "\n"
+
+    def iter_user_export(self, user_id: str) -> Iterator[str]:
+        """NDJSON lines for every thread of a user, one thread after another."""
+        for thread in self.list_threads(user_id=user_id):
+            yield from self.iter_thread_export(user_id, thread["thread_id"])
+
+    def import_threads(
+        self,
+        user_id: str,
+        lines: Iterable[str | bytes],
+        *,
+        batch_size: int = _BATCH_SIZE,
+        on_thread: Callable[[str], None] | None = None,
+    ) -> dict[str, int]:
+        """Load NDJSON produced by the exporters into `user_id`'s threads.
+
+        Rows are written in transactions of `batch_size` messages. A thread
+        whose id already exists is imported under a fresh id rather than
+        merged into it; lines that cannot be parsed are counted and skipped.
+        Turn embeddings in the records are stored against the new message ids.
+        """
+        return self._import_lines(self._connect, user_id, lines, batch_size=batch_size, on_thread=on_thread)
+
+    def _import_lines(
+        self,
+        connect: Callable[[], ContextManager[sqlite3.Connection]],
+        user_id: str,
+        lines: Iterable[str | bytes],
+        *,
+        batch_size: int = _BATCH_SIZE,
+        on_thread: Callable[[str], None] | None = None,
+    ) -> dict[str, int]:
+        # `connect` opens each write; restore_thread passes its own open
+        # connection so the import joins its transaction.
+        report = {"threads": 0, "messages": 0, "skipped": 0}
+        pending: list[dict[str, Any]] = []
+        thread_id: str | None = None
+        # Message ids change on import, so the summary watermark is carried
+        # over by mapping the exported ids onto the newly assigned ones.
+        watermark = {"exported": 0, "imported": 0}
+        # Likewise for turn embeddings, whose answer may land in a later batch
+        # than its question: exported -> imported ids for the current thread,
+        # and (question id, answer id, vector) still waiting for both.
+        id_map: dict[int, int] = {}
+        embeddings: list[tuple[int, int, bytes]] = []
+
+        def flush() -> None:
+            if not pending:
+                return
+            with connect() as conn:
+                imported = watermark["imported"]
+                for message in pending:
+                    message_id = self._insert_message(
+                        conn,
+                        message["thread_id"],
+                        message["role"],
+                        message["content"],
+                        message["sources"],
+                        message["created_at"],
+                    )
+                    exported_id = message["exported_id"]
+                    if isinstance(exported_id, int):
+                        id_map[exported_id] = message_id
+                        if exported_id <= watermark["exported"]:
+                            imported = message_id
+                if imported != watermark["imported"]:
+                    watermark["imported"] = imported
+                    conn.execute(
+                        "UPDATE thread_memory SET summarized_through = ? WHERE thread_id = ?",
+                        (imported, pending[-1]["thread_id"]),
+                    )
+                ready = [entry for entry in embeddings if entry[0] in id_map and entry[1] in id_map]
+                conn.executemany(
+                    "INSERT INTO turn_embeddings(message_id, answer_id, thread_id, vector) VALUES (?, ?, ?, ?)",
+                    [
+                        (id_map[question_id], id_map[answer_id], pending[-1]["thread_id"], vector)
+                        for question_id, answer_id, vector in ready
+                    ],
+                )
+                embeddings[:] = [entry for entry in embeddings if entry not in ready]
+            report["messages"] += len(pending)
+            pending.clear()
+
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                report["skipped"] += 1
+                continue
+
+            kind = record.get("type")
+            if kind == "thread":
+                flush()
+                with connect() as conn:
+                    thread_id = self._import_thread_header(conn, user_id, record)
+                watermark["exported"] = int(record.get("summarized_through") or 0)
+                watermark["imported"] = 0
+                id_map.clear()
+                embeddings.clear()
+                report["threads"] += 1
+                if on_thread is not None:
+                    on_thread(thread_id)
+            elif kind == "message" and thread_id and record.get("role") and "content" in record:
+                pending.append(
+                    {
+                        "thread_id": thread_id,
+                        "role": record["role"],
+                        "content": record["content"] or "",
+                        "sources": record.get("sources") or [],
+                        "created_at": record.get("created_at") or utc_now_iso(),
+                        "exported_id": record.get("message_id"),
+                    }
+                )
+                embedding = self._import_turn_embedding(record)
+                if embedding is not None:
+                    embeddings.append(embedding)
+                if len(pending) >= batch_size:
+                    flush()
+            else:
+                report["skipped"] += 1
+        flush()
+        return report
+
+    @staticmethod
+    def _import_turn_embedding(record: dict[str, Any]) -> tuple[int, int, bytes] | None:
+        embedding = record.get("turn_embedding")
+        if not isinstance(embedding, dict) or not isinstance(record.get("message_id"), int):
+            return None
+        try:
+            vector = base64.b64decode(embedding["vector"], validate=True)
+            answer_id = int(embedding["answer_id"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not vector or len(vector) % array("f").itemsize:
+            return None
+        return record["message_id"], answer_id, vector
+
+    @staticmethod
+    def _import_thread_header(conn: sqlite3.Connection, user_id: str, record: dict[str, Any]) -> str:
+        thread = record.get("thread") or {}
+        now = utc_now_iso()
+        thread_id = thread.get("thread_id") or str(uuid4())
+        exists = conn.execute("SELECT 1 FROM threads WHERE thread_id = ?", (thread_id,)).fetchone()
+        if exists:
+            thread_id = str(uuid4())
+        conn.execute(
+            """
+            INSERT INTO threads(thread_id, user_id, title, scope_act, pinned, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                thread_id,
+                user_id,
+                thread.get("title") or "New Chat",
+                thread.get("scope_act") or "All",
+                1 if thread.get("pinned") else 0,
+                thread.get("created_at") or now,
+                thread.get("updated_at") or now,
+            ),
+        )
+        conn.execute(
+            "INSERT INTO thread_memory(thread_id, summary, updated_at) VALUES (?, ?, ?)",
+            (thread_id, record.get("summary") or "", now),
+        )
+        return thread_id
+
+    def compress_source_chunks(self, min_bytes: int = 1024) -> dict[str, int]:
+        """zlib-compress the text of stored chunks of at least `min_bytes`.
+
+        Chunks are only rewritten when compression actually shrinks them.
+        """
+        report = {"chunks": 0, "bytes_before": 0, "bytes_after": 0}
+        last_id = ""
+        while True:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    """
+                    SELECT chunk_id, page_content
+                    FROM source_chunks
+                    WHERE encoding IS NULL AND chunk_id > ? AND LENGTH(CAST(page_content AS BLOB)) >= ?
+                    ORDER BY chunk_id
+                    LIMIT ?
+                    """,
+                    (last_id, min_bytes, _BATCH_SIZE),
+                ).fetchall()
+                updates = []
+                for row in rows:
+                    raw = row["page_content"].encode("utf-8")
+                    packed = zlib.compress(raw, 9)
+                    if len(packed) < len(raw):
+                        updates.append((packed, row["chunk_id"]))
+                        report["chunks"] += 1
+                        report["bytes_before"] += len(raw)
+                        report["bytes_after"] += len(packed)
+                conn.executemany(
+                    "UPDATE source_chunks SET page_content = ?, encoding = 'zlib' WHERE chunk_id = ?",
+                    updates,
+                )
+            if len(rows) < _BATCH_SIZE:
+                return report
+            last_id = rows[-1]["chunk_id"]
+
+    def archive_threads(
+        self,
+        updated_before: str,
+        *,
+        include_pinned: bool = False,
+        limit: int | None = None,
+    ) -> list[str]:
+        """Move threads not updated since `updated_before` (ISO time) to the archive.
+
+        Each thread is stored as zlib-compressed NDJSON (the export format,
+        with turn embeddings) and removed from the live tables. A thread that gains a message while it is
+        being archived is left in place.
+        """
+        query = "SELECT thread_id, user_id, title, updated_at FROM threads WHERE updated_at < ?"
+        params: list[Any] = [updated_before]
+        if not include_pinned:
+            query += " AND pinned = 0"
+        query += " ORDER BY updated_at"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            candidates = [dict(row) for row in conn.execute(query, params).fetchall()]
+
+        archived = []
+        for thread in candidates:
+            payload = zlib.compress(
+                "".join(
+                    self.iter_thread_export(thread["user_id"], thread["thread_id"], include_embeddings=True)
+                ).encode("utf-8"),
+                9,
+            )
+            with self._connect() as conn:
+                deleted = conn.execute(
+                    "DELETE FROM threads WHERE thread_id = ? AND updated_at = ?",
+                    (thread["thread_id"], thread["updated_at"]),
+                ).rowcount
+                if not deleted:
+                    continue
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO archived_threads(thread_id, user_id, title, updated_at, archived_at, payload)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        thread["thread_id"],
+                        thread["user_id"],
+                        thread["title"],
+                        thread["updated_at"],
+                        utc_now_iso(),
+                        payload,
+                    ),
+                )
+            archived.append(thread["thread_id"])
+
+        if archived:
+            with self._connect() as conn:
+                self._prune_chunks(conn)
+        return archived
+
+    def list_archived_threads(self, user_id: str) -> list[dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT thread_id, user_id, title, updated_at, archived_at
+                FROM archived_threads
+                WHERE user_id = ?
+                ORDER BY updated_at DESC
+                """,
+                (user_id,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def restore_thread(self, user_id: str, thread_id: str) -> str | None:
+        """Bring an archived thread back; returns its (possibly new) thread id.
+
+        The import and the removal from the archive are one transaction, so a
+        failed or concurrent restore can't leave the thread imported twice.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM archived_threads WHERE user_id = ? AND thread_id = ?",
+                (user_id, thread_id),
+            ).fetchone()
+            if not row:
+                return None
+            # Taking the write lock first: a concurrent restore of the same
+            # thread waits here, then finds nothing left to delete.
+            deleted = conn.execute(
+                "DELETE FROM archived_threads WHERE user_id = ? AND thread_id = ?",
+                (user_id, thread_id),
+            ).rowcount
+            if not deleted:
+                return None
+            lines = zlib.decompress(row["payload"]).decode("utf-8").splitlines()
+            restored_ids: list[str] = []
+            self._import_lines(lambda: nullcontext(conn), user_id, lines, on_thread=restored_ids.append)
+        return restored_ids[0] if restored_ids else None
+
+    def purge_archive(self, archived_before: str) -> int:
+        """Permanently delete archived threads archived before `archived_before`."""
+        with self._connect() as conn:
+            return conn.execute(
+                "DELETE FROM archived_threads WHERE archived_at < ?",
+                (archived_before,),
+            ).rowcount
@@ -1,29 +1,72 @@
-INDEX_NAME = "tanishk-rag-index-async"
-REGION = "us-east-2"
-LLM_MODEL = "meta.llama3-3-70b-instruct-v1:0"
-LLM_TEMPERATURE = 0.1
-INGEST = False  # Set True to run ingestion
+# Settings come from the environment, falling back to the defaults below, and
+# importing this module touches no AWS service: the boto3 session, credentials
+# and the vector store are built on first use by the factories at the bottom
+# (and `from common.config import vectorstore` still works, lazily).
+import os
+from functools import lru_cache
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
 
-from opensearchpy import RequestsHttpConnection
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
 
-from langchain_community.vectorstores import OpenSearchVectorSearch
 
-from common.aws_setup import awsauth, embedding_function
+# Read alias. Index jobs build versioned physical indices ("<alias>-v<timestamp>")
+# and switch the alias once a build validates; see core/index_versions.py.
+INDEX_NAME = os.environ.get("LEGAL_INDEX_NAME", "tanishk-rag-index")
+# The physical index from before versioned builds. The index job puts the alias
+# on it when the alias doesn't exist yet, so reads keep working until the first
+# versioned build switches in (and rollback can return to it).
+LEGACY_INDEX_NAME = os.environ.get("LEGAL_LEGACY_INDEX_NAME", "tanishk-rag-index-async")
+REGION = os.environ.get("AWS_REGION", "us-east-2")
+# An empty AWS_PROFILE falls through to boto3's default credential chain
+# (environment variables, instance or task role).
+AWS_PROFILE = os.environ.get("AWS_PROFILE", "sandbox")
+# Answer model (core/llm.py).
+LLM_MODEL = os.environ.get("LEGAL_LLM_MODEL", "us.anthropic.claude-3-haiku-20240307-v1:0")
+LLM_TEMPERATURE = _env_float("LEGAL_LLM_TEMPERATURE", 0.4)
+INGEST = False  # Set True to run ingestion
+
+# -------------------------
+# Managed index schema (see core/index_schema.py, which builds INDEX_SETTINGS)
+# -------------------------
+EMBEDDING_DIMENSION = _env_int("LEGAL_EMBEDDING_DIMENSION", 1024)  # Titan v2: 256, 512 or 1024; indexing and queries share it
+HNSW_ENGINE = os.environ.get("LEGAL_HNSW_ENGINE", "faiss")  # "byte" encoding needs "lucene" (managed domains only)
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 512
+HNSW_EF_SEARCH = _env_int("LEGAL_HNSW_EF_SEARCH", 512)
+VECTOR_ENCODING = os.environ.get("LEGAL_VECTOR_ENCODING", "float")  # "float", "fp16" (faiss SQ) or "byte" (client-side quantized, lucene)
+
+# -------------------------
+# Conversation memory (see core/memory.py)
+# -------------------------
+MEMORY_MODE = os.environ.get("LEGAL_MEMORY_MODE", "window")  # "window": summary + last 8 messages; "relevant": embedded turns within a budget
+MEMORY_EMBEDDING_DIMENSION = _env_int("LEGAL_MEMORY_EMBEDDING_DIMENSION", 256)
+MEMORY_TOKEN_BUDGET = _env_int("LEGAL_MEMORY_TOKEN_BUDGET", 600)
 
 # -------------------------
 # AWS / OpenSearch Settings
 # -------------------------
-AOSS_URL = "https://hcv0472oypdyengtsl48.us-east-2.aoss.amazonaws.com"
+AOSS_URL = os.environ.get("LEGAL_AOSS_URL", "https://hcv0472oypdyengtsl48.us-east-2.aoss.amazonaws.com")
 
 # -------------------------
 # Vector Stores
 # -------------------------
-def _build_vectorstore():
+def build_vectorstore(index_name: str = INDEX_NAME):
+    from opensearchpy import RequestsHttpConnection
+    from langchain_community.vectorstores import OpenSearchVectorSearch
+
+    from common.aws_setup import get_awsauth, get_embedding_function
+    from core.index_schema import INDEX_SETTINGS, wrap_embeddings
+
     return OpenSearchVectorSearch(
         opensearch_url=AOSS_URL,
-        index_name=INDEX_NAME,
-        embedding_function=embedding_function,
-        http_auth=awsauth,
+        index_name=index_name,
+        embedding_function=wrap_embeddings(get_embedding_function(), INDEX_SETTINGS),
+        http_auth=get_awsauth(),
         use_ssl=True,
         verify_certs=True,
         connection_class=RequestsHttpConnection,
@@ -32,5 +75,23 @@ def _build_vectorstore():
         retry_on_timeout=True,
     )
 
-vectorstore = _build_vectorstore()
 
+@lru_cache(maxsize=None)
+def get_vectorstore():
+    """The shared store on the read alias, built on first call.
+
+    Until the alias exists (the index job creates it on its first run, or
+    with --adopt), reads go to LEGACY_INDEX_NAME so a deploy that hasn't run
+    the job still starts. The choice holds for the life of the process.
+    """
+    vectorstore = build_vectorstore()
+    indices = vectorstore.client.indices
+    if not indices.exists(index=INDEX_NAME) and indices.exists(index=LEGACY_INDEX_NAME):
+        return build_vectorstore(LEGACY_INDEX_NAME)
+    return vectorstore
+
+
+def __getattr__(name: str):
+    if name == "vectorstore":
+        return get_vectorstore()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
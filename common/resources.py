@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Any, Callable
+
+
+@dataclass
+class _Resource:
+    factory: Callable[[], Any]
+    ttl: float | None
+    depends_on: tuple[str, ...]
+    close: Callable[[Any], None] | None
+    version: Callable[[], Any] | None = None
+    # Re-entrant: a factory's own get() calls may drop stale dependencies,
+    # and with them the resource whose lock the build is holding.
+    lock: threading.RLock = field(default_factory=threading.RLock)
+    value: Any = None
+    built_at: float | None = None
+    built_version: Any = None
+    builds: int = 0
+    build_seconds: float = 0.0
+
+
+class ResourceRegistry:
+    """Named objects built once per process and shared by every caller.
+
+    Streamlit re-executes the entry script on every interaction but keeps
+    imported modules, so a registry held in a module outlives reruns. A
+    resource lives until it is invalidated, for `ttl` seconds if given, or
+    until its `version` callable returns something else (say, a file's
+    mtime). Invalidating a resource also drops everything registered as
+    depending on it, calling each one's `close` hook.
+    """
+
+    def __init__(self) -> None:
+        self._resources: dict[str, _Resource] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        *,
+        ttl: float | None = None,
+        depends_on: tuple[str, ...] = (),
+        close: Callable[[Any], None] | None = None,
+        version: Callable[[], Any] | None = None,
+    ) -> None:
+        """Declare how to build `name`.
+
+        Re-registering replaces the old definition; a value already built from
+        it is closed, along with anything that depends on it.
+        """
+        with self._lock:
+            unknown = [dependency for dependency in depends_on if dependency not in self._resources]
+            if unknown:
+                raise KeyError(f"{name} depends on unregistered resources: {unknown}")
+            previous = self._resources.get(name)
+            self._resources[name] = _Resource(
+                factory=factory,
+                ttl=ttl,
+                depends_on=depends_on,
+                close=close,
+                version=version,
+            )
+        if previous is not None:
+            self._drop(previous)
+            for dependent in self._dependents(name):
+                self._drop(self._resources[dependent])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._resources
+
+    def get(self, name: str) -> Any:
+        self._drop_stale_dependencies(name)
+        resource = self._resources[name]
+        if self._is_fresh(resource):
+            return resource.value
+        # One lock per resource: concurrent sessions wait for a single build
+        # instead of each constructing their own copy.
+        with resource.lock:
+            if not self._is_fresh(resource):
+                if resource.built_at is not None:
+                    # Expired or changed: anything built from the old value goes with it.
+                    self._close(resource)
+                    for dependent in self._dependents(name):
+                        self._drop(self._resources[dependent])
+                # Read before building, so a change during the build is seen next time.
+                resource.built_version = resource.version() if resource.version is not None else None
+                started = time.perf_counter()
+                resource.value = resource.factory()
+                resource.build_seconds = time.perf_counter() - started
+                resource.built_at = time.monotonic()
+                resource.builds += 1
+            return resource.value
+
+    @staticmethod
+    def _is_fresh(resource: _Resource) -> bool:
+        if resource.built_at is None:
+            return False
+        if resource.ttl is not None and time.monotonic() - resource.built_at >= resource.ttl:
+            return False
+        return resource.version is None or resource.version() == resource.built_version
+
+    def _drop_stale_dependencies(self, name: str) -> None:
+        # A dependency that expired or changed takes what was built from it
+        # along, even when only the dependent is asked for.
+        for dependency in self._resources[name].depends_on:
+            self._drop_stale_dependencies(dependency)
+            resource = self._resources[dependency]
+            if resource.built_at is not None and not self._is_fresh(resource):
+                self.invalidate(dependency)
+
+    def _dependents(self, name: str) -> list[str]:
+        found: list[str] = []
+        pending = [name]
+        while pending:
+            current = pending.pop()
+            for other, resource in self._resources.items():
+                if current in resource.depends_on and other not in found:
+                    found.append(other)
+                    pending.append(other)
+        return found
+
+    def invalidate(self, name: str | None = None) -> list[str]:
+        """Drop `name` and its dependents (everything if None); returns what was dropped."""
+        names = list(self._resources) if name is None else [name, *self._dependents(name)]
+        dropped = []
+        for key in names:
+            resource = self._resources.get(key)
+            if resource is not None and resource.built_at is not None:
+                with resource.lock:
+                    self._drop(resource)
+                dropped.append(key)
+        return dropped
+
+    def _drop(self, resource: _Resource) -> None:
+        if resource.built_at is not None:
+            self._close(resource)
+        resource.value = None
+        resource.built_at = None
+
+    @staticmethod
+    def _close(resource: _Resource) -> None:
+        if resource.close is not None and resource.value is not None:
+            resource.close(resource.value)
+
+    def close(self) -> None:
+        self.invalidate()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Build count, last build time and age of every registered resource."""
+        now = time.monotonic()
+        return {
+            name: {
+                "builds": resource.builds,
+                "build_seconds": resource.build_seconds,
+                "age_seconds": None if resource.built_at is None else now - resource.built_at,
+            }
+            for name, resource in self._resources.items()
+        }
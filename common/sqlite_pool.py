@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from pathlib import Path
+import queue
+import sqlite3
+import threading
+from typing import Iterator
+
+
+# Applied to every pooled connection. WAL lets Streamlit sessions read while
+# another thread writes; NORMAL sync is durable across app crashes in WAL mode
+# and only risks the last commit on power loss.
+TUNED_PRAGMAS = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+class SQLitePool:
+    """Small pool of SQLite connections shared across threads.
+
+    A connection is leased to one thread at a time, so `check_same_thread` can
+    be disabled safely. Each connection keeps its own prepared-statement cache,
+    which is what makes reuse pay off for the short queries the chat store runs.
+    `size=0` disables pooling: every lease opens and closes a fresh connection
+    with only foreign keys enabled, the store's original behaviour.
+    """
+
+    def __init__(
+        self,
+        db_path: Path | str,
+        *,
+        size: int = 4,
+        timeout: float = 10.0,
+        cached_statements: int = 256,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.size = size
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        if size > 0:
+            self._set_wal()
+
+    def _set_wal(self) -> None:
+        # journal_mode is persistent in the database file, so set it once.
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+        finally:
+            conn.close()
+
+    def _open(self, tuned: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=not tuned,
+            cached_statements=self.cached_statements if tuned else 128,
+        )
+        conn.row_factory = sqlite3.Row
+        if tuned:
+            for pragma in TUNED_PRAGMAS:
+                conn.execute(pragma)
+        else:
+            conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return self._open(tuned=True)
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("Timed out waiting for a pooled connection") from None
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        if self._closed:
+            conn.close()
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Lease a connection; the block runs as one transaction (commit or rollback)."""
+        if self.size <= 0:
+            conn = self._open(tuned=False)
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+            return
+
+        conn = self._acquire()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._release(conn)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
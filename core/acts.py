@@ -1,6 +1,9 @@
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
+
+
+INDIA_LAW_DB = "IndiaLaw.db"
 
 
 @dataclass(frozen=True)
@@ -9,58 +12,81 @@ class ActSource:
     act_abbrev: str
     file_path: Path
     source_type: str
+    db_path: Optional[Path] = None
+    db_table: Optional[str] = None
+    prefer_db: bool = False
 
 
 def get_act_sources(root: Path) -> List[ActSource]:
     acts_dir = root / "Indian-Law-Penal-Code-Json-main"
+    db_path = acts_dir / INDIA_LAW_DB
     return [
         ActSource(
             act="Indian Penal Code, 1860",
             act_abbrev="IPC",
             file_path=acts_dir / "ipc.json",
-            source_type="section"
+            source_type="section",
+            db_path=db_path,
+            db_table="IPC"
         ),
         ActSource(
             act="Code of Criminal Procedure, 1973",
             act_abbrev="CrPC",
             file_path=acts_dir / "crpc.json",
-            source_type="section"
+            source_type="section",
+            db_path=db_path,
+            db_table="CRPC"
         ),
         ActSource(
             act="Civil Procedure Code, 1908",
             act_abbrev="CPC",
             file_path=acts_dir / "cpc.json",
-            source_type="section"
+            source_type="section",
+            db_path=db_path,
+            db_table="CPC"
         ),
         ActSource(
             act="Hindu Marriage Act, 1955",
             act_abbrev="HMA",
             file_path=acts_dir / "hma.json",
-            source_type="section"
+            source_type="section",
+            db_path=db_path,
+            db_table="HMA",
+            # hma.json is a lossy CSV export (indented lines were dropped);
+            # the SQLite table carries the full section text.
+            prefer_db=True
         ),
         ActSource(
             act="Indian Divorce Act, 1869",
             act_abbrev="IDA",
             file_path=acts_dir / "ida.json",
-            source_type="section"
+            source_type="section",
+            db_path=db_path,
+            db_table="IDA"
         ),
         ActSource(
             act="Indian Evidence Act, 1872",
             act_abbrev="IEA",
             file_path=acts_dir / "iea.json",
-            source_type="section"
+            source_type="section",
+            db_path=db_path,
+            db_table="IEA"
         ),
         ActSource(
             act="Negotiable Instruments Act, 1881",
             act_abbrev="NIA",
             file_path=acts_dir / "nia.json",
-            source_type="section"
+            source_type="section",
+            db_path=db_path,
+            db_table="NIA"
         ),
         ActSource(
             act="Motor Vehicles Act, 1988",
             act_abbrev="MVA",
             file_path=acts_dir / "MVA.json",
-            source_type="section"
+            source_type="section",
+            db_path=db_path,
+            db_table="MVA"
         )
     ]
 
@@ -72,3 +98,11 @@ def get_constitution_source(root: Path) -> ActSource:
         file_path=root / "constitution_of_india.json",
         source_type="article"
     )
+
+
+def get_act_options(root: Path) -> List[Tuple[str, str]]:
+    """(abbreviation, label) pairs for scope pickers, starting with "All"."""
+    options = [("All", "All Acts")]
+    for act in [get_constitution_source(root)] + get_act_sources(root):
+        options.append((act.act_abbrev, f"{act.act_abbrev} - {act.act}"))
+    return options
@@ -0,0 +1,165 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from core.schema import FinalAnswer
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
+class FinalAnswerStreamParser:
+    """Incrementally parses streamed FinalAnswer JSON.
+
+    `feed` takes raw model text as it arrives and returns events: `answer`
+    deltas while the "answer" string is still being generated, and each
+    `citation` once its "cited_sections" entry closes. Anything else in the
+    object is skipped. `finish` returns the FinalAnswer, falling back to
+    whatever was recovered when the output is not valid JSON.
+    """
+
+    def __init__(self) -> None:
+        self.raw = ""
+        self.answer = ""
+        self.cited_sections: List[str] = []
+        self._started = False
+        # Offsets of the top-level object in `raw`, for the strict parse in `finish`.
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._stack: List[str] = []  # "{" / "[" for each open container
+        self._key: Optional[str] = None  # last key of the top-level object
+        self._expect_key = False
+        self._in_string = False
+        self._string_is_key = False
+        self._string = ""
+        self._escape = False
+        self._unicode: Optional[str] = None
+        self._high_surrogate: Optional[int] = None
+
+    # The string being read is the answer text, or one citation.
+    def _target(self) -> Optional[str]:
+        if self._string_is_key:
+            return None
+        if len(self._stack) == 1 and self._key == "answer":
+            return "answer"
+        if len(self._stack) == 2 and self._stack[1] == "[" and self._key == "cited_sections":
+            return "citation"
+        return None
+
+    def _append(self, char: str, delta: List[str]) -> None:
+        if self._high_surrogate is not None:
+            high, self._high_surrogate = self._high_surrogate, None
+            if 0xDC00 <= ord(char) <= 0xDFFF:
+                char = chr(0x10000 + ((high - 0xD800) << 10) + (ord(char) - 0xDC00))
+            else:
+                self._append(chr(high), delta)
+        elif 0xD800 <= ord(char) <= 0xDBFF:
+            self._high_surrogate = ord(char)
+            return
+        self._string += char
+        if self._target() == "answer":
+            delta.append(char)
+
+    def _string_char(self, char: str, delta: List[str], events: List[Dict[str, Any]]) -> None:
+        if self._unicode is not None:
+            self._unicode += char
+            if len(self._unicode) == 4:
+                code, self._unicode = self._unicode, None
+                try:
+                    self._append(chr(int(code, 16)), delta)
+                except ValueError:
+                    self._append(code, delta)
+            return
+        if self._escape:
+            self._escape = False
+            if char == "u":
+                self._unicode = ""
+            else:
+                self._append(_ESCAPES.get(char, char), delta)
+            return
+        if char == "\\":
+            self._escape = True
+        elif char == '"':
+            self._close_string(delta, events)
+        else:
+            self._append(char, delta)
+
+    def _close_string(self, delta: List[str], events: List[Dict[str, Any]]) -> None:
+        self._in_string = False
+        target = self._target()
+        if self._string_is_key:
+            if len(self._stack) == 1:
+                self._key = self._string
+            self._expect_key = False
+        elif target == "answer":
+            self.answer = self._string
+        elif target == "citation":
+            self.cited_sections.append(self._string)
+            self._flush(delta, events)
+            events.append({"type": "citation", "content": self._string})
+
+    @staticmethod
+    def _flush(delta: List[str], events: List[Dict[str, Any]]) -> None:
+        if delta:
+            events.append({"type": "answer", "content": "".join(delta)})
+            delta.clear()
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        offset = len(self.raw)
+        self.raw += text
+        events: List[Dict[str, Any]] = []
+        delta: List[str] = []
+        for position, char in enumerate(text, start=offset):
+            if self._in_string:
+                self._string_char(char, delta, events)
+                continue
+            if not self._started:
+                # Skip any preamble or code fence before the object.
+                if char == "{":
+                    self._started = True
+                    self._start = position
+                    self._stack.append("{")
+                    self._expect_key = True
+                continue
+            if not self._stack:
+                continue  # trailing text after the object
+            if char == '"':
+                self._in_string = True
+                self._string = ""
+                self._string_is_key = self._stack[-1] == "{" and self._expect_key
+            elif char in "{[":
+                self._stack.append(char)
+                self._expect_key = char == "{"
+            elif char in "}]":
+                self._stack.pop()
+                if not self._stack:
+                    self._end = position + 1
+            elif char == "," and self._stack[-1] == "{":
+                self._expect_key = True
+        self._flush(delta, events)
+        return events
+
+    @property
+    def complete(self) -> bool:
+        return self._started and not self._stack
+
+    def finish(self) -> Dict[str, Any]:
+        """{"answer": FinalAnswer, "recovered": bool}; recovered is True when not parsed as valid JSON."""
+        if self._start is not None and self._end is not None:
+            # Only the object itself: a preamble, fence or trailing note
+            # around valid JSON is not a reason to fall back.
+            try:
+                data = json.loads(self.raw[self._start:self._end])
+                return {"answer": FinalAnswer(**data), "recovered": False}
+            except (ValueError, TypeError):
+                pass
+        if self._in_string and self._target() == "answer":
+            self.answer = self._string  # cut off mid-answer
+        answer = self.answer
+        if not self._started:
+            # The model ignored the format and wrote prose.
+            answer = _FENCE.sub("", self.raw).strip()
+        return {
+            "answer": FinalAnswer(answer=answer, cited_sections=list(self.cited_sections)),
+            "recovered": True,
+        }
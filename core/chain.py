@@ -1,14 +1,25 @@
-from typing import Dict, Iterator, List
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 from langchain_core.documents import Document
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.runnables import RunnableLambda
 from langchain_community.vectorstores import OpenSearchVectorSearch
 
+from core.answer_stream import FinalAnswerStreamParser
+from core.caching import LRUCache
+from core.citations import CitationGraph, ProvisionKey, provision_key
+from core.index_versions import get_active_index
+from core.search import compact_similarity_search
 from core.prompts import QUERY_GENERATOR_PROMPT, ANSWER_PROMPT, ANSWER_STREAM_PROMPT
 from core.schema import ExpandedQuery, FinalAnswer, GraphState
 
 
+# (act, provision id) pairs to the provisions found, e.g. ProvisionStore.get_provisions_by_id.
+ProvisionLookup = Callable[[List[Tuple[str, str]]], Dict[Tuple[str, str], Document]]
+
+
 # ---------- Utilities ----------
 
 def format_docs(docs: List[Document]) -> str:
@@ -65,41 +76,72 @@ class RetrievalLegalChain:
         query_parser: PydanticOutputParser,
         *,
         similarity_k: int = 12,
+        compact_payloads: bool = True,
+        expansion_cache: Optional[LRUCache] = None,
+        citation_graph: Optional[CitationGraph] = None,
+        provision_lookup: Optional[ProvisionLookup] = None,
+        max_neighbours: int = 4,
     ):
         self.answer_llm = answer_llm
         self.vectorstore = vectorstore
         self.answer_parser = answer_parser
         self.query_parser = query_parser
         self.similarity_k = similarity_k
+        self.compact_payloads = compact_payloads
+        self.expansion_cache = expansion_cache
+        self.citation_graph = citation_graph
+        self.provision_lookup = provision_lookup
+        self.max_neighbours = max_neighbours
 
         self.query_generator_chain = (
             QUERY_GENERATOR_PROMPT
             | self.answer_llm
             | self.query_parser
         )
+        # No output parser: the JSON is parsed incrementally as it streams
+        # (see stream_structured), so a malformed tail doesn't lose the answer.
         self.answer_chain = (
             RunnableLambda(build_answer_input)
             | ANSWER_PROMPT.partial(
                 format_instructions=self.answer_parser.get_format_instructions()
             )
             | self.answer_llm
-            | self.answer_parser
         )
         self.answer_stream_chain = ANSWER_STREAM_PROMPT | self.answer_llm
 
-    def _retrieve(self, *, query: str, act: str | None, chat_history: str | None):
-        expanded: ExpandedQuery = self.query_generator_chain.invoke(
-            {
-                "query": query,
-                "chat_history": stringify_history(chat_history),
-            }
+    def index_version(self) -> str | None:
+        """Physical index behind the read alias; changes when a reindex is switched in."""
+        index_name = getattr(self.vectorstore, "index_name", None)
+        client = getattr(self.vectorstore, "client", None)
+        if client is None or index_name is None:
+            return index_name
+        return get_active_index(client, index_name) or index_name
+
+    def _search(self, query: str) -> List[Document]:
+        if self.compact_payloads:
+            return compact_similarity_search(self.vectorstore, query, self.similarity_k)
+        return self.vectorstore.similarity_search(query, k=self.similarity_k)
+
+    def _expand(self, query: str, chat_history: str | None) -> ExpandedQuery:
+        inputs = {
+            "query": query,
+            "chat_history": stringify_history(chat_history),
+        }
+        if self.expansion_cache is None:
+            return self.query_generator_chain.invoke(inputs)
+        return self.expansion_cache.get_or_load(
+            (inputs["query"], inputs["chat_history"]),
+            lambda: self.query_generator_chain.invoke(inputs),
         )
 
+    def _retrieve(self, *, query: str, act: str | None, chat_history: str | None):
+        expanded = self._expand(query, chat_history)
+
         queries = expanded.sub_queries if expanded.sub_queries else [query]
 
         docs: List[Document] = []
         for sub_query in queries:
-            docs.extend(self.vectorstore.similarity_search(sub_query, k=self.similarity_k))
+            docs.extend(self._search(sub_query))
 
         docs = dedupe_docs(docs)
         if act and act != "All":
@@ -107,18 +149,65 @@ class RetrievalLegalChain:
             if filtered:
                 docs = filtered
 
-        return expanded, docs
+        return expanded, docs + self._cited_neighbours(docs, act)
 
-    def invoke(self, inputs):
+    def _cited_neighbours(self, docs: List[Document], act: str | None) -> List[Document]:
+        """Provisions the hits refer to, one hop out on the citation graph.
+
+        Graph reads are in-memory; the provisions come from the lookup's cache,
+        with any misses fetched together in one keyword search. No LLM call or
+        vector search. If the lookup fails the answer goes ahead on the hits
+        alone.
+        """
+        if self.citation_graph is None or self.provision_lookup is None or self.max_neighbours <= 0:
+            return []
+        hits: "OrderedDict[ProvisionKey, str]" = OrderedDict()
+        for doc in docs:
+            key = provision_key(doc.metadata)
+            if key is not None and key not in hits:
+                hits[key] = doc.metadata.get("citation") or ""
+        pairs = self.citation_graph.expand(
+            hits,
+            max_neighbours=self.max_neighbours,
+            exclude=set(hits),
+            acts={act} if act and act != "All" else None,
+        )
+
+        wanted = {key: (key[0], self.citation_graph.provision_ids[key]) for _, key in pairs}
+        try:
+            found = self.provision_lookup(list(wanted.values()))
+        except Exception:
+            return []
+
+        neighbours = []
+        for origin, key in pairs:
+            doc = found.get(wanted[key])
+            if doc is None:
+                continue
+            # Copy: the lookup may hand out cached documents.
+            metadata = dict(doc.metadata)
+            metadata["cited_from"] = hits[origin]
+            neighbours.append(Document(page_content=doc.page_content, metadata=metadata))
+        return neighbours
+
+    def stream_structured(self, inputs) -> Iterator[Dict[str, object]]:
+        """The structured answer as it is generated.
+
+        Yields "answer" text deltas and a "citation" event per cited section,
+        then "done" with the FinalAnswer, the sources, timings and whether
+        the answer had to be recovered from malformed JSON.
+        """
         query = inputs["query"]
         act = inputs.get("act")
         chat_history = inputs.get("chat_history")
 
+        started = time.perf_counter()
         expanded_query, docs = self._retrieve(
             query=query,
             act=act,
             chat_history=chat_history,
         )
+        retrieved = time.perf_counter()
 
         state: GraphState = {
             "query": query,
@@ -129,8 +218,40 @@ class RetrievalLegalChain:
             "answer": None,
         }
 
-        answer: FinalAnswer = self.answer_chain.invoke(state)
-        return {"answer": answer, "sources": docs}
+        parser = FinalAnswerStreamParser()
+        first_token = None
+        for chunk in self.answer_chain.stream(state):
+            text = self._chunk_to_text(chunk)
+            if not text:
+                continue
+            if first_token is None:
+                first_token = time.perf_counter()
+            yield from parser.feed(text)
+
+        result = parser.finish()
+        finished = time.perf_counter()
+        yield {
+            "type": "done",
+            "answer": result["answer"],
+            "recovered": result["recovered"],
+            "sources": docs,
+            "timings": {
+                "retrieve_seconds": retrieved - started,
+                "first_token_seconds": None if first_token is None else first_token - started,
+                "answer_seconds": finished - retrieved,
+            },
+        }
+
+    def invoke(self, inputs):
+        for event in self.stream_structured(inputs):
+            if event["type"] == "done":
+                answer: FinalAnswer = event["answer"]
+                return {
+                    "answer": answer,
+                    "sources": event["sources"],
+                    "recovered": event["recovered"],
+                    "timings": event["timings"],
+                }
 
     @staticmethod
     def _chunk_to_text(chunk) -> str:
@@ -189,6 +310,11 @@ def build_chain(
     query_parser: PydanticOutputParser,
     *,
     similarity_k: int = 12,
+    compact_payloads: bool = True,
+    expansion_cache: Optional[LRUCache] = None,
+    citation_graph: Optional[CitationGraph] = None,
+    provision_lookup: Optional[ProvisionLookup] = None,
+    max_neighbours: int = 4,
 ):
     return RetrievalLegalChain(
         answer_llm=answer_llm,
@@ -196,4 +322,9 @@ def build_chain(
         answer_parser=answer_parser,
         query_parser=query_parser,
         similarity_k=similarity_k,
+        compact_payloads=compact_payloads,
+        expansion_cache=expansion_cache,
+        citation_graph=citation_graph,
+        provision_lookup=provision_lookup,
+        max_neighbours=max_neighbours,
     )
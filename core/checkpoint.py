@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Set
+
+from langchain_core.documents import Document
+
+from core.schema import document_id
+
+# Index job state: checkpoint manifests, and the citation graph built with each version.
+CHECKPOINT_DIR = Path("data") / "index_checkpoints"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def batch_key(batch: List[Document]) -> str:
+    digest = hashlib.sha256()
+    for doc in batch:
+        digest.update(document_id(doc).encode("ascii"))
+    return digest.hexdigest()
+
+
+class CheckpointManifest:
+    """Append-only JSON-lines record of the batches an index job has written.
+
+    The first line is a job header; each completed batch appends one line keyed
+    by `batch_key`, flushed and fsynced before the next batch is recorded. A
+    crash can at worst leave a truncated final line, which `load` ignores.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.completed: Set[str] = set()
+        self.header: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_index(cls, root: Path, index_name: str) -> "CheckpointManifest":
+        return cls(root / CHECKPOINT_DIR / f"{index_name}.jsonl")
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def load(self) -> Set[str]:
+        self.completed = set()
+        self.header = {}
+        if not self.path.exists():
+            return self.completed
+        with open(self.path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                event = entry.get("event")
+                if event == "start" and not self.header:
+                    self.header = entry
+                elif event == "batch":
+                    self.completed.add(entry["batch"])
+        return self.completed
+
+    def start(self, **header: Any) -> None:
+        self.completed = set()
+        self.header = {"event": "start", "at": _now(), **header}
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write(json.dumps(self.header, ensure_ascii=False) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, self.path)
+
+    def record(self, batch: List[Document]) -> None:
+        key = batch_key(batch)
+        self._append({"event": "batch", "batch": key, "docs": len(batch), "at": _now()})
+        with self._lock:
+            self.completed.add(key)
+
+    def mark(self, event: str, **details: Any) -> None:
+        self._append({"event": event, "at": _now(), **details})
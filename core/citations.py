@@ -0,0 +1,242 @@
+import json
+import os
+import re
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from langchain_core.documents import Document
+
+from core.acts import get_act_sources
+from core.checkpoint import CHECKPOINT_DIR
+
+# (act_abbrev, provision id) with the id normalized: "21A." and "21a" are one node.
+ProvisionKey = Tuple[str, str]
+
+GRAPH_FORMAT = "citation-graph/1"
+GRAPH_FILE = Path("data") / "citation_graph.json"
+_MAX_RANGE = 10  # "sections 1 to 5" is expanded; longer ranges keep only their ends
+
+_PROVISION_ID = r"\d+[A-Z]{0,2}\b"
+_KIND = r"sections?|ss?\.|articles?|arts?\."
+# The act name stops where the next reference starts: in "section 5 of this Act
+# and section 9 of the Indian Penal Code" it is "this Act", not the whole tail.
+_NEXT_REFERENCE = rf"\s+(?:(?:and|or)\s+)?\b(?:{_KIND})\s+\d"
+_REFERENCE = re.compile(
+    rf"\b(?P<kind>{_KIND})\s+"
+    rf"(?P<ids>{_PROVISION_ID}(?:\s*(?:,|and|or|to|-|–)\s*(?:(?P=kind)\s+)?{_PROVISION_ID})*)"
+    rf"(?:\s+of\s+(?:the\s+)?(?P<act>(?:(?!{_NEXT_REFERENCE})[^,.;:()\[\]]){{1,80}}))?",
+    re.IGNORECASE,
+)
+# Not \b at the end: footnote markers run into the name ("Indian Penal Code1").
+_NAMES_AN_ACT = re.compile(r"\b(act|code|constitution|ordinance|regulations?)(?![a-z])", re.IGNORECASE)
+_SAME_ACT = ("this ", "that ", "said ", "principal ", "act", "code")
+_EXTRA_ALIASES = {
+    "constitution": "COI",
+    "code of civil procedure": "CPC",
+    "penal code": "IPC",
+    "evidence act": "IEA",
+}
+
+
+def normalize_provision_id(provision_id: str) -> str:
+    return re.sub(r"[\s.]", "", str(provision_id)).upper()
+
+
+def provision_key(metadata: Dict) -> Optional[ProvisionKey]:
+    provision_id = metadata.get("section_id") or metadata.get("article_id")
+    act = metadata.get("act_abbrev")
+    if not provision_id or not act:
+        return None
+    return act, normalize_provision_id(provision_id)
+
+
+def act_aliases(root: Optional[Path] = None) -> Dict[str, str]:
+    """Lower-cased act names ("indian penal code") to abbreviations, longest first."""
+    aliases = dict(_EXTRA_ALIASES)
+    for source in get_act_sources(root or Path(".")):
+        aliases[re.sub(r",?\s*\d{4}$", "", source.act).lower()] = source.act_abbrev
+    aliases["constitution of india"] = "COI"
+    return dict(sorted(aliases.items(), key=lambda item: -len(item[0])))
+
+
+def _expand_ids(ids: str) -> List[str]:
+    # "section 376 or section 376AB" lists ids with the keyword repeated.
+    ids = re.sub(rf"\b(?:{_KIND})\s+", "", ids, flags=re.IGNORECASE)
+    parts = re.split(r"\s*(,|and|or|to|-|–)\s*", ids, flags=re.IGNORECASE)
+    values = [normalize_provision_id(part) for part in parts[::2]]
+    separators = [part.lower() for part in parts[1::2]]
+    expanded = [values[0]]
+    for separator, value in zip(separators, values[1:]):
+        start = expanded[-1]
+        if separator in ("to", "-", "–") and start.isdigit() and value.isdigit():
+            span = range(int(start) + 1, int(value) + 1)
+            if len(span) <= _MAX_RANGE:
+                expanded.extend(str(number) for number in span)
+                continue
+        expanded.append(value)
+    return expanded
+
+
+def extract_references(text: str, act_abbrev: str, aliases: Dict[str, str]) -> List[ProvisionKey]:
+    """Provisions that `text` (from `act_abbrev`) refers to, in order of first mention.
+
+    Articles are the Constitution's; sections are the citing act's unless the
+    reference names another act. References to acts outside the corpus are
+    dropped.
+    """
+    found: "OrderedDict[ProvisionKey, None]" = OrderedDict()
+    for match in _REFERENCE.finditer(text):
+        is_article = match.group("kind").lower().startswith("art")
+        target: Optional[str] = "COI" if is_article else act_abbrev
+        act_text = " ".join((match.group("act") or "").split())
+        if act_text and _NAMES_AN_ACT.search(act_text):
+            lowered = act_text.lower()
+            target = next((abbrev for name, abbrev in aliases.items() if lowered.startswith(name)), None)
+            if target is None and lowered.startswith(_SAME_ACT):
+                target = act_abbrev
+        if target == "COI" and not is_article:
+            target = None  # "section 6 of the Government of India Act" and the like
+        if target is None:
+            continue
+        for provision_id in _expand_ids(match.group("ids")):
+            found[(target, provision_id)] = None
+    return list(found)
+
+
+def default_graph_path(root: Path) -> Path:
+    return root / GRAPH_FILE
+
+
+def version_graph_path(root: Path, index_name: str) -> Path:
+    """The graph built with one physical index version, kept by the index job."""
+    return root / CHECKPOINT_DIR / f"{index_name}.citation_graph.json"
+
+
+def promote_graph(root: Path, index_name: str) -> bool:
+    """Make the graph built with `index_name` the one retrieval loads.
+
+    Returns False, leaving the current graph alone, when none was saved for
+    that version (say, an index built before graphs were versioned).
+    """
+    source = version_graph_path(root, index_name)
+    if not source.exists():
+        return False
+    target = default_graph_path(root)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_suffix(target.suffix + ".tmp")
+    shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
+    return True
+
+
+class CitationGraph:
+    """Precomputed cross-references between provisions.
+
+    Built at index time from the corpus text and saved as JSON; lookups are
+    plain dict reads, so retrieval can follow references without another
+    LLM call or vector search. Keeps the stored (un-normalized) provision id
+    of every node, which is what provision lookups match on.
+    """
+
+    def __init__(
+        self,
+        cites: Optional[Dict[ProvisionKey, List[ProvisionKey]]] = None,
+        provision_ids: Optional[Dict[ProvisionKey, str]] = None,
+    ) -> None:
+        self.cites: Dict[ProvisionKey, List[ProvisionKey]] = cites or {}
+        self.provision_ids: Dict[ProvisionKey, str] = provision_ids or {}
+        self.cited_by: Dict[ProvisionKey, List[ProvisionKey]] = {}
+        for source, targets in self.cites.items():
+            for target in targets:
+                self.cited_by.setdefault(target, []).append(source)
+
+    @classmethod
+    def from_documents(cls, docs: Iterable[Document], root: Optional[Path] = None) -> "CitationGraph":
+        aliases = act_aliases(root)
+        texts: "OrderedDict[ProvisionKey, List[str]]" = OrderedDict()
+        provision_ids: Dict[ProvisionKey, str] = {}
+        for doc in docs:
+            key = provision_key(doc.metadata)
+            if key is None:
+                continue
+            provision_ids.setdefault(key, str(doc.metadata.get("section_id") or doc.metadata.get("article_id")))
+            texts.setdefault(key, []).append(doc.page_content)
+
+        cites: Dict[ProvisionKey, List[ProvisionKey]] = {}
+        for key, chunks in texts.items():
+            targets = [
+                target
+                for target in extract_references("\n".join(chunks), key[0], aliases)
+                if target != key and target in provision_ids
+            ]
+            if targets:
+                cites[key] = targets
+        return cls(cites, provision_ids)
+
+    def neighbours(
+        self,
+        key: ProvisionKey,
+        *,
+        limit: Optional[int] = None,
+        include_cited_by: bool = False,
+    ) -> List[ProvisionKey]:
+        """Provisions `key` cites, then (optionally) those citing it."""
+        found = list(self.cites.get(key, []))
+        if include_cited_by:
+            found.extend(source for source in self.cited_by.get(key, []) if source not in found)
+        return found[:limit] if limit is not None else found
+
+    def expand(
+        self,
+        keys: Iterable[ProvisionKey],
+        *,
+        max_neighbours: int,
+        exclude: Optional[Set[ProvisionKey]] = None,
+        acts: Optional[Set[str]] = None,
+        include_cited_by: bool = False,
+    ) -> List[Tuple[ProvisionKey, ProvisionKey]]:
+        """Up to `max_neighbours` (origin, neighbour) pairs, one hop from `keys` in order.
+
+        Neighbours already in `exclude` (the hits themselves) or outside
+        `acts` are skipped.
+        """
+        seen = set(exclude or ())
+        pairs: List[Tuple[ProvisionKey, ProvisionKey]] = []
+        for key in keys:
+            for neighbour in self.neighbours(key, include_cited_by=include_cited_by):
+                if len(pairs) >= max_neighbours:
+                    return pairs
+                if neighbour in seen or (acts is not None and neighbour[0] not in acts):
+                    continue
+                seen.add(neighbour)
+                pairs.append((key, neighbour))
+        return pairs
+
+    @property
+    def edge_count(self) -> int:
+        return sum(len(targets) for targets in self.cites.values())
+
+    def save(self, path: Path) -> None:
+        payload = {
+            "format": GRAPH_FORMAT,
+            "nodes": [[act, key_id, provision_id] for (act, key_id), provision_id in self.provision_ids.items()],
+            "cites": [[act, key_id, [list(target) for target in targets]] for (act, key_id), targets in self.cites.items()],
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "CitationGraph":
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        if payload.get("format") != GRAPH_FORMAT:
+            raise ValueError(f"{path} is not a {GRAPH_FORMAT} file")
+        provision_ids = {(act, key_id): provision_id for act, key_id, provision_id in payload["nodes"]}
+        cites = {
+            (act, key_id): [tuple(target) for target in targets]
+            for act, key_id, targets in payload["cites"]
+        }
+        return cls(cites, provision_ids)
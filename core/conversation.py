@@ -0,0 +1,136 @@
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.memory import (
+    compose_memory_context,
+    compose_relevant_memory_context,
+    extend_running_summary,
+    select_newly_archived,
+    turn_text,
+)
+
+
+MEMORY_MODES = ("window", "relevant")
+
+
+def serialize_sources(sources: List[Any]) -> List[Dict[str, Any]]:
+    """Documents (or dicts) as the {"metadata", "page_content"} dicts the chat store keeps."""
+    serialized = []
+    for source in sources:
+        if isinstance(source, dict):
+            metadata = source.get("metadata", {}) or {}
+            content = source.get("page_content", "")
+        else:
+            metadata = getattr(source, "metadata", {}) or {}
+            content = getattr(source, "page_content", "")
+        serialized.append({"metadata": metadata, "page_content": content})
+    return serialized
+
+
+def auto_title(query: str) -> str:
+    return " ".join(query.split())[:60].strip() or "New Chat"
+
+
+class ConversationService:
+    """One question/answer turn: memory in, chain stream out, turn persisted.
+
+    Shared by the Streamlit UI and any other front end, so every caller builds
+    memory and records turns the same way.
+    """
+
+    def __init__(
+        self,
+        chain,
+        chat_store,
+        *,
+        memory_mode: str = "window",
+        memory_embeddings=None,
+        memory_token_budget: int = 600,
+        recent_messages: int = 8,
+    ):
+        if memory_mode not in MEMORY_MODES:
+            raise ValueError(f"Unknown memory mode: {memory_mode}")
+        if memory_mode == "relevant" and memory_embeddings is None:
+            raise ValueError("memory_mode='relevant' needs memory_embeddings")
+        self.chain = chain
+        self.chat_store = chat_store
+        self.memory_mode = memory_mode
+        self.memory_embeddings = memory_embeddings
+        self.memory_token_budget = memory_token_budget
+        self.recent_messages = recent_messages
+
+    def _memory_context(
+        self,
+        thread_id: str,
+        query: str,
+        turn_messages: List[Dict[str, Any]],
+        summary: str,
+    ) -> str:
+        if self.memory_mode == "relevant":
+            turns = self.chat_store.get_turns(thread_id)
+            # Threads from before turns were embedded keep the window memory.
+            if turns or len(turn_messages) == 1:
+                return compose_relevant_memory_context(
+                    self.memory_embeddings.embed_query(query),
+                    turns,
+                    turn_messages[-3:-1],
+                    token_budget=self.memory_token_budget,
+                )
+        return compose_memory_context(
+            summary=summary,
+            messages=turn_messages,
+            recent_messages=self.recent_messages,
+        )
+
+    def stream_turn(
+        self,
+        thread_id: str,
+        query: str,
+        *,
+        act: Optional[str] = None,
+        title: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Chain events ("token", "done"), then a "saved" event with the new message ids.
+
+        The turn is written in a single record_turn transaction once the
+        answer is complete; nothing is stored if the stream fails.
+        """
+        history = self.chat_store.get_recent_messages(thread_id, limit=self.recent_messages + 6)
+        memory = self.chat_store.get_memory(thread_id)
+        summary = memory["summary"]
+        turn_messages = history + [{"role": "user", "content": query}]
+        memory_context = self._memory_context(thread_id, query, turn_messages, summary)
+
+        answer_text = ""
+        sources: List[Any] = []
+        for event in self.chain.stream({"query": query, "act": act, "chat_history": memory_context}):
+            event_type = event.get("type")
+            if event_type == "token":
+                answer_text += event.get("content", "")
+            elif event_type == "done":
+                answer_text = event.get("content", answer_text)
+                sources = event.get("sources", [])
+            yield event
+
+        turn_messages.append({"role": "assistant", "content": answer_text})
+        # Only messages pushed out of the recent window since the last turn
+        # are folded in, so each turn costs the same however long the thread.
+        archived, summarized_through = select_newly_archived(
+            turn_messages,
+            memory["summarized_through"],
+            recent_messages=self.recent_messages,
+        )
+        turn_embedding = None
+        if self.memory_mode == "relevant":
+            turn_embedding = self.memory_embeddings.embed_documents([turn_text(query, answer_text)])[0]
+
+        ids = self.chat_store.record_turn(
+            thread_id,
+            query,
+            answer_text,
+            serialize_sources(sources),
+            title=title,
+            summary=extend_running_summary(summary, archived) if archived else None,
+            summarized_through=summarized_through if archived else None,
+            turn_embedding=turn_embedding,
+        )
+        yield {"type": "saved", **ids}
@@ -0,0 +1,213 @@
+# Local stand-ins for Bedrock embeddings, the Bedrock chat model and the
+# OpenSearch vector store, so ingestion, retrieval and the answer chain can run
+# offline. Embeddings are deterministic hashed bag-of-words vectors; the
+# embedding and store fakes can simulate a service that slows down and
+# throttles once too many calls are in flight.
+
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+class ThrottlingError(Exception):
+    status_code = 429
+
+
+class _LoadModel:
+    """Latency grows with concurrency; calls beyond `capacity` are throttled."""
+
+    def __init__(self, *, capacity: Optional[int], base_latency: float, per_item_latency: float) -> None:
+        self.capacity = capacity
+        self.base_latency = base_latency
+        self.per_item_latency = per_item_latency
+        self.calls = 0
+        self.throttled = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def run(self, items: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self._in_flight += 1
+            in_flight = self._in_flight
+            if self.capacity is not None and in_flight > self.capacity:
+                self._in_flight -= 1
+                self.throttled += 1
+                raise ThrottlingError(f"ThrottlingException: {in_flight} concurrent calls > {self.capacity}")
+        try:
+            load = 1.0 + (in_flight / self.capacity if self.capacity else 0.0)
+            delay = (self.base_latency + self.per_item_latency * items) * load
+            if delay > 0:
+                time.sleep(delay)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+
+class FakeEmbeddings:
+    def __init__(
+        self,
+        dimensions: int = 256,
+        *,
+        capacity: Optional[int] = None,
+        base_latency: float = 0.0,
+        per_item_latency: float = 0.0,
+    ) -> None:
+        self.dimensions = dimensions
+        self.load = _LoadModel(capacity=capacity, base_latency=base_latency, per_item_latency=per_item_latency)
+
+    def _vector(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for token in _TOKEN.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.load.run(len(texts))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.load.run(1)
+        return self._vector(text)
+
+
+class FakeVectorStore:
+    def __init__(
+        self,
+        embedding_function: Optional[FakeEmbeddings] = None,
+        *,
+        index_name: str = "fake-index",
+        capacity: Optional[int] = None,
+        base_latency: float = 0.0,
+        per_item_latency: float = 0.0,
+    ) -> None:
+        self.embedding_function = embedding_function or FakeEmbeddings()
+        self.index_name = index_name
+        self.load = _LoadModel(capacity=capacity, base_latency=base_latency, per_item_latency=per_item_latency)
+        self.docs: Dict[str, Tuple[Document, List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def add_embeddings(
+        self,
+        text_embeddings: Iterable[Tuple[str, List[float]]],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        pairs = list(text_embeddings)
+        self.load.run(len(pairs))
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in pairs]
+        metadatas = metadatas or [{} for _ in pairs]
+        with self._lock:
+            for doc_id, (text, vector), metadata in zip(ids, pairs, metadatas):
+                self.docs[doc_id] = (Document(page_content=text, metadata=dict(metadata)), vector)
+        return ids
+
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        texts = [doc.page_content for doc in documents]
+        vectors = self.embedding_function.embed_documents(texts)
+        return self.add_embeddings(
+            zip(texts, vectors),
+            metadatas=[doc.metadata for doc in documents],
+            ids=ids,
+        )
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        query_vector = self.embedding_function.embed_query(query)
+        with self._lock:
+            entries = list(self.docs.values())
+        scored = sorted(
+            entries,
+            key=lambda entry: sum(a * b for a, b in zip(query_vector, entry[1])),
+            reverse=True,
+        )
+        return [doc for doc, _ in scored[:k]]
+
+
+_CITATION_LINE = re.compile(r"^\[([^\]\n]+)\]$", re.MULTILINE)
+
+
+def _prompt_field(text: str, label: str) -> str:
+    start = text.find(label)
+    if start < 0:
+        return ""
+    rest = text[start + len(label):]
+    return rest.split("\n\n", 1)[0].strip()
+
+
+class FakeChatModel(BaseChatModel):
+    """Answers the chain's three prompts without calling Bedrock.
+
+    Query expansion gets a one-query ExpandedQuery, the structured answer
+    prompt gets FinalAnswer JSON citing the context headers, and the streaming
+    prompt gets plain text, emitted word by word `token_latency` apart.
+    """
+
+    token_latency: float = 0.0
+    first_token_latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-legal-chat"
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        system = "\n".join(str(message.content) for message in messages if message.type == "system")
+        human = str(messages[-1].content) if messages else ""
+        query = _prompt_field(human, "User problem:\n") or _prompt_field(human, "Question:\n")
+        citations = [
+            citation for citation in dict.fromkeys(_CITATION_LINE.findall(human)) if citation != "None"
+        ][:3]
+
+        if "sub_queries" in system:
+            return json.dumps({"primary_issue": query, "sub_queries": [query]})
+        answer = (
+            f"Offline answer to: {query}\n\n"
+            + ("Relevant provisions: " + ", ".join(citations) + "." if citations else "Not found in provided context.")
+        )
+        if "cited_sections" in system:
+            return json.dumps({"answer": answer, "cited_sections": citations})
+        return answer
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.first_token_latency:
+            time.sleep(self.first_token_latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._reply(messages)))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        if self.first_token_latency:
+            time.sleep(self.first_token_latency)
+        for token in re.findall(r"\S+\s*", self._reply(messages)):
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager is not None:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
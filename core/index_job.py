@@ -1,79 +1,166 @@
+import argparse
 import sys
 from pathlib import Path
-from typing import List
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-from langchain_core.documents import Document
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
-from common.config import vectorstore
+from common.config import INDEX_NAME, LEGACY_INDEX_NAME, build_vectorstore, get_vectorstore
+from core.checkpoint import CheckpointManifest, batch_key
+from core.citations import CitationGraph, promote_graph, version_graph_path
+from core.index_schema import INDEX_SETTINGS, ensure_index
+from core.index_versions import (
+    adopt_legacy_index,
+    delete_doc_ids,
+    get_active_index,
+    new_version_name,
+    prune_versions,
+    rollback,
+    switch_alias,
+    validate_index,
+)
 from core.indexer import Indexer
-
-
-# # -------------------------------------------------
-# # Utility functions
-# # -------------------------------------------------
-# def _max_doc_length(docs: List[Document]) -> int:
-#     return max(len(doc.page_content) for doc in docs) if docs else 0
-
-
-def _batched(docs: List[Document], batch_size: int) -> List[List[Document]]:
-    return [docs[i:i + batch_size] for i in range(0, len(docs), batch_size)]
-
-
-# -------------------------------------------------
-# Threaded ingestion
-# -------------------------------------------------
-def _ingest_threaded(
-    vectorstore_client,
-    docs: List[Document],
-    batch_size: int,
-    max_workers: int = 4,
-) -> int:
-    batches = _batched(docs, batch_size)
-    total_ingested = 0
-
-    def upload_batch(batch: List[Document]) -> int:
-        vectorstore_client.add_documents(batch)
-        return len(batch)
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [
-            executor.submit(upload_batch, batch)
-            for batch in batches
-        ]
-
-        for future in as_completed(futures):
-            total_ingested += future.result()
-        print(f"Completed ingestion of {total_ingested} documents using {max_workers} workers.")
-
-    return total_ingested
+from core.ingest import AIMDLimiter, IngestAborted, IngestScheduler, batched
 
 
 # -------------------------------------------------
 # Entrypoint
 # -------------------------------------------------
-def main() -> None:
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build and ingest the legal corpus index.")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--max-embed-workers", type=int, default=16)
+    parser.add_argument("--max-write-workers", type=int, default=8)
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip batches already recorded in the checkpoint manifest.",
+    )
+    parser.add_argument(
+        "--no-switch",
+        action="store_true",
+        help="Build and validate a new version without pointing the read alias at it.",
+    )
+    parser.add_argument(
+        "--keep-versions",
+        type=int,
+        default=2,
+        help="Physical index versions to keep after a switch (active + rollback targets).",
+    )
+    parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="Point the read alias back at the previous version and exit.",
+    )
+    parser.add_argument(
+        "--adopt",
+        action="store_true",
+        help="Point the read alias at the legacy index if the alias doesn't exist yet, and exit.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = _parse_args(argv)
+    vectorstore = get_vectorstore()
+    adopted = adopt_legacy_index(vectorstore.client, INDEX_NAME, LEGACY_INDEX_NAME)
+    if adopted:
+        print(f"Alias {INDEX_NAME} created on the legacy index {adopted}.")
+    if args.adopt:
+        print(f"Alias {INDEX_NAME} points at {get_active_index(vectorstore.client, INDEX_NAME)}.")
+        return
+    if args.rollback:
+        restored = rollback(vectorstore.client, INDEX_NAME, legacy_index=LEGACY_INDEX_NAME)
+        print(f"Alias {INDEX_NAME} now points at {restored}.")
+        if not promote_graph(PROJECT_ROOT, restored):
+            print(f"No citation graph was saved with {restored}; keeping the current one.")
+        return
+
     root = PROJECT_ROOT
     indexer = Indexer()
 
     docs = indexer.build_all_documents(root)
 
-    # max_len = _max_doc_length(docs)
-
-    total = _ingest_threaded(
-        vectorstore_client=vectorstore,
-        docs=docs,
-        batch_size=128,
-        max_workers=4,   # tune based on API limits / infra
-    )
-
-    print(
-        f"Ingested {total} documents. "
-        # f"Max document length: {max_len} characters."
+    client = vectorstore.client
+    manifest = CheckpointManifest.for_index(root, INDEX_NAME)
+    batch_size = args.batch_size
+    target_index = None
+    if args.resume:
+        manifest.load()
+        target_index = manifest.header.get("target_index")
+        if target_index and not client.indices.exists(index=target_index):
+            print(f"{target_index} no longer exists; starting a new version.")
+            target_index = None
+
+    resumed = target_index is not None
+    if resumed:
+        # Batch keys depend on batch boundaries, so reuse the original size.
+        batch_size = int(manifest.header.get("batch_size") or batch_size)
+        print(f"Resuming {target_index}: {len(manifest.completed)} batches already ingested.")
+    else:
+        target_index = new_version_name(INDEX_NAME)
+        ensure_index(client, target_index, INDEX_SETTINGS)
+        print(f"Created index {target_index} ({INDEX_SETTINGS.label}).")
+        manifest.start(
+            alias=INDEX_NAME,
+            target_index=target_index,
+            batch_size=batch_size,
+            docs=len(docs),
+            index_settings=INDEX_SETTINGS.label,
+        )
+    target_store = build_vectorstore(target_index)
+
+    batches = batched(docs, batch_size)
+    pending = [batch for batch in batches if batch_key(batch) not in manifest.completed]
+    print(f"{len(pending)} of {len(batches)} batches to ingest.")
+    if resumed and pending:
+        # A batch written just before a crash may not be in the manifest, and
+        # serverless collections don't dedupe by id; clear what is there of
+        # the pending batches so rewriting them can't leave duplicates.
+        removed = delete_doc_ids(client, target_index, [doc.metadata["doc_id"] for batch in pending for doc in batch])
+        if removed:
+            print(f"Removed {removed} documents of unrecorded batches before rewriting them.")
+
+    scheduler = IngestScheduler(
+        target_store,
+        batch_size=batch_size,
+        embed_limiter=AIMDLimiter("embed", initial=2, maximum=args.max_embed_workers),
+        write_limiter=AIMDLimiter("write", initial=2, maximum=args.max_write_workers),
+        max_retries=args.max_retries,
+        abort_on_failure=True,
     )
+    try:
+        report = scheduler.run_batches(pending, on_batch_done=manifest.record)
+    except IngestAborted as exc:
+        report = exc.report
+        manifest.mark("aborted", errors=list(report.errors.values()))
+        print(report.summary())
+        for index in report.failed_batches:
+            print(f"Batch {index} failed: {report.errors[index]}")
+        print(f"Progress saved to {manifest.path}; rerun with --resume to continue.")
+        raise SystemExit(1)
+
+    print(report.summary())
+
+    validate_index(client, target_store, target_index, expected_docs=len(docs))
+    manifest.mark("completed", docs=len(docs))
+    print(f"Validated {target_index}.")
+
+    # Saved with this version; retrieval only sees it once the alias switches.
+    graph = CitationGraph.from_documents(docs, root)
+    graph.save(version_graph_path(root, target_index))
+    print(f"Citation graph: {len(graph.provision_ids)} provisions, {graph.edge_count} references.")
+
+    if args.no_switch:
+        print(f"Alias {INDEX_NAME} left on {get_active_index(client, INDEX_NAME)}.")
+        return
+    previous = switch_alias(client, INDEX_NAME, target_index)
+    print(f"Alias {INDEX_NAME}: {previous or '(none)'} -> {target_index}")
+    promote_graph(root, target_index)
+    for name in prune_versions(client, INDEX_NAME, keep=args.keep_versions):
+        version_graph_path(root, name).unlink(missing_ok=True)
+        print(f"Deleted old version {name}")
 
 
 if __name__ == "__main__":
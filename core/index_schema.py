@@ -0,0 +1,223 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from common.config import (
+    EMBEDDING_DIMENSION,
+    HNSW_EF_CONSTRUCTION,
+    HNSW_EF_SEARCH,
+    HNSW_ENGINE,
+    HNSW_M,
+    VECTOR_ENCODING,
+)
+
+# Bump whenever the mapping below changes; ensure_index refuses to write into an
+# index created from a different version unless it is recreated.
+SCHEMA_VERSION = 2
+
+TEXT_FIELD = "text"
+VECTOR_FIELD = "vector_field"
+
+VECTOR_ENCODINGS = ("float", "fp16", "byte")
+# Encodings each k-NN engine can store: fp16 is faiss scalar quantization,
+# byte vectors need the lucene engine, nmslib only takes floats. Serverless
+# collections (this repo's target) offer faiss and nmslib only, so byte
+# encoding applies to managed domains.
+ENGINE_ENCODINGS = {
+    "faiss": ("float", "fp16"),
+    "lucene": ("float", "byte"),
+    "nmslib": ("float",),
+}
+
+# Exact-match metadata used for filters, term lookups and citations.
+_KEYWORD_FIELDS = (
+    "act_abbrev",
+    "section_id",
+    "article_id",
+    "citation",
+    "source_type",
+    "chapter",
+    "chunk_index",
+    "jurisdiction",
+    "doc_id",
+)
+# Free text that is also useful to filter or aggregate on.
+_TEXT_WITH_KEYWORD_FIELDS = ("act", "source", "title", "chapter_title")
+
+
+@dataclass(frozen=True)
+class IndexSettings:
+    dimension: int = 1024
+    engine: str = "faiss"
+    space_type: str = "l2"
+    m: int = 16
+    ef_construction: int = 512
+    ef_search: int = 512
+    encoding: str = "float"
+
+    def __post_init__(self) -> None:
+        validate_settings(self)
+
+    @property
+    def label(self) -> str:
+        return f"{self.engine}-d{self.dimension}-m{self.m}-efc{self.ef_construction}-efs{self.ef_search}-{self.encoding}"
+
+
+def validate_settings(settings: IndexSettings) -> None:
+    if settings.encoding not in VECTOR_ENCODINGS:
+        raise ValueError(f"Unknown vector encoding: {settings.encoding}")
+    if settings.engine not in ENGINE_ENCODINGS:
+        raise ValueError(f"Unknown k-NN engine: {settings.engine}")
+    if settings.encoding not in ENGINE_ENCODINGS[settings.engine]:
+        raise ValueError(
+            f"{settings.encoding} encoding is not supported by the {settings.engine} engine "
+            f"(supported: {', '.join(ENGINE_ENCODINGS[settings.engine])})"
+        )
+
+
+# Built from the plain values in common/config.py.
+INDEX_SETTINGS = IndexSettings(
+    dimension=EMBEDDING_DIMENSION,
+    engine=HNSW_ENGINE,
+    m=HNSW_M,
+    ef_construction=HNSW_EF_CONSTRUCTION,
+    ef_search=HNSW_EF_SEARCH,
+    encoding=VECTOR_ENCODING,
+)
+
+
+def _vector_mapping(settings: IndexSettings) -> Dict[str, Any]:
+    parameters: Dict[str, Any] = {
+        "m": settings.m,
+        "ef_construction": settings.ef_construction,
+    }
+    if settings.engine == "faiss":
+        parameters["ef_search"] = settings.ef_search
+    if settings.encoding == "fp16":
+        parameters["encoder"] = {"name": "sq", "parameters": {"type": "fp16"}}
+
+    mapping: Dict[str, Any] = {
+        "type": "knn_vector",
+        "dimension": settings.dimension,
+        "method": {
+            "name": "hnsw",
+            "engine": settings.engine,
+            "space_type": settings.space_type,
+            "parameters": parameters,
+        },
+    }
+    if settings.encoding == "byte":
+        mapping["data_type"] = "byte"
+    return mapping
+
+
+def build_index_body(settings: IndexSettings) -> Dict[str, Any]:
+    validate_settings(settings)
+    metadata_properties: Dict[str, Any] = {
+        field: {"type": "keyword"} for field in _KEYWORD_FIELDS
+    }
+    for field in _TEXT_WITH_KEYWORD_FIELDS:
+        metadata_properties[field] = {
+            "type": "text",
+            "fields": {"keyword": {"type": "keyword", "ignore_above": 512}},
+        }
+    metadata_properties["raw_text"] = {"type": "text"}
+    metadata_properties["provision_num"] = {"type": "integer"}
+
+    index_settings: Dict[str, Any] = {"knn": True}
+    if settings.engine != "faiss":
+        index_settings["knn.algo_param.ef_search"] = settings.ef_search
+
+    return {
+        "settings": {"index": index_settings},
+        "mappings": {
+            "_meta": {
+                "schema_version": SCHEMA_VERSION,
+                "index_settings": settings.label,
+            },
+            "properties": {
+                TEXT_FIELD: {"type": "text"},
+                VECTOR_FIELD: _vector_mapping(settings),
+                "metadata": {"properties": metadata_properties},
+            },
+        },
+    }
+
+
+def _get_mappings(client, index_name: str) -> Dict[str, Any]:
+    mapping = client.indices.get_mapping(index=index_name)
+    body = mapping.get(index_name) or next(iter(mapping.values()), {})
+    return body.get("mappings", {})
+
+
+def get_schema_version(client, index_name: str):
+    return (_get_mappings(client, index_name).get("_meta") or {}).get("schema_version")
+
+
+def get_index_dimension(client, index_name: str):
+    vector = _get_mappings(client, index_name).get("properties", {}).get(VECTOR_FIELD, {})
+    return vector.get("dimension")
+
+
+def check_index_dimension(client, index_name: str, dimension: int) -> None:
+    """Fail fast when the configured embedding size does not match the index."""
+    indexed = get_index_dimension(client, index_name)
+    if indexed is not None and int(indexed) != dimension:
+        raise ValueError(
+            f"Index {index_name} stores {indexed}-dimensional vectors but embeddings are "
+            f"configured for {dimension}. Reindex or change EMBEDDING_DIMENSION."
+        )
+
+
+def ensure_index(client, index_name: str, settings: IndexSettings, *, recreate: bool = False) -> bool:
+    """Create `index_name` from the managed mapping; return True if it was created."""
+    exists = client.indices.exists(index=index_name)
+    if exists and recreate:
+        client.indices.delete(index=index_name)
+        exists = False
+    if exists:
+        check_index_dimension(client, index_name, settings.dimension)
+        version = get_schema_version(client, index_name)
+        if version != SCHEMA_VERSION:
+            raise RuntimeError(
+                f"Index {index_name} has schema version {version!r}, expected {SCHEMA_VERSION}. "
+                "Recreate it to apply the managed mapping."
+            )
+        return False
+    client.indices.create(index=index_name, body=build_index_body(settings))
+    return True
+
+
+def quantize_vector(vector: List[float], encoding: str) -> List[float]:
+    if encoding != "byte":
+        return vector
+    # Titan embeddings are normalized, so components lie in [-1, 1].
+    return [float(max(-128, min(127, round(value * 127)))) for value in vector]
+
+
+class IndexEmbeddings:
+    """Wraps an embedding function so every vector matches the index settings.
+
+    Vectors of the wrong size raise instead of reaching the index, and byte
+    encoding quantizes documents and queries the same way.
+    """
+
+    def __init__(self, base, settings: IndexSettings) -> None:
+        self.base = base
+        self.settings = settings
+
+    def _check(self, vector: List[float]) -> List[float]:
+        if len(vector) != self.settings.dimension:
+            raise ValueError(
+                f"Embedding has {len(vector)} dimensions, index expects {self.settings.dimension}"
+            )
+        return quantize_vector(vector, self.settings.encoding)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._check(vector) for vector in self.base.embed_documents(texts)]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._check(self.base.embed_query(text))
+
+
+def wrap_embeddings(embedding_function, settings: IndexSettings) -> IndexEmbeddings:
+    return IndexEmbeddings(embedding_function, settings)
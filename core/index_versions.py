@@ -0,0 +1,151 @@
+import time
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+# Queries every healthy build must answer before it is put behind the alias.
+SMOKE_QUERIES = (
+    "punishment for murder",
+    "grounds for divorce",
+    "right to equality",
+    "dishonour of cheque",
+)
+
+
+def new_version_name(alias: str) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    return f"{alias}-v{stamp}"
+
+
+def list_versions(client, alias: str) -> List[str]:
+    """Physical indices built for `alias`, oldest first (names sort by timestamp)."""
+    indices = client.indices.get(index=f"{alias}-v*")
+    return sorted(indices.keys())
+
+
+def get_active_index(client, alias: str) -> Optional[str]:
+    if not client.indices.exists_alias(name=alias):
+        return None
+    aliases = client.indices.get_alias(name=alias)
+    return next(iter(sorted(aliases.keys())), None)
+
+
+def switch_alias(client, alias: str, index_name: str) -> Optional[str]:
+    """Point `alias` at `index_name` in one atomic update; return the previous index."""
+    previous = get_active_index(client, alias)
+    actions = []
+    if previous and previous != index_name:
+        actions.append({"remove": {"index": previous, "alias": alias}})
+    actions.append({"add": {"index": index_name, "alias": alias}})
+    client.indices.update_aliases(body={"actions": actions})
+    return previous
+
+
+def adopt_legacy_index(client, alias: str, legacy_index: str) -> Optional[str]:
+    """Put `alias` on the pre-versioning index if nothing is behind it yet.
+
+    Reads go through the alias, so until the first versioned build switches
+    in, the alias has to point at the index the app used before. Returns the
+    adopted index, or None when there was nothing to do.
+    """
+    if client.indices.exists_alias(name=alias) or not client.indices.exists(index=legacy_index):
+        return None
+    switch_alias(client, alias, legacy_index)
+    return legacy_index
+
+
+def rollback(client, alias: str, legacy_index: Optional[str] = None) -> str:
+    """Point `alias` at the version before the active one, or at `legacy_index` past the first."""
+    active = get_active_index(client, alias)
+    older = [name for name in list_versions(client, alias) if active is None or name < active]
+    if not older and legacy_index and active != legacy_index and client.indices.exists(index=legacy_index):
+        older = [legacy_index]
+    if not older:
+        raise RuntimeError(f"No earlier version of {alias} to roll back to.")
+    switch_alias(client, alias, older[-1])
+    return older[-1]
+
+
+def prune_versions(client, alias: str, keep: int = 2) -> List[str]:
+    """Delete all but the newest `keep` versions, never touching the active one."""
+    active = get_active_index(client, alias)
+    versions = list_versions(client, alias)
+    stale = [name for name in versions[:-keep] if name != active] if keep > 0 else []
+    for name in stale:
+        client.indices.delete(index=name)
+    return stale
+
+
+def delete_doc_ids(client, index_name: str, doc_ids: List[str], chunk_size: int = 500) -> int:
+    """Delete every document whose metadata.doc_id is in `doc_ids`; returns how many.
+
+    Looks the documents up and deletes them by their _id, since serverless
+    collections neither accept custom _id values nor support delete-by-query.
+    Writes become searchable with a delay there, so run this on a job that
+    has stopped writing, not during ingestion.
+    """
+    deleted = 0
+    for start in range(0, len(doc_ids), chunk_size):
+        chunk = doc_ids[start:start + chunk_size]
+        # Duplicates of a doc_id are exactly what this clears, so allow several hits per id.
+        response = client.search(
+            index=index_name,
+            body={
+                "size": len(chunk) * 4,
+                "_source": False,
+                "query": {"terms": {"metadata.doc_id": chunk}},
+            },
+        )
+        hits = response.get("hits", {}).get("hits", [])
+        if not hits:
+            continue
+        client.bulk(body=[{"delete": {"_index": index_name, "_id": hit["_id"]}} for hit in hits])
+        deleted += len(hits)
+    return deleted
+
+
+def count_distinct_docs(client, index_name: str) -> int:
+    # Cardinality is exact below its precision threshold (40000), well above the corpus size.
+    response = client.search(
+        index=index_name,
+        body={
+            "size": 0,
+            "aggs": {"docs": {"cardinality": {"field": "metadata.doc_id", "precision_threshold": 40000}}},
+        },
+    )
+    return int(response["aggregations"]["docs"]["value"])
+
+
+def wait_for_count(client, index_name: str, expected: int, timeout: float = 300.0) -> int:
+    # Newly written documents become searchable asynchronously on serverless collections.
+    deadline = time.monotonic() + timeout
+    count = 0
+    while time.monotonic() < deadline:
+        count = client.count(index=index_name).get("count", 0)
+        if count >= expected:
+            break
+        time.sleep(5)
+    return count
+
+
+def validate_index(
+    client,
+    vectorstore,
+    index_name: str,
+    expected_docs: int,
+    *,
+    queries: Iterable[str] = SMOKE_QUERIES,
+    min_ratio: float = 0.99,
+) -> None:
+    """Raise unless the new index holds the corpus, once each, and answers the smoke queries."""
+    count = wait_for_count(client, index_name, expected_docs)
+    distinct = count_distinct_docs(client, index_name)
+    if count > distinct:
+        raise RuntimeError(
+            f"{index_name} holds {count} documents but only {distinct} distinct doc_ids; "
+            "a batch was written twice."
+        )
+    if distinct < expected_docs * min_ratio:
+        raise RuntimeError(f"{index_name} holds {distinct} distinct documents, expected {expected_docs}.")
+    for query in queries:
+        if not vectorstore.similarity_search(query, k=3):
+            raise RuntimeError(f"{index_name} returned no results for smoke query {query!r}.")
@@ -1,17 +1,29 @@
-import re
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from langchain_core.documents import Document
-from langchain_community.document_loaders import JSONLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from core.acts import get_act_sources, get_constitution_source
-from core.schema import build_metadata
+from core.loaders import load_all_records, normalize_text
+from core.schema import build_metadata, compact_metadata, document_id, make_document
 
 
 class Indexer:
-    def __init__(self, chunk_size: int = 900, overlap: int = 100) -> None:
+    def __init__(
+        self,
+        chunk_size: int = 900,
+        overlap: int = 100,
+        *,
+        loader: str = "native",
+        max_workers: Optional[int] = None,
+        compact: bool = True,
+    ) -> None:
+        if loader not in ("native", "jsonloader"):
+            raise ValueError(f"Unknown loader: {loader}")
+        self.loader = loader
+        self.max_workers = max_workers
+        self.compact = compact
         self._splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=overlap,
@@ -19,6 +31,24 @@ class Indexer:
         )
 
     def build_all_documents(self, root: Path) -> List[Document]:
+        if self.loader == "jsonloader":
+            docs = self._build_all_documents_jsonloader(root)
+        else:
+            sources = [get_constitution_source(root)] + get_act_sources(root)
+            records = load_all_records(sources, max_workers=self.max_workers)
+            docs = self._split_documents(
+                [make_document(record["text"], record["metadata"]) for record in records]
+            )
+
+        for doc in docs:
+            if self.compact:
+                doc.metadata = compact_metadata(doc.metadata)
+            # The document's _id, stored so keyword lookups have a unique sort key.
+            doc.metadata["doc_id"] = document_id(doc)
+        return docs
+
+    def _build_all_documents_jsonloader(self, root: Path) -> List[Document]:
+        # Legacy jq-based path, kept for benchmarking against the native loader.
         docs: List[Document] = []
 
         constitution = get_constitution_source(root)
@@ -46,10 +76,7 @@ class Indexer:
         return total
 
     def _normalize_text(self, text: str) -> str:
-        text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
-        text = re.sub(r"\n{3,}", "\n\n", text)
-        text = re.sub(r"[ \t]{2,}", " ", text)
-        return text.strip()
+        return normalize_text(text)
 
     def _split_documents(self, docs: List[Document]) -> List[Document]:
         split_docs: List[Document] = []
@@ -66,6 +93,8 @@ class Indexer:
         return split_docs
 
     def _load_act_documents(self, act: str, act_abbrev: str, json_path: Path) -> List[Document]:
+        from langchain_community.document_loaders import JSONLoader
+
         def _metadata_func(record: dict, metadata: dict) -> dict:
             section = record.get("section")
             if section is None:
@@ -118,6 +147,8 @@ class Indexer:
         return self._split_documents(docs)
 
     def _load_constitution_documents(self, json_path: Path) -> List[Document]:
+        from langchain_community.document_loaders import JSONLoader
+
         def _metadata_func(record: dict, metadata: dict) -> dict:
             article = str(record.get("article", "")).strip()
             title = (record.get("title") or "").strip()
@@ -0,0 +1,317 @@
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from langchain_core.documents import Document
+
+from core.schema import document_id
+
+
+_THROTTLE_MARKERS = (
+    "throttl",
+    "too many requests",
+    "rate exceeded",
+    "slow down",
+    "429",
+)
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    if status == 429:
+        return True
+    code = ""
+    response = getattr(exc, "response", None)
+    if isinstance(response, dict):
+        code = str(response.get("Error", {}).get("Code", ""))
+    text = f"{type(exc).__name__} {code} {exc}".lower()
+    return any(marker in text for marker in _THROTTLE_MARKERS)
+
+
+class AIMDLimiter:
+    """Concurrency limit tuned by additive-increase / multiplicative-decrease.
+
+    Every successful call grows the limit by roughly `increase` per window of
+    in-flight calls; a throttle, error or latency above target shrinks it by
+    `decrease`. Calls that started before the last decrease do not shrink it
+    again, so one burst of failures costs a single back-off step.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        initial: int = 2,
+        minimum: int = 1,
+        maximum: int = 16,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        target_latency: Optional[float] = None,
+        latency_factor: float = 3.0,
+        latency_floor: float = 0.05,
+    ) -> None:
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("AIMDLimiter requires 1 <= minimum <= initial <= maximum")
+        self.name = name
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self.latency_factor = latency_factor
+        self.latency_floor = latency_floor
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._min_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return max(self.minimum, int(self._limit))
+
+    def acquire(self) -> float:
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+        return time.monotonic()
+
+    def release(self, started: float, *, congested: bool = False) -> None:
+        now = time.monotonic()
+        latency = now - started
+        with self._cond:
+            self._in_flight -= 1
+            if not congested:
+                if self._min_latency is None or latency < self._min_latency:
+                    self._min_latency = latency
+                target = self.target_latency
+                if target is None and self._min_latency is not None:
+                    # The floor stops sub-millisecond jitter on fast calls reading as congestion.
+                    target = max(self.latency_floor, self._min_latency * self.latency_factor)
+                congested = target is not None and latency > target
+
+            if congested:
+                if started >= self._last_decrease:
+                    self._limit = max(float(self.minimum), self._limit * self.decrease)
+                    self._last_decrease = now
+            else:
+                self._limit = min(float(self.maximum), self._limit + self.increase / max(self._limit, 1.0))
+            self._cond.notify_all()
+
+
+@dataclass
+class IngestReport:
+    docs: int = 0
+    batches: int = 0
+    skipped_batches: int = 0
+    retries: int = 0
+    throttled: int = 0
+    seconds: float = 0.0
+    embed_concurrency: int = 0
+    write_concurrency: int = 0
+    failed_batches: List[int] = field(default_factory=list)
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def docs_per_sec(self) -> float:
+        return self.docs / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Ingested {self.docs} documents in {self.batches} batches "
+            f"({self.seconds:.1f}s, {self.docs_per_sec:.1f} docs/sec); "
+            f"skipped={self.skipped_batches} retries={self.retries} throttled={self.throttled} "
+            f"failed={len(self.failed_batches)}; "
+            f"final concurrency embed={self.embed_concurrency} write={self.write_concurrency}"
+        )
+
+
+class IngestAborted(RuntimeError):
+    def __init__(self, report: IngestReport) -> None:
+        failed = ", ".join(str(index) for index in report.failed_batches)
+        super().__init__(f"Ingestion aborted after batch failure(s): {failed}")
+        self.report = report
+
+
+def batched(docs: Sequence[Document], batch_size: int) -> List[List[Document]]:
+    return [list(docs[i:i + batch_size]) for i in range(0, len(docs), batch_size)]
+
+
+class IngestScheduler:
+    """Two-stage bulk ingestion: embed batches, then bulk-write the vectors.
+
+    Each stage has its own `AIMDLimiter`, so a throttled embedding API and a
+    saturated vector store back off independently. Stores without
+    `add_embeddings` fall back to `add_documents` in the write stage.
+
+    With `abort_on_failure`, the first batch that exhausts its retries stops
+    new batches from starting; in-flight batches finish and `IngestAborted`
+    is raised once the pools drain.
+    """
+
+    def __init__(
+        self,
+        vectorstore,
+        *,
+        embedding_function=None,
+        batch_size: int = 64,
+        embed_limiter: Optional[AIMDLimiter] = None,
+        write_limiter: Optional[AIMDLimiter] = None,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        split_stages: bool = True,
+        abort_on_failure: bool = False,
+    ) -> None:
+        self.vectorstore = vectorstore
+        self.embedding_function = embedding_function or getattr(vectorstore, "embedding_function", None)
+        self.batch_size = batch_size
+        self.embed_limiter = embed_limiter or AIMDLimiter("embed", initial=2, maximum=16)
+        self.write_limiter = write_limiter or AIMDLimiter("write", initial=2, maximum=8)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.abort_on_failure = abort_on_failure
+        self._abort = threading.Event()
+        self._lock = threading.Lock()
+        self._report = IngestReport()
+        self._split_stages = (
+            split_stages
+            and self.embedding_function is not None
+            and hasattr(vectorstore, "add_embeddings")
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retried batches from hitting the API in lockstep.
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _call(self, limiter: AIMDLimiter, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        attempt = 0
+        while True:
+            started = limiter.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                limiter.release(started, congested=True)
+                with self._lock:
+                    if is_throttle_error(exc):
+                        self._report.throttled += 1
+                    if attempt >= self.max_retries:
+                        raise
+                    self._report.retries += 1
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            limiter.release(started)
+            return result
+
+    def _embed(self, batch: List[Document]) -> List[List[float]]:
+        texts = [doc.page_content for doc in batch]
+        return self._call(self.embed_limiter, self.embedding_function.embed_documents, texts)
+
+    def _write(self, batch: List[Document], vectors: Optional[List[List[float]]]) -> None:
+        # Content-derived IDs. Managed domains use them as _id, so a re-sent
+        # batch overwrites itself there; serverless collections reject custom
+        # _id values (LangChain stores them in an "id" field instead), so a
+        # re-sent batch is duplicated unless its doc_ids are deleted first, as
+        # the index job does on --resume.
+        ids = [document_id(doc) for doc in batch]
+        if vectors is None:
+            self._call(self.write_limiter, self.vectorstore.add_documents, batch, ids=ids)
+            return
+        self._call(
+            self.write_limiter,
+            self.vectorstore.add_embeddings,
+            list(zip([doc.page_content for doc in batch], vectors)),
+            metadatas=[doc.metadata for doc in batch],
+            ids=ids,
+        )
+
+    def _record_failure(self, index: int, exc: BaseException) -> None:
+        with self._lock:
+            self._report.failed_batches.append(index)
+            self._report.errors[index] = f"{type(exc).__name__}: {exc}"
+        if self.abort_on_failure:
+            self._abort.set()
+
+    def _record_success(self, batch: List[Document]) -> None:
+        with self._lock:
+            self._report.docs += len(batch)
+            self._report.batches += 1
+
+    def _record_skip(self) -> None:
+        with self._lock:
+            self._report.skipped_batches += 1
+
+    def run(
+        self,
+        docs: Sequence[Document],
+        *,
+        on_batch_done: Optional[Callable[[List[Document]], None]] = None,
+    ) -> IngestReport:
+        return self.run_batches(batched(docs, self.batch_size), on_batch_done=on_batch_done)
+
+    def run_batches(
+        self,
+        batches: Sequence[List[Document]],
+        *,
+        on_batch_done: Optional[Callable[[List[Document]], None]] = None,
+    ) -> IngestReport:
+        self._report = IngestReport()
+        self._abort.clear()
+        started = time.perf_counter()
+
+        embed_pool = ThreadPoolExecutor(max_workers=self.embed_limiter.maximum, thread_name_prefix="embed")
+        write_pool = ThreadPoolExecutor(max_workers=self.write_limiter.maximum, thread_name_prefix="write")
+        write_futures: List[Future] = []
+        futures_lock = threading.Lock()
+
+        def write_stage(index: int, batch: List[Document], vectors) -> None:
+            if self._abort.is_set():
+                self._record_skip()
+                return
+            try:
+                self._write(batch, vectors)
+                if on_batch_done is not None:
+                    # A batch that was written but not checkpointed counts as
+                    # failed; rewriting it on resume is safe (content-derived ids).
+                    on_batch_done(batch)
+            except Exception as exc:
+                self._record_failure(index, exc)
+                return
+            self._record_success(batch)
+
+        def embed_stage(index: int, batch: List[Document]) -> None:
+            if self._abort.is_set():
+                self._record_skip()
+                return
+            try:
+                vectors = self._embed(batch) if self._split_stages else None
+            except Exception as exc:
+                self._record_failure(index, exc)
+                return
+            with futures_lock:
+                write_futures.append(write_pool.submit(write_stage, index, batch, vectors))
+
+        try:
+            embed_futures = [embed_pool.submit(embed_stage, i, batch) for i, batch in enumerate(batches)]
+            wait(embed_futures)
+            with futures_lock:
+                pending = list(write_futures)
+            wait(pending)
+        finally:
+            embed_pool.shutdown(wait=True)
+            write_pool.shutdown(wait=True)
+
+        report = self._report
+        report.seconds = time.perf_counter() - started
+        report.failed_batches.sort()
+        report.embed_concurrency = self.embed_limiter.limit
+        report.write_concurrency = self.write_limiter.limit
+        if self._abort.is_set():
+            raise IngestAborted(report)
+        return report
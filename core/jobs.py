@@ -0,0 +1,199 @@
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class TokenRingBuffer:
+    """Bounded buffer of streamed chunks with absolute sequence numbers.
+
+    Readers keep the sequence number they have seen and ask for what came
+    after it. A reader that falls more than `capacity` chunks behind is told
+    so (`gap=True`) and can resync from the job's full text.
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self._chunks: deque = deque(maxlen=capacity)
+        self._next_seq = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def append(self, chunk: str) -> None:
+        with self._cond:
+            self._chunks.append(chunk)
+            self._next_seq += 1
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def read(self, since: int = 0) -> Tuple[List[str], int, bool]:
+        """(chunks after `since`, next sequence number, whether some were lost)."""
+        with self._cond:
+            first_seq = self._next_seq - len(self._chunks)
+            gap = since < first_seq
+            start = max(since, first_seq) - first_seq
+            return list(self._chunks)[start:], self._next_seq, gap
+
+    def wait(self, since: int, timeout: Optional[float] = None) -> bool:
+        """Block until there is something after `since` or the buffer is closed."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._next_seq > since or self._closed, timeout)
+
+
+class GenerationJob:
+    def __init__(self, thread_id: str, query: str, *, buffer_size: int = 4096) -> None:
+        self.job_id = uuid.uuid4().hex
+        self.thread_id = thread_id
+        self.query = query
+        self.status = "queued"  # queued -> running -> done | failed
+        self.buffer = TokenRingBuffer(buffer_size)
+        self.text = ""
+        self.sources: List[Any] = []
+        self.result: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def emit(self, chunk: str) -> None:
+        with self._lock:
+            self.text += chunk
+            self.buffer.append(chunk)
+
+    def checkpoint(self) -> Tuple[str, int]:
+        """Text so far and the sequence number it runs up to, read consistently.
+
+        For readers that fell out of the buffer's window and need to resync.
+        """
+        with self._lock:
+            return self.text, self.buffer.read(0)[1]
+
+    def _finish(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        self.buffer.close()
+        self._done.set()
+
+    def stream(self, since: int = 0, poll: float = 0.5) -> Iterator[str]:
+        """Chunks from `since` until the job finishes; for consumers such as SSE."""
+        seq = since
+        while True:
+            chunks, seq, _ = self.buffer.read(seq)
+            yield from chunks
+            if self.buffer.closed and not chunks:
+                return
+            self.buffer.wait(seq, timeout=poll)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "thread_id": self.thread_id,
+            "query": self.query,
+            "status": self.status,
+            "text": self.text,
+            "error": self.error,
+            **self.result,
+        }
+
+
+class JobManager:
+    """Runs generations on a worker pool, at most one active job per chat thread.
+
+    Jobs outlive the request or script run that started them; finished jobs
+    stay visible for `keep_finished` seconds so a client can pick up the end.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = 4,
+        buffer_size: int = 4096,
+        keep_finished: float = 300.0,
+    ) -> None:
+        self.buffer_size = buffer_size
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="generation")
+        self._jobs: Dict[str, GenerationJob] = {}
+        self._lock = threading.Lock()
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self.keep_finished
+        for thread_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[thread_id]
+
+    def submit(
+        self,
+        thread_id: str,
+        query: str,
+        events: Callable[[], Iterator[Dict[str, Any]]],
+    ) -> GenerationJob:
+        """Start `events()` (a chain/turn event stream) in the background.
+
+        Raises RuntimeError if the thread already has a job in progress.
+        """
+        with self._lock:
+            self._purge()
+            current = self._jobs.get(thread_id)
+            if current is not None and not current.finished:
+                raise RuntimeError(f"Thread {thread_id} already has a generation in progress")
+            job = GenerationJob(thread_id, query, buffer_size=self.buffer_size)
+            self._jobs[thread_id] = job
+        self._executor.submit(self._run, job, events)
+        return job
+
+    @staticmethod
+    def _run(job: GenerationJob, events: Callable[[], Iterator[Dict[str, Any]]]) -> None:
+        job.status = "running"
+        try:
+            for event in events():
+                event_type = event.get("type")
+                if event_type == "token":
+                    job.emit(event.get("content", ""))
+                elif event_type == "done":
+                    job.text = event.get("content", job.text)
+                    job.sources = event.get("sources", [])
+                elif event_type == "saved":
+                    job.result = {key: value for key, value in event.items() if key != "type"}
+        except Exception as exc:
+            job._finish("failed", f"{type(exc).__name__}: {exc}")
+        else:
+            job._finish("done")
+
+    def get(self, thread_id: str) -> Optional[GenerationJob]:
+        with self._lock:
+            self._purge()
+            return self._jobs.get(thread_id)
+
+    def pop_finished(self, thread_id: str) -> Optional[GenerationJob]:
+        """Remove and return the thread's job if it has finished."""
+        with self._lock:
+            job = self._jobs.get(thread_id)
+            if job is not None and job.finished:
+                return self._jobs.pop(thread_id)
+            return None
+
+    def active(self) -> List[GenerationJob]:
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.finished]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
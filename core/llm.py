@@ -1,10 +1,12 @@
-from langchain_aws import ChatBedrockConverse
-from common.aws_setup import bedrock_client
+from common.aws_setup import get_bedrock_client
+from common.config import LLM_MODEL, LLM_TEMPERATURE
 
 
-def get_answer_llm() -> ChatBedrockConverse:
+def get_answer_llm():
+    from langchain_aws import ChatBedrockConverse
+
     return ChatBedrockConverse(
-    client=bedrock_client,
-    model="us.anthropic.claude-3-haiku-20240307-v1:0",
-    temperature=0.4
+        client=get_bedrock_client(),
+        model=LLM_MODEL,
+        temperature=LLM_TEMPERATURE,
     )
@@ -0,0 +1,211 @@
+import csv
+import io
+import json
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from core.acts import ActSource
+from core.schema import build_metadata
+
+
+# Field spellings used across the act dumps, in lookup order.
+_SECTION_KEYS = ("section", "Section")
+_TITLE_KEYS = ("section_title", "title")
+_DESCRIPTION_KEYS = ("section_desc", "Section_desc", "description")
+
+# A CSV-packed row starts with "<chapter>,<section>," e.g. `4,13A,Divorce,...`.
+_CSV_ROW_START = re.compile(r"^\s*\d+\s*,\s*\d+[A-Za-z]*\s*,")
+
+
+def normalize_text(text: str) -> str:
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = re.sub(r"[ \t]{2,}", " ", text)
+    return text.strip()
+
+
+def _clean_inline(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    cleaned = " ".join(str(value).split())
+    return cleaned or None
+
+
+def _first(record: Dict[str, Any], keys: Sequence[str]) -> Any:
+    for key in keys:
+        value = record.get(key)
+        if value is not None and value != "":
+            return value
+    return None
+
+
+def _make_record(text: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    return {"text": text, "metadata": metadata}
+
+
+def _with_heading(heading: Optional[str], description: str) -> str:
+    normalized = normalize_text(description)
+    return f"{heading}\n{normalized}" if heading else normalized
+
+
+def _is_csv_packed(rows: List[Dict[str, Any]]) -> bool:
+    return bool(rows) and all(len(row) == 1 and "," in next(iter(row)) for row in rows)
+
+
+def _unpack_csv_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Rebuild records from a CSV file that was converted to JSON line by line.
+
+    Each JSON row holds one physical line of the CSV under the packed header key,
+    so quoted multi-line descriptions are spread over several rows (and often lose
+    their closing quote). Lines are regrouped on the `<chapter>,<section>,` prefix.
+    """
+    header = [name.strip() for name in next(iter(rows[0])).split(",")]
+    blocks: List[List[str]] = []
+    for row in rows:
+        line = str(next(iter(row.values())) or "")
+        if _CSV_ROW_START.match(line) or not blocks:
+            blocks.append([line])
+        else:
+            blocks[-1].append(line)
+
+    records: List[Dict[str, Any]] = []
+    for block in blocks:
+        text = "\n".join(block)
+        if text.count('"') % 2:
+            text += '"'
+        parsed = next(csv.reader(io.StringIO(text)), [])
+        if len(parsed) < len(header):
+            continue
+        # Anything past the last column belongs to an unquoted description.
+        values = parsed[:len(header) - 1] + [",".join(parsed[len(header) - 1:])]
+        records.append(dict(zip(header, values)))
+    return records
+
+
+def parse_section_records(
+    rows: Iterable[Dict[str, Any]],
+    *,
+    act: str,
+    act_abbrev: str,
+) -> List[Dict[str, Any]]:
+    rows = list(rows)
+    if _is_csv_packed(rows):
+        rows = _unpack_csv_rows(rows)
+
+    records: List[Dict[str, Any]] = []
+    for row in rows:
+        description = str(_first(row, _DESCRIPTION_KEYS) or "").strip()
+        if not description:
+            continue
+        section = _first(row, _SECTION_KEYS)
+        section_id = str(section).strip() if section is not None else None
+        title = _clean_inline(_first(row, _TITLE_KEYS))
+        chapter = row.get("chapter")
+        chapter_title = _clean_inline(row.get("chapter_title"))
+
+        heading = f"Section {section_id}. {title or ''}".strip() if section_id else title
+        metadata = build_metadata(
+            act=act,
+            act_abbrev=act_abbrev,
+            jurisdiction="India",
+            source_type="section",
+            title=title,
+            chapter=str(chapter).strip() if chapter not in (None, "") else None,
+            chapter_title=chapter_title,
+            section_id=section_id or None,
+            raw_text=description,
+        )
+        records.append(_make_record(_with_heading(heading, description), metadata))
+    return records
+
+
+def parse_article_records(
+    rows: Iterable[Dict[str, Any]],
+    *,
+    act: str,
+    act_abbrev: str,
+) -> List[Dict[str, Any]]:
+    records: List[Dict[str, Any]] = []
+    for row in rows:
+        description = str(row.get("description") or "").strip()
+        if not description:
+            continue
+        article = row.get("article")
+        article_id = str(article).strip() if article is not None else None
+        title = _clean_inline(row.get("title"))
+
+        heading = f"Article {article_id}. {title or ''}".strip() if article_id else title
+        metadata = build_metadata(
+            act=act,
+            act_abbrev=act_abbrev,
+            jurisdiction="India",
+            source_type="article",
+            title=title,
+            article_id=article_id or None,
+            raw_text=description,
+        )
+        records.append(_make_record(_with_heading(heading, description), metadata))
+    return records
+
+
+def read_json_rows(json_path: Path) -> List[Dict[str, Any]]:
+    with open(json_path, "r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    return [row for row in data if isinstance(row, dict)]
+
+
+def read_sqlite_rows(db_path: Path, table: str) -> List[Dict[str, Any]]:
+    # Read-only URI so a shared corpus DB is never locked or modified by the indexer.
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        connection.row_factory = sqlite3.Row
+        rows = connection.execute(f'SELECT * FROM "{table}"').fetchall()
+    finally:
+        connection.close()
+    return [dict(row) for row in rows]
+
+
+def _source_rows(source: ActSource, prefer_db: Optional[bool]) -> List[Dict[str, Any]]:
+    has_db = bool(source.db_path and source.db_table and source.db_path.exists())
+    use_db = source.prefer_db if prefer_db is None else prefer_db
+    if has_db and (use_db or not source.file_path.exists()):
+        return read_sqlite_rows(source.db_path, source.db_table)
+    if source.file_path.exists():
+        return read_json_rows(source.file_path)
+    return []
+
+
+def load_source_records(source: ActSource, prefer_db: Optional[bool] = None) -> List[Dict[str, Any]]:
+    """Parse one act into `{"text", "metadata"}` records.
+
+    `prefer_db=None` follows the source's own preference; True/False force the
+    SQLite table or the JSON file when both are available.
+    """
+    rows = _source_rows(source, prefer_db)
+    if source.source_type == "article":
+        return parse_article_records(rows, act=source.act, act_abbrev=source.act_abbrev)
+    return parse_section_records(rows, act=source.act, act_abbrev=source.act_abbrev)
+
+
+def load_all_records(
+    sources: Sequence[ActSource],
+    *,
+    max_workers: Optional[int] = None,
+    prefer_db: Optional[bool] = None,
+) -> List[Dict[str, Any]]:
+    """Load independent acts in a process pool, preserving source order."""
+    if max_workers == 1 or len(sources) <= 1:
+        per_source = [load_source_records(source, prefer_db) for source in sources]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            per_source = list(
+                executor.map(load_source_records, sources, [prefer_db] * len(sources))
+            )
+
+    records: List[Dict[str, Any]] = []
+    for source_records in per_source:
+        records.extend(source_records)
+    return records
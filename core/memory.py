@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Any
+import math
+from typing import Any, Sequence
 
 
 def _normalize_text(text: str, max_chars: int) -> str:
@@ -37,6 +38,64 @@ def build_running_summary(
     return _normalize_text(merged, max_chars)
 
 
+def select_newly_archived(
+    messages: list[dict[str, Any]],
+    summarized_through: int,
+    *,
+    recent_messages: int = 8,
+) -> tuple[list[dict[str, Any]], int]:
+    """Messages that left the recent window since the last summary update.
+
+    `messages` is the newest part of the thread, oldest first; messages without
+    a `message_id` (not stored yet) must be at the end. Returns the messages to
+    fold into the summary and the new watermark.
+    """
+    archived = messages[:-recent_messages] if recent_messages > 0 else list(messages)
+    fresh = [
+        message
+        for message in archived
+        if message.get("message_id") is not None and message["message_id"] > summarized_through
+    ]
+    if not fresh:
+        return [], summarized_through
+    return fresh, max(message["message_id"] for message in fresh)
+
+
+def _summary_lines(summary: str, max_chars: int) -> list[str]:
+    lines = [line for line in summary.splitlines() if line.strip()]
+    if len(lines) == 1 and not lines[0].startswith("- "):
+        # `build_running_summary` collapsed everything onto one line; split it
+        # back into its entries so the oldest can be trimmed one at a time.
+        head, *entries = lines[0].split(" - ")
+        lines = [head, *(f"- {entry}" for entry in entries)]
+    return [line if len(line) <= max_chars else _normalize_text(line, max_chars) for line in lines]
+
+
+def extend_running_summary(
+    existing_summary: str,
+    new_messages: list[dict[str, Any]],
+    *,
+    max_chars: int = 2500,
+) -> str:
+    """Append one line per new message, dropping the oldest lines past `max_chars`.
+
+    The work per call depends only on `new_messages` and the bounded summary,
+    not on the length of the thread.
+    """
+    lines = _summary_lines(existing_summary, max_chars)
+    lines.extend(f"- {_to_line(message)}" for message in new_messages)
+
+    kept: list[str] = []
+    size = 0
+    for line in reversed(lines):
+        if kept and size + len(line) + 1 > max_chars:
+            break
+        kept.append(line)
+        size += len(line) + 1
+    summary = "\n".join(reversed(kept))
+    return summary if len(summary) <= max_chars else _normalize_text(summary, max_chars)
+
+
 def compose_memory_context(
     summary: str,
     messages: list[dict[str, Any]],
@@ -55,3 +114,82 @@ def compose_memory_context(
     if not parts:
         return "No prior conversation."
     return "\n\n".join(parts)
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough count for budgeting prompts: ~4 characters per token in English.
+    return (len(text) + 3) // 4
+
+
+def turn_text(question: str, answer: str, *, max_chars: int = 1200) -> str:
+    """The text embedded for a stored turn."""
+    return _normalize_text(f"User: {question}\nAssistant: {answer}", max_chars)
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def rank_turns(
+    query_vector: Sequence[float],
+    turns: list[dict[str, Any]],
+    *,
+    min_score: float = 0.35,
+) -> list[tuple[float, dict[str, Any]]]:
+    """Turns scoring at least `min_score` against the query, best first."""
+    scored = [(_cosine(query_vector, turn["vector"]), turn) for turn in turns]
+    return sorted(
+        (item for item in scored if item[0] >= min_score),
+        key=lambda item: item[0],
+        reverse=True,
+    )
+
+
+def compose_relevant_memory_context(
+    query_vector: Sequence[float],
+    turns: list[dict[str, Any]],
+    recent: list[dict[str, Any]],
+    *,
+    token_budget: int = 600,
+    min_score: float = 0.35,
+    max_turns: int = 4,
+    max_chars_per_message: int = 400,
+) -> str:
+    """Memory made of the turns most relevant to the query, within `token_budget`.
+
+    `recent` (normally the previous turn) is always kept for follow-up
+    questions; the remaining budget goes to earlier turns in order of
+    relevance (at most `max_turns`, repeats skipped), which are then listed in
+    conversation order. Turns below `min_score` are dropped entirely.
+    """
+    recent_lines = [_to_line(message) for message in recent]
+    budget = token_budget - estimate_tokens("\n".join(recent_lines))
+    recent_ids = {message.get("message_id") for message in recent}
+
+    chosen: list[tuple[int, str]] = []
+    seen: set[str] = set()
+    for _, turn in rank_turns(query_vector, turns, min_score=min_score):
+        if len(chosen) >= max_turns:
+            break
+        if turn["message_id"] in recent_ids:
+            continue
+        question = _normalize_text(turn["question"], max_chars_per_message)
+        answer = _normalize_text(turn["answer"], max_chars_per_message)
+        block = f"- User: {question}\n  Assistant: {answer}"
+        cost = estimate_tokens(block)
+        if block in seen or cost > budget:
+            continue
+        seen.add(block)
+        budget -= cost
+        chosen.append((turn["message_id"], block))
+
+    parts = []
+    if chosen:
+        parts.append("Relevant earlier conversation:\n" + "\n".join(block for _, block in sorted(chosen)))
+    if recent_lines:
+        parts.append("Recent messages:\n" + "\n".join(recent_lines))
+    if not parts:
+        return "No prior conversation."
+    return "\n\n".join(parts)
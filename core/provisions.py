@@ -0,0 +1,303 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from core.citations import normalize_provision_id, provision_key
+from core.index_schema import TEXT_FIELD, get_schema_version
+from core.search import SOURCE_METADATA_FIELDS, hits_to_documents
+
+
+_PAGE_SIZE = 500
+# The term filters and sorts below need the keyword/integer fields of the
+# managed mapping; version 2 added doc_id, the unique tiebreaker.
+_MIN_SCHEMA_VERSION = 2
+_SORT = [
+    {"metadata.provision_num": {"order": "asc", "unmapped_type": "integer"}},
+    {"metadata.section_id": {"order": "asc", "unmapped_type": "keyword"}},
+    {"metadata.article_id": {"order": "asc", "unmapped_type": "keyword"}},
+    {"metadata.chunk_index": {"order": "asc", "unmapped_type": "keyword"}},
+    # Unique last key, so search_after never skips or repeats tied hits.
+    {"metadata.doc_id": {"order": "asc", "unmapped_type": "keyword"}},
+]
+
+
+class ProvisionIndexError(RuntimeError):
+    """The index behind the store predates the managed mapping keyword lookups rely on."""
+
+
+def _merge_overlap(text: str, chunk: str, max_overlap: int = 300) -> str:
+    # Splitter chunks overlap; drop the repeated prefix before appending.
+    for size in range(min(len(text), len(chunk), max_overlap), 0, -1):
+        if text.endswith(chunk[:size]):
+            return text + chunk[size:]
+    return f"{text}\n{chunk}"
+
+
+def _chunk_order(doc: Document) -> int:
+    try:
+        return int(doc.metadata.get("chunk_index") or 0)
+    except ValueError:
+        return 0
+
+
+def stitch_chunks(docs: List[Document]) -> List[Document]:
+    """Merge clause chunks back into one Document per provision, in input order."""
+    groups: "OrderedDict[Tuple[Any, ...], List[Document]]" = OrderedDict()
+    for doc in docs:
+        metadata = doc.metadata
+        key = (metadata.get("act_abbrev"), metadata.get("section_id"), metadata.get("article_id"))
+        groups.setdefault(key, []).append(doc)
+
+    stitched = []
+    for chunks in groups.values():
+        chunks.sort(key=_chunk_order)
+        text = chunks[0].page_content
+        for chunk in chunks[1:]:
+            text = _merge_overlap(text, chunk.page_content)
+        metadata = dict(chunks[0].metadata)
+        metadata.pop("chunk_index", None)
+        metadata["source_type"] = "article" if metadata.get("article_id") else "section"
+        stitched.append(Document(page_content=text, metadata=metadata))
+    return stitched
+
+
+class ProvisionStore:
+    """Keyword lookups of whole provisions, without a vector search.
+
+    Results are cached in an LRU. When `index_version` is given, it is polled at
+    most every `version_ttl` seconds and the cache is dropped when the alias
+    moves to a new physical index.
+    """
+
+    def __init__(
+        self,
+        vectorstore,
+        *,
+        cache_size: int = 256,
+        index_version: Optional[Callable[[], Optional[str]]] = None,
+        version_ttl: float = 60.0,
+    ) -> None:
+        self.vectorstore = vectorstore
+        self.cache_size = cache_size
+        self._index_version = index_version
+        self._version_ttl = version_ttl
+        self._version: Optional[str] = None
+        self._version_checked = 0.0
+        self._schema_ok = False
+        self._cache: "OrderedDict[Tuple[Any, ...], List[Document]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _check_version(self) -> None:
+        if self._index_version is None:
+            return
+        now = time.monotonic()
+        if now - self._version_checked < self._version_ttl:
+            return
+        self._version_checked = now
+        version = self._index_version()
+        if version != self._version:
+            self._version = version
+            self._schema_ok = False
+            self.clear()
+
+    def _require_schema(self) -> None:
+        # Indices built before the managed mapping (like the adopted legacy
+        # index) store these fields as analyzed text: terms miss and sorts fail.
+        if self._schema_ok:
+            return
+        index_name = self.vectorstore.index_name
+        version = get_schema_version(self.vectorstore.client, index_name)
+        if version is None or version < _MIN_SCHEMA_VERSION:
+            raise ProvisionIndexError(
+                f"{index_name} has schema version {version!r}; provision lookups need "
+                f"{_MIN_SCHEMA_VERSION} or later. Build a versioned index with core/index_job.py "
+                "and switch the alias to it."
+            )
+        self._schema_ok = True
+
+    def available(self) -> bool:
+        """Whether the index supports these lookups (schema version 2 or later)."""
+        try:
+            self._require_schema()
+        except ProvisionIndexError:
+            return False
+        return True
+
+    def _cached(self, key: Tuple[Any, ...], loader: Callable[[], List[Document]]) -> List[Document]:
+        self._check_version()
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return list(self._cache[key])
+        docs = loader()
+        self._store(key, docs)
+        return list(docs)
+
+    def _store(self, key: Tuple[Any, ...], docs: List[Document]) -> None:
+        with self._lock:
+            self._cache[key] = docs
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _search_all(self, filters: List[Dict[str, Any]]) -> List[Document]:
+        self._require_schema()
+        client = self.vectorstore.client
+        includes = [TEXT_FIELD] + [f"metadata.{field}" for field in SOURCE_METADATA_FIELDS]
+        body: Dict[str, Any] = {
+            "size": _PAGE_SIZE,
+            "_source": {"includes": includes},
+            "query": {"bool": {"filter": filters}},
+            "sort": _SORT,
+        }
+        docs: List[Document] = []
+        while True:
+            response = client.search(index=self.vectorstore.index_name, body=body)
+            hits = response.get("hits", {}).get("hits", [])
+            docs.extend(hits_to_documents(hits))
+            if len(hits) < _PAGE_SIZE:
+                return docs
+            body["search_after"] = hits[-1]["sort"]
+
+    def get_provisions(self, act: str, start: int, end: int) -> List[Document]:
+        """Whole provisions of `act` numbered `start`..`end` (13, 13A and 13B all count as 13)."""
+
+        def load() -> List[Document]:
+            return stitch_chunks(
+                self._search_all(
+                    [
+                        {"term": {"metadata.act_abbrev": act}},
+                        {"range": {"metadata.provision_num": {"gte": start, "lte": end}}},
+                    ]
+                )
+            )
+
+        return self._cached(("range", act, start, end), load)
+
+    def get_provision(self, act: str, provision_id: str) -> Optional[Document]:
+        provision_id = str(provision_id).strip()
+
+        def load() -> List[Document]:
+            return stitch_chunks(
+                self._search_all(
+                    [
+                        {"term": {"metadata.act_abbrev": act}},
+                        {
+                            "bool": {
+                                "should": [
+                                    {"term": {"metadata.section_id": provision_id}},
+                                    {"term": {"metadata.article_id": provision_id}},
+                                ],
+                                "minimum_should_match": 1,
+                            }
+                        },
+                    ]
+                )
+            )
+
+        docs = self._cached(("one", act, provision_id), load)
+        return docs[0] if docs else None
+
+    def get_provisions_by_id(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Document]:
+        """`get_provision` for several (act, provision id) pairs; cache misses share one search.
+
+        Pairs that name no provision are left out of the result.
+        """
+        self._check_version()
+        found: Dict[Tuple[str, str], Document] = {}
+        missing: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        with self._lock:
+            for act, provision_id in keys:
+                stripped = (act, str(provision_id).strip())
+                cached = self._cache.get(("one",) + stripped)
+                if cached is None:
+                    missing[(act, provision_id)] = stripped
+                    continue
+                self._cache.move_to_end(("one",) + stripped)
+                if cached:
+                    found[(act, provision_id)] = cached[0]
+        if not missing:
+            return found
+
+        ids = sorted({provision_id for _, provision_id in missing.values()})
+        docs = stitch_chunks(
+            self._search_all(
+                [
+                    {"terms": {"metadata.act_abbrev": sorted({act for act, _ in missing.values()})}},
+                    {
+                        "bool": {
+                            "should": [
+                                {"terms": {"metadata.section_id": ids}},
+                                {"terms": {"metadata.article_id": ids}},
+                            ],
+                            "minimum_should_match": 1,
+                        }
+                    },
+                ]
+            )
+        )
+        # The search covers every act x id combination; keep the pairs asked for.
+        by_key: Dict[Tuple[str, str], List[Document]] = {}
+        for doc in docs:
+            provision_id = doc.metadata.get("section_id") or doc.metadata.get("article_id")
+            by_key.setdefault((doc.metadata.get("act_abbrev"), str(provision_id)), []).append(doc)
+        for key, stripped in missing.items():
+            matched = by_key.get(stripped, [])
+            self._store(("one",) + stripped, matched)
+            if matched:
+                found[key] = matched[0]
+        return found
+
+
+class LocalProvisionStore:
+    """`get_provision` over documents held in memory, for offline runs."""
+
+    def __init__(self, docs: List[Document]) -> None:
+        self._provisions: Dict[Tuple[str, str], Document] = {}
+        for doc in stitch_chunks(docs):
+            key = provision_key(doc.metadata)
+            if key is not None:
+                self._provisions.setdefault(key, doc)
+
+    def get_provision(self, act: str, provision_id: str) -> Optional[Document]:
+        return self._provisions.get((act, normalize_provision_id(provision_id)))
+
+    def get_provisions_by_id(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Document]:
+        found: Dict[Tuple[str, str], Document] = {}
+        for act, provision_id in keys:
+            doc = self.get_provision(act, provision_id)
+            if doc is not None:
+                found[(act, provision_id)] = doc
+        return found
+
+
+_DEFAULT_STORE: Optional[ProvisionStore] = None
+
+
+def _default_store() -> ProvisionStore:
+    global _DEFAULT_STORE
+    if _DEFAULT_STORE is None:
+        from common.config import get_vectorstore
+        from core.index_versions import get_active_index
+
+        vectorstore = get_vectorstore()
+        _DEFAULT_STORE = ProvisionStore(
+            vectorstore,
+            index_version=lambda: get_active_index(vectorstore.client, vectorstore.index_name),
+        )
+    return _DEFAULT_STORE
+
+
+def get_provisions(act: str, start: int, end: int) -> List[Document]:
+    return _default_store().get_provisions(act, start, end)
+
+
+def get_provision(act: str, provision_id: str) -> Optional[Document]:
+    return _default_store().get_provision(act, provision_id)
@@ -1,4 +1,6 @@
-from typing import Dict, Optional, TypedDict
+import hashlib
+import re
+from typing import Any, Dict, Optional, TypedDict
 from langchain_core.documents import Document
 
 
@@ -14,7 +16,7 @@ def build_metadata(
     article_id: Optional[str] = None,
     section_id: Optional[str] = None,
     raw_text: Optional[str] = None,
-) -> Dict[str, Optional[str]]:
+) -> Dict[str, Any]:
     citation = None
     if article_id:
         citation = f"Article {article_id}"
@@ -35,13 +37,39 @@ def build_metadata(
         "article_id": article_id,
         "section_id": section_id,
         "citation": citation,
+        "provision_num": provision_number(section_id or article_id),
         "raw_text": raw_text,
     }
 
 
-def make_document(text: str, metadata: Dict[str, Optional[str]]) -> Document:
+def provision_number(provision_id: Optional[str]) -> Optional[int]:
+    """Leading integer of a section/article id ("13A" -> 13), for numeric range queries."""
+    match = re.match(r"\s*(\d+)", provision_id or "")
+    return int(match.group(1)) if match else None
+
+
+def compact_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    # raw_text repeats page_content (for chunks, the whole section per chunk),
+    # and empty fields only add bytes to every stored document and search hit.
+    return {
+        key: value
+        for key, value in metadata.items()
+        if key != "raw_text" and value is not None
+    }
+
+
+def make_document(text: str, metadata: Dict[str, Any]) -> Document:
     return Document(page_content=text, metadata=metadata)
 
+
+def document_id(doc: Document) -> str:
+    metadata = doc.metadata or {}
+    key = "\x1f".join(
+        str(metadata.get(field) or "")
+        for field in ("act_abbrev", "citation", "chunk_index")
+    )
+    return hashlib.sha256(f"{key}\x1e{doc.page_content}".encode("utf-8")).hexdigest()[:40]
+
 from pydantic import BaseModel
 from typing import List
 
@@ -0,0 +1,83 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.documents import Document
+
+from core.index_schema import TEXT_FIELD, VECTOR_FIELD
+
+# Metadata the chain (formatting, dedupe, act filter) and the UI source panels read.
+SOURCE_METADATA_FIELDS = (
+    "citation",
+    "source",
+    "act",
+    "act_abbrev",
+    "title",
+    "chapter",
+    "chapter_title",
+    "section_id",
+    "article_id",
+    "chunk_index",
+    "source_type",
+    "jurisdiction",
+)
+
+
+def source_includes(
+    metadata_fields: Sequence[str] = SOURCE_METADATA_FIELDS,
+    *,
+    include_vector: bool = False,
+) -> List[str]:
+    includes = [TEXT_FIELD] + [f"metadata.{field}" for field in metadata_fields]
+    if include_vector:
+        includes.append(VECTOR_FIELD)
+    return includes
+
+
+def build_knn_query(
+    vector: List[float],
+    k: int,
+    *,
+    metadata_fields: Sequence[str] = SOURCE_METADATA_FIELDS,
+    include_vector: bool = False,
+    filters: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    knn: Dict[str, Any] = {"vector": vector, "k": k}
+    if filters:
+        knn["filter"] = {"bool": {"filter": filters}}
+    return {
+        "size": k,
+        "_source": {"includes": source_includes(metadata_fields, include_vector=include_vector)},
+        "query": {"knn": {VECTOR_FIELD: knn}},
+    }
+
+
+def hits_to_documents(hits: List[Dict[str, Any]]) -> List[Document]:
+    docs = []
+    for hit in hits:
+        source = hit.get("_source") or {}
+        metadata = dict(source.get("metadata") or {})
+        if VECTOR_FIELD in source:
+            metadata["vector"] = source[VECTOR_FIELD]
+        docs.append(Document(page_content=source.get(TEXT_FIELD, ""), metadata=metadata))
+    return docs
+
+
+def compact_similarity_search(
+    vectorstore,
+    query: str,
+    k: int,
+    *,
+    metadata_fields: Sequence[str] = SOURCE_METADATA_FIELDS,
+    include_vector: bool = False,
+) -> List[Document]:
+    """k-NN search that returns only the text and the listed metadata fields.
+
+    The stock `similarity_search` ships the whole `_source`, vector included.
+    Stores without an OpenSearch client fall back to it.
+    """
+    client = getattr(vectorstore, "client", None)
+    if client is None:
+        return vectorstore.similarity_search(query, k=k)
+    vector = vectorstore.embedding_function.embed_query(query)
+    body = build_knn_query(vector, k, metadata_fields=metadata_fields, include_vector=include_vector)
+    response = client.search(index=vectorstore.index_name, body=body)
+    return hits_to_documents(response.get("hits", {}).get("hits", []))
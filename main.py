@@ -1,41 +1,21 @@
-from pathlib import Path
-
-from common.config import vectorstore
-from common.chat_store import ChatStore
-from core.chain import build_chain
-from core.llm import get_answer_llm
-from core.schema import ExpandedQuery, FinalAnswer
-
-from langchain_core.output_parsers import PydanticOutputParser
-
-
+from common.config import MEMORY_MODE, MEMORY_TOKEN_BUDGET
+from ui.resources import RESOURCES
 from ui.streamlit_app import LegalAdvisorUI
 
 
 def build_app():
-    root = Path(__file__).resolve().parent
-    retriever = vectorstore
-    chat_store = ChatStore(root / "data" / "chat_memory.db")
-
-    # 3. LLMs
-    answer_llm = get_answer_llm()
-
-    # 4. Output parsers (REQUIRED by build_chain)
-    query_parser = PydanticOutputParser(pydantic_object=ExpandedQuery)
-    answer_parser = PydanticOutputParser(pydantic_object=FinalAnswer)
-
-    # 5. Build chain (custom human-readable logging only)
-    chain = build_chain(
-        answer_llm=answer_llm, 
-        vectorstore=retriever,
-        answer_parser=answer_parser,
-        query_parser=query_parser,
+    # Everything expensive comes from the process-wide registry, so a
+    # Streamlit rerun only constructs the (cheap) UI object.
+    app = LegalAdvisorUI(
+        RESOURCES.get("chain"),
+        chat_store=RESOURCES.get("chat_store"),
+        memory_mode=MEMORY_MODE,
+        memory_embeddings=RESOURCES.get("memory_embeddings"),
+        memory_token_budget=MEMORY_TOKEN_BUDGET,
+        act_options=RESOURCES.get("act_options"),
+        conversation=RESOURCES.get("conversation"),
+        jobs=RESOURCES.get("jobs"),
     )
-
-
-
-    # 6. UI
-    app = LegalAdvisorUI(chain, chat_store=chat_store)
     app.render()
 
 
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Iterator
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from core.caching import CachedEmbeddings, LRUCache
+from core.chain import build_chain
+from core.conversation import serialize_sources
+from ui.resources import RESOURCES, register_offline_resources
+
+
+def read_records(path: Path) -> Iterator[tuple[str, dict[str, Any]]]:
+    """(record id, record) per non-blank line; the id defaults to the line number."""
+    with path.open("r", encoding="utf-8") as handle:
+        for line_no, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield str(record.get("id", line_no)), record
+
+
+def completed_ids(path: Path) -> set[str]:
+    """Ids already answered in an earlier run; failed records are retried."""
+    done: set[str] = set()
+    if not path.exists():
+        return done
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short when the last run was killed
+            if result.get("status") == "ok":
+                done.add(str(result["id"]))
+    return done
+
+
+def answer(chain, record_id: str, record: dict[str, Any]) -> dict[str, Any]:
+    started = time.perf_counter()
+    result: dict[str, Any] = {"id": record_id, "query": record["query"], "act": record.get("act") or "All"}
+    try:
+        output = chain.invoke(
+            {
+                "query": record["query"],
+                "act": result["act"],
+                "chat_history": record.get("chat_history"),
+            }
+        )
+    except Exception as exc:
+        result.update(status="error", error=f"{type(exc).__name__}: {exc}")
+        output = {"timings": {}}
+    else:
+        result.update(
+            status="ok",
+            answer=output["answer"].model_dump(),
+            recovered=output["recovered"],
+            sources=serialize_sources(output["sources"]),
+        )
+    result["timings"] = {**output["timings"], "total_seconds": time.perf_counter() - started}
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of {query, act, chat_history} records.")
+    parser.add_argument("input", type=Path)
+    parser.add_argument("output", type=Path, help="Results are appended as JSONL in completion order.")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--resume", action="store_true", help="Skip records already answered in the output file.")
+    parser.add_argument("--offline", action="store_true", help="Use the local LLM and vector store stand-ins.")
+    parser.add_argument("--cache-size", type=int, default=4096, help="Entries per shared cache.")
+    args = parser.parse_args()
+
+    if args.output.exists() and not args.resume:
+        parser.error(f"{args.output} exists; pass --resume to continue it")
+    skip = completed_ids(args.output) if args.resume else set()
+
+    if args.offline:
+        register_offline_resources(RESOURCES)
+
+    # One chain for every record, over the app's vector store and LLM, with
+    # caches for the query expansion and the query embeddings of sub-queries.
+    # Batches repeat both a lot (regression sets, near-duplicate questions).
+    expansion_cache = LRUCache(args.cache_size)
+    embedding_cache = LRUCache(args.cache_size)
+    vectorstore = RESOURCES.get("vectorstore")
+    vectorstore.embedding_function = CachedEmbeddings(vectorstore.embedding_function, embedding_cache)
+    parsers = RESOURCES.get("parsers")
+    chain = build_chain(
+        answer_llm=RESOURCES.get("answer_llm"),
+        vectorstore=vectorstore,
+        answer_parser=parsers["answer"],
+        query_parser=parsers["query"],
+        expansion_cache=expansion_cache,
+        citation_graph=RESOURCES.get("citation_graph"),
+        provision_lookup=RESOURCES.get("provisions").get_provisions_by_id,
+    )
+
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    started = time.perf_counter()
+    with args.output.open("a", encoding="utf-8") as out, ThreadPoolExecutor(args.concurrency) as pool:
+        pending: set[Future] = set()
+
+        def drain(block_until: int) -> None:
+            nonlocal pending
+            while len(pending) > block_until:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    out.flush()
+                    counts[result["status"]] += 1
+                    print(
+                        f"[{result['status']}] {result['id']} "
+                        f"{result['timings']['total_seconds']:.2f}s",
+                        file=sys.stderr,
+                    )
+
+        for record_id, record in read_records(args.input):
+            if record_id in skip:
+                counts["skipped"] += 1
+                continue
+            # Keep at most two records queued per worker so a huge input file
+            # isn't read into the executor's queue all at once.
+            drain(args.concurrency * 2)
+            pending.add(pool.submit(answer, chain, record_id, record))
+        drain(0)
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"answered {counts['ok']}, failed {counts['error']}, skipped {counts['skipped']} "
+        f"in {elapsed:.1f}s; expansion cache {expansion_cache.stats()}, "
+        f"embedding cache {embedding_cache.stats()}"
+    )
+
+
+if __name__ == "__main__":
+    main()
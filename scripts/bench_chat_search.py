@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from common.chat_store import ChatStore, utc_now_iso
+
+VOCABULARY = (
+    "section article act court bail anticipatory cognizable offence punishment imprisonment fine "
+    "property land trespass possession tenant landlord eviction marriage divorce maintenance custody "
+    "adoption succession inheritance will partition contract breach damages consumer complaint "
+    "police FIR charge sheet evidence witness appeal petition writ constitution fundamental right "
+    "equality speech religion arrest detention summons warrant cheque dishonour notice limitation"
+).split()
+QUERIES = ["bail", "anticipatory bail", "land trespass", "divorce maintenance", "writ", "cheq"]
+# Most words in a chat are not legal terms; filler keeps term frequencies realistic.
+FILLER = [f"w{index}" for index in range(5000)]
+LEGAL_SHARE = 0.15
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    picks = [
+        rng.choice(VOCABULARY) if rng.random() < LEGAL_SHARE else rng.choice(FILLER)
+        for _ in range(words)
+    ]
+    return " ".join(picks).capitalize() + "."
+
+
+def _seed(db_path: Path, user_id: str, threads: int, messages: int, rng: random.Random) -> None:
+    # Bulk-insert through plain SQL; the store's triggers keep the FTS index in sync.
+    conn = sqlite3.connect(db_path)
+    now = utc_now_iso()
+    with conn:
+        conn.executemany(
+            "INSERT INTO threads(thread_id, user_id, title, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            [(f"t{i}", user_id, _sentence(rng, 5), now, now) for i in range(threads)],
+        )
+        conn.executemany(
+            "INSERT INTO messages(thread_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+            (
+                (f"t{i % threads}", "user" if i % 2 == 0 else "assistant", _sentence(rng, 40), now)
+                for i in range(messages)
+            ),
+        )
+    conn.close()
+
+
+def _time(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare LIKE scans with the ChatStore FTS5 search.")
+    parser.add_argument("--threads", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    user_id = "bench-user"
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "search.db"
+        store = ChatStore(db_path)
+        started = time.perf_counter()
+        _seed(db_path, user_id, args.threads, args.messages, random.Random(args.seed))
+        print(f"Seeded {args.threads} threads / {args.messages} messages in {time.perf_counter() - started:.1f}s")
+
+        raw = sqlite3.connect(db_path)
+
+        def like_titles(text: str) -> None:
+            raw.execute(
+                "SELECT thread_id FROM threads WHERE user_id = ? AND LOWER(title) LIKE ?",
+                (user_id, f"%{text.lower()}%"),
+            ).fetchall()
+
+        def like_messages(text: str) -> None:
+            raw.execute(
+                """
+                SELECT DISTINCT m.thread_id FROM messages AS m
+                JOIN threads AS t ON t.thread_id = m.thread_id
+                WHERE t.user_id = ? AND LOWER(m.content) LIKE ?
+                """,
+                (user_id, f"%{text.lower()}%"),
+            ).fetchall()
+
+        print(f"{'query':<22}{'LIKE title':>12}{'LIKE content':>14}{'FTS title':>11}{'FTS all':>10}  top hit")
+        for query in QUERIES:
+            title_like = _time(lambda: like_titles(query), args.repeats)
+            content_like = _time(lambda: like_messages(query), args.repeats)
+            title_fts = _time(lambda: store.list_threads(user_id, search=query), args.repeats)
+            search_fts = _time(lambda: store.search_threads(user_id, query), args.repeats)
+            hits = store.search_threads(user_id, query, limit=1)
+            top = hits[0]["snippet"][:40] if hits else "-"
+            print(
+                f"{query:<22}{title_like:>10.1f}ms{content_like:>12.1f}ms"
+                f"{title_fts:>9.1f}ms{search_fts:>8.1f}ms  {top}"
+            )
+        raw.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
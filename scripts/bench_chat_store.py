@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from uuid import uuid4
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from common.chat_store import ChatStore
+
+
+def _seed(store: ChatStore, user_id: str, threads: int, messages: int) -> list[str]:
+    thread_ids = []
+    for index in range(threads):
+        thread_id = str(uuid4())
+        store.create_thread(user_id=user_id, thread_id=thread_id, title=f"Thread {index}")
+        for turn in range(messages // 2):
+            store.add_message(thread_id, "user", f"Question {turn} about section {turn} of the IPC")
+            store.add_message(
+                thread_id,
+                "assistant",
+                f"Answer {turn}. " * 40,
+                sources=[{"metadata": {"citation": f"Section {turn} (IPC)"}, "page_content": "text " * 50}],
+            )
+        thread_ids.append(thread_id)
+    return thread_ids
+
+
+def _rerun(store: ChatStore, user_id: str, thread_id: str) -> int:
+    # The read pattern of one Streamlit rerun of LegalAdvisorUI.render.
+    store.list_threads(user_id=user_id)
+    store.list_threads(user_id=user_id, search="")
+    store.get_thread(user_id=user_id, thread_id=thread_id)
+    store.get_thread(user_id=user_id, thread_id=thread_id)
+    store.get_thread_stats(thread_id)
+    store.get_recent_messages(thread_id, limit=20)
+    store.get_summary(thread_id)
+    return 7
+
+
+def _run(label: str, pool_size: int, args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ChatStore(Path(tmp) / "bench.db", pool_size=pool_size)
+        user_id = "bench-user"
+        thread_ids = _seed(store, user_id, args.threads, args.messages)
+
+        ops = [0] * args.workers
+
+        def worker(slot: int) -> None:
+            for i in range(args.reruns):
+                ops[slot] += _rerun(store, user_id, thread_ids[(slot + i) % len(thread_ids)])
+
+        started = time.perf_counter()
+        workers = [threading.Thread(target=worker, args=(slot,)) for slot in range(args.workers)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        read_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for i in range(args.writes):
+            store.add_message(thread_ids[i % len(thread_ids)], "user", f"write {i}")
+        write_seconds = time.perf_counter() - started
+        store.close()
+
+    print(
+        f"{label:<10} reads {sum(ops) / read_seconds:>9.0f} ops/sec "
+        f"({args.workers} threads)   writes {args.writes / write_seconds:>8.0f} ops/sec"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmark ChatStore connection handling.")
+    parser.add_argument("--threads", type=int, default=10, help="Chat threads to seed.")
+    parser.add_argument("--messages", type=int, default=20, help="Messages per chat thread.")
+    parser.add_argument("--reruns", type=int, default=200, help="Simulated reruns per worker.")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent script threads.")
+    parser.add_argument("--writes", type=int, default=500)
+    args = parser.parse_args()
+
+    _run("unpooled", 0, args)
+    _run("pooled", 4, args)
+
+
+if __name__ == "__main__":
+    main()
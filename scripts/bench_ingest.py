@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from core.fakes import FakeEmbeddings, FakeVectorStore
+from core.indexer import Indexer
+from core.ingest import AIMDLimiter, IngestScheduler
+
+
+def _fake_store(args: argparse.Namespace) -> FakeVectorStore:
+    embeddings = FakeEmbeddings(
+        capacity=args.embed_capacity,
+        base_latency=0.02,
+        per_item_latency=0.0005,
+    )
+    return FakeVectorStore(
+        embeddings,
+        capacity=args.write_capacity,
+        base_latency=0.01,
+        per_item_latency=0.0002,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark ingestion against a throttling fake vector store.")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--embed-capacity", type=int, default=6, help="Concurrent embed calls before throttling.")
+    parser.add_argument("--write-capacity", type=int, default=2, help="Concurrent bulk writes before throttling.")
+    args = parser.parse_args()
+
+    docs = Indexer().build_all_documents(PROJECT_ROOT)
+    print(f"Corpus: {len(docs)} chunks")
+
+    # Baseline mirrors the old fixed pool: 4 workers, add_documents, no retries.
+    store = _fake_store(args)
+    fixed = IngestScheduler(
+        store,
+        batch_size=128,
+        embed_limiter=AIMDLimiter("embed", initial=4, minimum=4, maximum=4),
+        write_limiter=AIMDLimiter("write", initial=4, minimum=4, maximum=4),
+        max_retries=0,
+        split_stages=False,
+    )
+    report = fixed.run(docs)
+    print(f"fixed-4     {report.summary()}")
+
+    store = _fake_store(args)
+    adaptive = IngestScheduler(store, batch_size=args.batch_size, base_delay=0.05, max_delay=1.0)
+    report = adaptive.run(docs)
+    print(f"adaptive    {report.summary()}")
+    print(f"            stored={len(store.docs)} embed_throttles={store.embedding_function.load.throttled} "
+          f"write_throttles={store.load.throttled}")
+
+
+if __name__ == "__main__":
+    main()
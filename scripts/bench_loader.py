@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from core.indexer import Indexer
+
+
+def _run(label: str, indexer: Indexer, repeat: int) -> Counter:
+    timings = []
+    docs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        docs = indexer.build_all_documents(PROJECT_ROOT)
+        timings.append(time.perf_counter() - started)
+
+    per_act = Counter(doc.metadata.get("act_abbrev") for doc in docs)
+    best = min(timings)
+    print(f"{label:<22} best {best * 1000:8.1f} ms  mean {sum(timings) / len(timings) * 1000:8.1f} ms  docs {len(docs)}")
+    return per_act
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the native corpus loader with the JSONLoader path.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size for the native loader.")
+    args = parser.parse_args()
+
+    results = {
+        "native (pool)": _run("native (pool)", Indexer(max_workers=args.workers), args.repeat),
+        "native (serial)": _run("native (serial)", Indexer(max_workers=1), args.repeat),
+    }
+    try:
+        results["jsonloader"] = _run("jsonloader", Indexer(loader="jsonloader"), args.repeat)
+    except ImportError as exc:
+        print(f"jsonloader             skipped ({exc})")
+
+    acts = sorted({act for counts in results.values() for act in counts if act})
+    print()
+    print("docs per act: " + "  ".join(f"{label}" for label in results))
+    for act in acts:
+        print(f"  {act:<6} " + "  ".join(f"{results[label].get(act, 0):>6}" for label in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from common.chat_store import ChatStore
+from core.fakes import FakeEmbeddings
+from core.memory import (
+    compose_memory_context,
+    compose_relevant_memory_context,
+    estimate_tokens,
+    extend_running_summary,
+    select_newly_archived,
+    turn_text,
+)
+
+TOPICS = {
+    "bail": ("Can I get anticipatory bail for a non-bailable offence?", "Section 438 CrPC allows anticipatory bail"),
+    "land": ("Someone is occupying my land, what can I do?", "Criminal trespass under Section 441 IPC and a civil suit"),
+    "divorce": ("What are the grounds for divorce under Hindu law?", "Section 13 HMA lists cruelty, desertion"),
+    "cheque": ("My cheque bounced, is that a crime?", "Section 138 NI Act makes dishonour of cheque an offence"),
+    "speech": ("Is criticising the government protected speech?", "Article 19(1)(a) protects speech subject to 19(2)"),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare window and relevance-based memory prompt sizes.")
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--budget", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=3)
+    # The offline embeddings are lexical, so their similarities run lower than Titan's.
+    parser.add_argument("--min-score", type=float, default=0.15)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    embeddings = FakeEmbeddings(dimensions=256)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ChatStore(Path(tmp) / "memory.db")
+        store.create_thread("bench-user", "t", "Memory bench")
+        for turn in range(args.turns):
+            topic = rng.choice(list(TOPICS))
+            question, answer = TOPICS[topic]
+            answer = f"{answer}. The court weighs the facts of each case, so keep copies of every document."
+            history = store.get_recent_messages("t", limit=14)
+            memory = store.get_memory("t")
+            messages = history + [
+                {"role": "user", "content": question},
+                {"role": "assistant", "content": answer},
+            ]
+            archived, watermark = select_newly_archived(messages, memory["summarized_through"])
+            store.record_turn(
+                "t",
+                question,
+                answer,
+                summary=extend_running_summary(memory["summary"], archived) if archived else None,
+                summarized_through=watermark if archived else None,
+                turn_embedding=embeddings.embed_documents([turn_text(question, answer)])[0],
+            )
+
+        query = "And what about anticipatory bail if the police have already filed an FIR?"
+        history = store.get_recent_messages("t", limit=14)
+        pending = history + [{"role": "user", "content": query}]
+        window = compose_memory_context(store.get_summary("t"), pending, recent_messages=8)
+        relevant = compose_relevant_memory_context(
+            embeddings.embed_query(query),
+            store.get_turns("t"),
+            pending[-3:-1],
+            token_budget=args.budget,
+            min_score=args.min_score,
+        )
+        store.close()
+
+    print(f"window memory   ~{estimate_tokens(window):>5} tokens")
+    print(f"relevant memory ~{estimate_tokens(relevant):>5} tokens (budget {args.budget})")
+    print("\n--- relevant context ---\n" + relevant)
+
+
+if __name__ == "__main__":
+    main()
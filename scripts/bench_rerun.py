@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from common.resources import ResourceRegistry
+from ui.resources import register_app_resources
+
+# What build_app() asks the registry for on every rerun.
+APP_RESOURCES = ("chain", "chat_store", "memory_embeddings", "act_options")
+
+
+def _registry(offline: bool, tmp: str) -> ResourceRegistry:
+    registry = ResourceRegistry()
+    register_app_resources(registry)
+    if offline:
+        from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+        from common.chat_store import ChatStore
+        from core.fakes import FakeVectorStore
+
+        registry.register("vectorstore", FakeVectorStore)
+        registry.register("answer_llm", lambda: FakeListChatModel(responses=["offline answer"]))
+        registry.register("memory_embeddings", lambda: None)
+        registry.register(
+            "chat_store",
+            lambda: ChatStore(Path(tmp) / "rerun.db"),
+            close=lambda store: store.close(),
+        )
+    return registry
+
+
+def _rerun(registry: ResourceRegistry) -> float:
+    started = time.perf_counter()
+    for name in APP_RESOURCES:
+        registry.get(name)
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-rerun resource construction cost, uncached vs cached.")
+    parser.add_argument("--reruns", type=int, default=50)
+    parser.add_argument("--offline", action="store_true", help="Use local stand-ins instead of AWS.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = _registry(args.offline, tmp)
+
+        # Before: every rerun rebuilt everything (what main.py used to do).
+        uncached = []
+        for _ in range(args.reruns):
+            registry.invalidate()
+            uncached.append(_rerun(registry))
+        stats = registry.stats()
+
+        # After: the first rerun builds, the rest reuse.
+        registry.invalidate()
+        cached = [_rerun(registry) for _ in range(args.reruns)]
+        registry.close()
+
+    print(f"uncached  median {statistics.median(uncached):8.2f} ms/rerun")
+    print(f"cached    median {statistics.median(cached):8.3f} ms/rerun (first rerun {cached[0]:.2f} ms)")
+    print("\nlast build time per resource:")
+    for name, info in stats.items():
+        if info["builds"]:
+            print(f"  {name:<18} {info['build_seconds'] * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
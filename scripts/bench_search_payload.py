@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from core.index_schema import TEXT_FIELD, VECTOR_FIELD
+from core.indexer import Indexer
+from core.search import build_knn_query, hits_to_documents
+
+
+QUERIES = (
+    "punishment for murder",
+    "grounds for divorce",
+    "bail in non-bailable offences",
+    "dishonour of cheque for insufficiency of funds",
+    "freedom of speech and expression",
+)
+
+
+def _measure(label: str, responses: List[Dict]) -> None:
+    payloads = [json.dumps(response) for response in responses]
+    hits = sum(len(response["hits"]["hits"]) for response in responses) or 1
+    started = time.perf_counter()
+    for payload in payloads:
+        hits_to_documents(json.loads(payload)["hits"]["hits"])
+    parse_ms = (time.perf_counter() - started) * 1000
+    total_bytes = sum(len(payload.encode("utf-8")) for payload in payloads)
+    print(
+        f"{label:<10} {total_bytes / hits:>10.0f} bytes/hit  "
+        f"{parse_ms / len(payloads):>7.2f} ms parse/response  ({hits} hits)"
+    )
+
+
+def _offline_responses(compact: bool, k: int, dimension: int) -> List[Dict]:
+    # Hits shaped like the stored documents under each mode, with a random vector.
+    rng = random.Random(3)
+    docs = Indexer(compact=compact).build_all_documents(PROJECT_ROOT)
+    responses = []
+    for _ in QUERIES:
+        hits = []
+        for doc in rng.sample(docs, k):
+            source = {TEXT_FIELD: doc.page_content, "metadata": doc.metadata}
+            if not compact:
+                source[VECTOR_FIELD] = [rng.uniform(-0.1, 0.1) for _ in range(dimension)]
+            hits.append({"_index": "offline", "_id": "x", "_score": 1.0, "_source": source})
+        responses.append({"hits": {"hits": hits}})
+    return responses
+
+
+def _live_responses(compact: bool, k: int) -> List[Dict]:
+    from common.config import get_vectorstore
+
+    vectorstore = get_vectorstore()
+
+    responses = []
+    for query in QUERIES:
+        vector = vectorstore.embedding_function.embed_query(query)
+        if compact:
+            body = build_knn_query(vector, k)
+        else:
+            # What OpenSearchVectorSearch.similarity_search sends: the full _source.
+            body = {"size": k, "query": {"knn": {VECTOR_FIELD: {"vector": vector, "k": k}}}}
+        responses.append(vectorstore.client.search(index=vectorstore.index_name, body=body))
+    return responses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare full and compact search payloads.")
+    parser.add_argument("--k", type=int, default=12)
+    parser.add_argument("--offline", action="store_true", help="Use synthetic hits built from the local corpus.")
+    parser.add_argument("--dimension", type=int, default=1024, help="Vector size for offline full payloads.")
+    args = parser.parse_args()
+
+    if args.offline:
+        full = _offline_responses(compact=False, k=args.k, dimension=args.dimension)
+        compact = _offline_responses(compact=True, k=args.k, dimension=args.dimension)
+    else:
+        full = _live_responses(compact=False, k=args.k)
+        compact = _live_responses(compact=True, k=args.k)
+
+    _measure("full", full)
+    _measure("compact", compact)
+
+
+if __name__ == "__main__":
+    main()
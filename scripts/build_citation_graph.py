@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from core.citations import CitationGraph, promote_graph, version_graph_path
+from core.indexer import Indexer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild the citation cross-reference graph from the local corpus (no reindex needed)."
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Write the graph here only. By default it is saved with the active index version "
+        "and made the one retrieval loads.",
+    )
+    parser.add_argument("--show", help="Print the neighbours of one provision, e.g. CrPC:438.")
+    args = parser.parse_args()
+
+    docs = Indexer().build_all_documents(PROJECT_ROOT)
+    graph = CitationGraph.from_documents(docs, PROJECT_ROOT)
+    if args.output is not None:
+        output = args.output
+        graph.save(output)
+    else:
+        from common.config import INDEX_NAME, get_vectorstore
+        from core.index_versions import get_active_index
+
+        # Keep the copy saved with the active version in step, or the next
+        # switch or rollback would bring back the old graph.
+        vectorstore = get_vectorstore()
+        active = get_active_index(vectorstore.client, INDEX_NAME) or vectorstore.index_name
+        output = version_graph_path(PROJECT_ROOT, active)
+        graph.save(output)
+        promote_graph(PROJECT_ROOT, active)
+    print(f"Wrote {output}: {len(graph.provision_ids)} provisions, {graph.edge_count} references.")
+
+    if args.show:
+        act, _, provision_id = args.show.partition(":")
+        key = (act, provision_id.upper())
+        print(f"{args.show} cites: {graph.neighbours(key)}")
+        print(f"{args.show} is cited by: {graph.cited_by.get(key, [])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from common.chat_maintenance import RetentionPolicy, run_maintenance
+from common.chat_store import ChatStore
+
+
+def _optional_int(value: str) -> int | None:
+    return None if value.lower() in {"none", "off", "never"} else int(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Archive, compress and compact the chat database.")
+    parser.add_argument("--db", type=Path, default=PROJECT_ROOT / "data" / "chat_memory.db")
+    parser.add_argument(
+        "--archive-after-days",
+        type=_optional_int,
+        default=90,
+        help="Archive threads idle this long ('never' to disable). Archived threads leave the "
+        "UI and API until brought back with --restore.",
+    )
+    parser.add_argument(
+        "--purge-archive-after-days",
+        type=_optional_int,
+        default=None,
+        help="Delete archived threads this long after archiving (default: keep).",
+    )
+    parser.add_argument("--include-pinned", action="store_true", help="Archive pinned threads too.")
+    parser.add_argument(
+        "--compress-min-bytes",
+        type=_optional_int,
+        default=1024,
+        help="Compress stored source chunks at least this large ('never' to disable).",
+    )
+    parser.add_argument("--vacuum-pages", type=int, default=None, help="Cap pages freed per run.")
+    parser.add_argument("--no-analyze", action="store_true")
+    parser.add_argument("--list-archived", metavar="USER", help="List USER's archived threads and exit.")
+    parser.add_argument(
+        "--restore",
+        nargs=2,
+        metavar=("USER", "THREAD"),
+        help="Move an archived thread back into the live tables and exit.",
+    )
+    args = parser.parse_args()
+
+    if args.list_archived or args.restore:
+        store = ChatStore(args.db)
+        try:
+            if args.list_archived:
+                for thread in store.list_archived_threads(args.list_archived):
+                    print(
+                        f"{thread['thread_id']}  updated {thread['updated_at']}  "
+                        f"archived {thread['archived_at']}  {thread['title']}"
+                    )
+            else:
+                user_id, thread_id = args.restore
+                restored = store.restore_thread(user_id, thread_id)
+                if restored is None:
+                    raise SystemExit(f"No archived thread {thread_id} for user {user_id}.")
+                print(f"Restored {thread_id} as {restored}.")
+        finally:
+            store.close()
+        return
+
+    policy = RetentionPolicy(
+        archive_after_days=args.archive_after_days,
+        purge_archive_after_days=args.purge_archive_after_days,
+        include_pinned=args.include_pinned,
+        compress_min_bytes=args.compress_min_bytes,
+        vacuum_pages=args.vacuum_pages,
+        analyze=not args.no_analyze,
+    )
+    store = ChatStore(args.db)
+    try:
+        report = run_maintenance(store, policy)
+    finally:
+        store.close()
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
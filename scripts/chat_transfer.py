@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from common.chat_store import ChatStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export or import chat threads as NDJSON.")
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("path", type=Path, help="NDJSON file to write (export) or read (import).")
+    parser.add_argument("--user", required=True, help="Device/user id that owns the threads.")
+    parser.add_argument("--thread", help="Export a single thread instead of all of the user's threads.")
+    parser.add_argument("--db", type=Path, default=PROJECT_ROOT / "data" / "chat_memory.db")
+    args = parser.parse_args()
+
+    store = ChatStore(args.db)
+    try:
+        if args.action == "export":
+            if args.thread:
+                lines = store.iter_thread_export(args.user, args.thread)
+            else:
+                lines = store.iter_user_export(args.user)
+            count = 0
+            with args.path.open("w", encoding="utf-8") as handle:
+                for line in lines:
+                    handle.write(line)
+                    count += 1
+            print(f"Wrote {count} lines to {args.path}")
+        else:
+            with args.path.open("r", encoding="utf-8") as handle:
+                report = store.import_threads(args.user, handle)
+            print(
+                f"Imported {report['threads']} threads and {report['messages']} messages "
+                f"({report['skipped']} lines skipped)"
+            )
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
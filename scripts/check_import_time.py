@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Modules every script and tool imports; none of them should reach AWS or
+# pull in the SDKs just by being imported.
+CHECKED_MODULES = (
+    "common.config",
+    "common.aws_setup",
+    "core.llm",
+    "core.provisions",
+    "ui.resources",
+)
+# Only the factories in common.config / common.aws_setup may import these.
+DEFERRED_MODULES = (
+    "boto3",
+    "botocore",
+    "langchain_aws",
+    "langchain_community",
+    "opensearchpy",
+    "requests_aws4auth",
+)
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+
+def probe(module: str) -> dict:
+    """Import `module` in a fresh interpreter; its time and which deferred SDKs it loaded."""
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, deferred=DEFERRED_MODULES)],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fail if importing the shared modules is slow or loads AWS SDKs.")
+    parser.add_argument("--budget-ms", type=float, default=500.0, help="Per-module import budget.")
+    parser.add_argument("--modules", nargs="*", default=CHECKED_MODULES)
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        try:
+            result = probe(module)
+        except subprocess.CalledProcessError as exc:
+            failures.append(f"{module}: import failed\n{exc.stderr.strip()}")
+            continue
+        status = "ok"
+        if result["loaded"]:
+            status = "EAGER"
+            failures.append(f"{module} imports {', '.join(result['loaded'])} at import time")
+        if result["ms"] > args.budget_ms:
+            status = "SLOW"
+            failures.append(f"{module} took {result['ms']:.0f} ms (budget {args.budget_ms:.0f} ms)")
+        print(f"{module:<20} {result['ms']:8.1f} ms  {status}")
+
+    if failures:
+        print("\n" + "\n".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
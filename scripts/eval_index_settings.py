@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from opensearchpy import helpers
+
+from common.aws_setup import TITAN_V2_DIMENSIONS, build_embedding_function
+from common.config import INDEX_NAME, get_vectorstore
+from core.index_schema import (
+    INDEX_SETTINGS,
+    TEXT_FIELD,
+    VECTOR_FIELD,
+    IndexSettings,
+    build_index_body,
+    quantize_vector,
+)
+from core.indexer import Indexer
+from core.schema import document_id
+
+
+def _variants(base: IndexSettings, *, managed_domain: bool = False) -> List[IndexSettings]:
+    variants = [
+        base,
+        replace(base, m=32),
+        replace(base, ef_search=100),
+        replace(base, ef_construction=128),
+        replace(base, engine="faiss", encoding="fp16"),
+    ]
+    if managed_domain:
+        # Serverless collections have no lucene engine, so no byte vectors.
+        variants.append(replace(base, engine="lucene", encoding="byte"))
+    return variants
+
+
+def _embed_corpus(embedder, docs) -> List[List[float]]:
+    texts = [doc.page_content for doc in docs]
+    vectors: List[List[float]] = []
+    for i in range(0, len(texts), 64):
+        vectors.extend(embedder.embed_documents(texts[i:i + 64]))
+    return vectors
+
+
+def _l2(a: List[float], b: List[float]) -> float:
+    return sum((x - y) * (x - y) for x, y in zip(a, b))
+
+
+def _exact_top_k(query: List[float], corpus: List[Tuple[str, List[float]]], k: int) -> List[str]:
+    scored = sorted(corpus, key=lambda item: _l2(query, item[1]))
+    return [doc_id for doc_id, _ in scored[:k]]
+
+
+def _wait_for_count(client, index_name: str, expected: int, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if client.count(index=index_name).get("count", 0) >= expected:
+            return
+        time.sleep(2)
+    print(f"  warning: {index_name} not fully searchable after {timeout:.0f}s")
+
+
+def _index_size(client, index_name: str) -> str:
+    try:
+        stats = client.indices.stats(index=index_name, metric="store")
+        size = stats["indices"][index_name]["total"]["store"]["size_in_bytes"]
+    except Exception:
+        # Serverless collections do not expose the stats API.
+        return "n/a"
+    return f"{size / (1024 * 1024):.1f} MiB"
+
+
+def _evaluate(
+    client,
+    settings: IndexSettings,
+    corpus: List[Tuple[str, str, List[float]]],
+    queries: List[Tuple[List[float], List[str]]],
+    k: int,
+) -> Dict[str, str]:
+    index_name = f"{INDEX_NAME}-eval-{settings.label}".lower()
+    if client.indices.exists(index=index_name):
+        client.indices.delete(index=index_name)
+    client.indices.create(index=index_name, body=build_index_body(settings))
+    try:
+        actions = [
+            {
+                "_index": index_name,
+                # Serverless vector collections reject custom _id values.
+                "doc_id": doc_id,
+                TEXT_FIELD: text,
+                VECTOR_FIELD: quantize_vector(vector, settings.encoding),
+            }
+            for doc_id, text, vector in corpus
+        ]
+        helpers.bulk(client, actions, chunk_size=200)
+        _wait_for_count(client, index_name, len(corpus))
+
+        hits_found = 0
+        latencies: List[float] = []
+        for vector, expected in queries:
+            body = {
+                "size": k,
+                "_source": ["doc_id"],
+                "query": {
+                    "knn": {VECTOR_FIELD: {"vector": quantize_vector(vector, settings.encoding), "k": k}}
+                },
+            }
+            started = time.perf_counter()
+            response = client.search(index=index_name, body=body)
+            latencies.append(time.perf_counter() - started)
+            returned = {
+                hit.get("_source", {}).get("doc_id")
+                for hit in response.get("hits", {}).get("hits", [])
+            }
+            hits_found += len(returned & set(expected))
+
+        latencies.sort()
+        return {
+            "recall": f"{hits_found / (len(queries) * k):.3f}",
+            "p50_ms": f"{latencies[len(latencies) // 2] * 1000:.1f}",
+            "p95_ms": f"{latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000:.1f}",
+            "size": _index_size(client, index_name),
+        }
+    finally:
+        client.indices.delete(index=index_name)
+
+
+def _print_header(k: int) -> None:
+    print(f"{'settings':<40} {'recall@' + str(k):>9} {'p50_ms':>8} {'p95_ms':>8} {'size':>10}")
+
+
+def _print_row(settings: IndexSettings, result: Dict[str, str]) -> None:
+    print(
+        f"{settings.label:<40} {result['recall']:>9} {result['p50_ms']:>8} "
+        f"{result['p95_ms']:>8} {result['size']:>10}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report recall@k and latency for index settings.")
+    parser.add_argument("--docs", type=int, default=1500, help="Corpus sample size (0 = all).")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--compare",
+        choices=("settings", "dimensions"),
+        default="settings",
+        help="Vary HNSW/encoding settings, or the Titan v2 embedding dimension.",
+    )
+    parser.add_argument(
+        "--managed-domain",
+        action="store_true",
+        help="The endpoint is a managed OpenSearch domain: also try lucene with byte vectors.",
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = Indexer().build_all_documents(PROJECT_ROOT)
+    if args.docs and args.docs < len(docs):
+        docs = rng.sample(docs, args.docs)
+    doc_ids = [document_id(doc) for doc in docs]
+
+    # Queries are section titles, so each has a natural target in the corpus.
+    titles = [doc.metadata.get("title") for doc in docs if doc.metadata.get("title")]
+    query_texts = rng.sample(titles, min(args.queries, len(titles)))
+
+    # Ground truth is exact search over full 1024-d vectors, so lower dimensions
+    # are scored against the same reference as the HNSW settings.
+    print(f"Embedding {len(docs)} chunks and {len(query_texts)} queries at 1024 dimensions...")
+    reference = build_embedding_function(1024)
+    reference_corpus = list(zip(doc_ids, _embed_corpus(reference, docs)))
+    expected = [
+        _exact_top_k(reference.embed_query(text), reference_corpus, args.k)
+        for text in query_texts
+    ]
+
+    client = get_vectorstore().client
+    if args.compare == "settings":
+        base = replace(INDEX_SETTINGS, dimension=1024)
+        corpus = [(doc_id, doc.page_content, vector) for doc, (doc_id, vector) in zip(docs, reference_corpus)]
+        queries = [(reference.embed_query(text), ids) for text, ids in zip(query_texts, expected)]
+        _print_header(args.k)
+        for settings in _variants(base, managed_domain=args.managed_domain):
+            _print_row(settings, _evaluate(client, settings, corpus, queries, args.k))
+        return
+
+    _print_header(args.k)
+    for dimension in TITAN_V2_DIMENSIONS:
+        embedder = build_embedding_function(dimension)
+        vectors = _embed_corpus(embedder, docs)
+        corpus = [(doc_id, doc.page_content, vector) for doc, doc_id, vector in zip(docs, doc_ids, vectors)]
+        queries = [(embedder.embed_query(text), ids) for text, ids in zip(query_texts, expected)]
+        settings = replace(INDEX_SETTINGS, dimension=dimension)
+        _print_row(settings, _evaluate(client, settings, corpus, queries, args.k))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,79 +1,32 @@
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+import argparse
+import sys
+from pathlib import Path
 
-from common.config import vectorstore
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
 
-
-def _article_ids(start: int, end: int) -> List[str]:
-    return [str(i) for i in range(start, end + 1)]
-
-
-def _build_query(
-    *,
-    act_field: str,
-    article_field: str,
-    act_value: str,
-    article_ids: List[str],
-) -> Dict:
-    return {
-        "size": 5000,
-        "query": {
-            "bool": {
-                "filter": [
-                    {"term": {act_field: act_value}},
-                    {"terms": {article_field: article_ids}},
-                ]
-            }
-        },
-    }
+from core.provisions import ProvisionIndexError, get_provisions
 
 
 def main() -> None:
-    start = 1
-    end = 40
-    article_ids = _article_ids(start, end)
-    article_ids_lower = [value.lower() for value in article_ids]
-
-    index_name = vectorstore.index_name
-    queries: List[Tuple[str, Dict]] = [
-        (
-            "keyword_fields",
-            _build_query(
-                act_field="metadata.act_abbrev.keyword",
-                article_field="metadata.article_id.keyword",
-                act_value="COI",
-                article_ids=article_ids,
-            ),
-        ),
-        (
-            "text_fields",
-            _build_query(
-                act_field="metadata.act_abbrev",
-                article_field="metadata.article_id",
-                act_value="coi",
-                article_ids=article_ids_lower,
-            ),
-        ),
-    ]
-
-    hits: List[Dict] = []
-    strategy = ""
-    for label, query in queries:
-        response = vectorstore.client.search(index=index_name, body=query)
-        hits = response.get("hits", {}).get("hits", [])
-        if hits:
-            strategy = label
-            break
-
-    print(f"Found {len(hits)} hits for COI articles {start}-{end} using {strategy or 'no match'}.")
-
-    for hit in hits:
-        metadata = hit.get("_source", {}).get("metadata", {})
-        citation = metadata.get("citation")
-        article_id = metadata.get("article_id")
-        title = metadata.get("title")
-        print(f"{article_id}: {citation} - {title}")
+    parser = argparse.ArgumentParser(description="List provisions of an act by number range.")
+    parser.add_argument("--act", default="COI", help="Act abbreviation, e.g. COI, IPC, CrPC.")
+    parser.add_argument("--start", type=int, default=1)
+    parser.add_argument("--end", type=int, default=40)
+    args = parser.parse_args()
+
+    try:
+        provisions = get_provisions(args.act, args.start, args.end)
+    except ProvisionIndexError as exc:
+        raise SystemExit(str(exc))
+    print(f"Found {len(provisions)} provisions for {args.act} {args.start}-{args.end}.")
+
+    for doc in provisions:
+        metadata = doc.metadata
+        provision_id = metadata.get("article_id") or metadata.get("section_id")
+        print(f"{provision_id}: {metadata.get('citation')} - {metadata.get('title')}")
 
 
 if __name__ == "__main__":
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from common.config import vectorstore
+from common.config import get_vectorstore
+from core.index_schema import VECTOR_FIELD
 
 
 def main() -> None:
+    vectorstore = get_vectorstore()
     index_name = vectorstore.index_name
     client = vectorstore.client
 
@@ -22,7 +24,11 @@ def main() -> None:
         print(f"Mapping fetch failed: {exc}")
 
     try:
-        sample = client.search(index=index_name, body={"size": 3, "query": {"match_all": {}}})
+        sample = client.search(index=index_name, body={
+                "size": 3,
+                "_source": {"excludes": [VECTOR_FIELD]},
+                "query": {"match_all": {}},
+            })
         hits = sample.get("hits", {}).get("hits", [])
         print("Sample docs:")
         for hit in hits:
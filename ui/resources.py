@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+from common.resources import ResourceRegistry
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Lives in an imported module, so it survives Streamlit reruns of main.py.
+RESOURCES = ResourceRegistry()
+
+
+def _vectorstore():
+    from common.config import get_vectorstore
+    from core.index_schema import INDEX_SETTINGS, check_index_dimension
+
+    vectorstore = get_vectorstore()
+    check_index_dimension(vectorstore.client, vectorstore.index_name, INDEX_SETTINGS.dimension)
+    return vectorstore
+
+
+def _chat_store():
+    from common.chat_store import ChatStore
+
+    return ChatStore(ROOT / "data" / "chat_memory.db")
+
+
+def _answer_llm():
+    from core.llm import get_answer_llm
+
+    return get_answer_llm()
+
+
+def _parsers() -> dict[str, Any]:
+    from langchain_core.output_parsers import PydanticOutputParser
+
+    from core.schema import ExpandedQuery, FinalAnswer
+
+    return {
+        "query": PydanticOutputParser(pydantic_object=ExpandedQuery),
+        "answer": PydanticOutputParser(pydantic_object=FinalAnswer),
+    }
+
+
+def _citation_graph():
+    from core.citations import CitationGraph, default_graph_path
+
+    # Written by the index job (or scripts/build_citation_graph.py); without
+    # it retrieval simply skips neighbour expansion.
+    path = default_graph_path(ROOT)
+    return CitationGraph.load(path) if path.exists() else None
+
+
+def _citation_graph_version() -> int | None:
+    from core.citations import default_graph_path
+
+    # Reload (and rebuild the chain) when an index switch or rollback
+    # replaces the file.
+    try:
+        return default_graph_path(ROOT).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _memory_embeddings():
+    from common.config import MEMORY_EMBEDDING_DIMENSION, MEMORY_MODE
+
+    if MEMORY_MODE != "relevant":
+        return None
+    from common.aws_setup import build_embedding_function
+
+    return build_embedding_function(MEMORY_EMBEDDING_DIMENSION)
+
+
+def _act_options() -> list[tuple[str, str]]:
+    from core.acts import get_act_options
+
+    return get_act_options(ROOT)
+
+
+def _jobs():
+    from core.jobs import JobManager
+
+    return JobManager()
+
+
+def register_app_resources(registry: ResourceRegistry = RESOURCES) -> None:
+    # Resources built from other resources read them from `registry`, so a
+    # registry with overrides (offline runs, benchmarks, tests) is used throughout.
+
+    def provisions():
+        from core.index_versions import get_active_index
+        from core.provisions import ProvisionStore
+
+        vectorstore = registry.get("vectorstore")
+        return ProvisionStore(
+            vectorstore,
+            index_version=lambda: get_active_index(vectorstore.client, vectorstore.index_name),
+        )
+
+    def citation_graph():
+        # Neighbours are fetched by keyword lookups, which need the managed
+        # mapping; on an older index (like the adopted legacy one) skip them.
+        if not registry.get("provisions").available():
+            return None
+        return _citation_graph()
+
+    def chain():
+        from core.chain import build_chain
+
+        parsers = registry.get("parsers")
+        return build_chain(
+            answer_llm=registry.get("answer_llm"),
+            vectorstore=registry.get("vectorstore"),
+            answer_parser=parsers["answer"],
+            query_parser=parsers["query"],
+            citation_graph=registry.get("citation_graph"),
+            provision_lookup=registry.get("provisions").get_provisions_by_id,
+        )
+
+    def conversation():
+        from common.config import MEMORY_MODE, MEMORY_TOKEN_BUDGET
+        from core.conversation import ConversationService
+
+        return ConversationService(
+            registry.get("chain"),
+            registry.get("chat_store"),
+            memory_mode=MEMORY_MODE,
+            memory_embeddings=registry.get("memory_embeddings"),
+            memory_token_budget=MEMORY_TOKEN_BUDGET,
+        )
+
+    registry.register("vectorstore", _vectorstore)
+    registry.register("chat_store", _chat_store, close=lambda store: store.close())
+    registry.register("answer_llm", _answer_llm)
+    registry.register("parsers", _parsers)
+    registry.register("provisions", provisions, depends_on=("vectorstore",))
+    registry.register(
+        "citation_graph",
+        citation_graph,
+        depends_on=("provisions",),
+        version=_citation_graph_version,
+    )
+    registry.register(
+        "chain",
+        chain,
+        depends_on=("answer_llm", "vectorstore", "parsers", "citation_graph", "provisions"),
+    )
+    registry.register("memory_embeddings", _memory_embeddings)
+    registry.register("act_options", _act_options)
+    registry.register(
+        "conversation",
+        conversation,
+        depends_on=("chain", "chat_store", "memory_embeddings"),
+    )
+    # In-flight generations hold references to the old conversation, so the
+    # pool is not tied to it; shutting down only stops new work being queued.
+    registry.register("jobs", _jobs, close=lambda jobs: jobs.shutdown(wait=False))
+
+
+def register_offline_resources(
+    registry: ResourceRegistry = RESOURCES,
+    *,
+    token_latency: float = 0.0,
+) -> None:
+    """Swap the AWS-backed resources for the local fakes in core/fakes.py.
+
+    The vector store is seeded from the corpus on disk; the chain, parsers and
+    chat store are the same ones the app builds.
+    """
+
+    def vectorstore():
+        from core.fakes import FakeVectorStore
+        from core.indexer import build_all_documents
+
+        store = FakeVectorStore()
+        store.add_documents(build_all_documents(ROOT))
+        return store
+
+    def answer_llm():
+        from core.fakes import FakeChatModel
+
+        return FakeChatModel(token_latency=token_latency)
+
+    def provisions():
+        from core.provisions import LocalProvisionStore
+
+        return LocalProvisionStore([doc for doc, _ in registry.get("vectorstore").docs.values()])
+
+    def citation_graph():
+        from core.citations import CitationGraph
+
+        return CitationGraph.from_documents(
+            (doc for doc, _ in registry.get("vectorstore").docs.values()),
+            ROOT,
+        )
+
+    def memory_embeddings():
+        from common.config import MEMORY_EMBEDDING_DIMENSION, MEMORY_MODE
+        from core.fakes import FakeEmbeddings
+
+        return FakeEmbeddings(MEMORY_EMBEDDING_DIMENSION) if MEMORY_MODE == "relevant" else None
+
+    registry.register("vectorstore", vectorstore)
+    registry.register("answer_llm", answer_llm)
+    registry.register("provisions", provisions, depends_on=("vectorstore",))
+    registry.register("citation_graph", citation_graph, depends_on=("vectorstore",))
+    registry.register("memory_embeddings", memory_embeddings)
+
+
+register_app_resources()
@@ -1,17 +1,91 @@
+from collections import OrderedDict
+from functools import partial
 from pathlib import Path
+import threading
 from uuid import uuid4
-from typing import Any
-import json
+from typing import Any, Callable
 import streamlit as st
 
 from common.chat_store import ChatStore
-from core.acts import get_act_sources, get_constitution_source
-from core.memory import build_running_summary, compose_memory_context
+from core.acts import get_act_options
+from core.conversation import ConversationService, auto_title
+from core.jobs import GenerationJob, JobManager
+
+HISTORY_PAGE_SIZE = 20
+POLL_SECONDS = 0.15
+
+# Reruns confined to a fragment only repaint that fragment (Streamlit >= 1.37);
+# older versions fall back to plain functions and full reruns.
+_fragment = getattr(st, "fragment", None) or (lambda func: func)
+
+
+class MessageCache:
+    """Process-wide LRU of per-message data keyed by (database, message id).
+
+    Stored messages never change, so their markdown and sources can be shared
+    by every session and kept across reruns. Message ids are only unique
+    within one database, hence the database in the key.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[Path, int], Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(
+        self,
+        db_path: Path,
+        message_ids: list[int],
+        loader: Callable[[list[int]], dict[int, Any]],
+    ) -> dict[int, Any]:
+        found: dict[int, Any] = {}
+        with self._lock:
+            for message_id in message_ids:
+                key = (db_path, message_id)
+                if key in self._entries:
+                    found[message_id] = self._entries[key]
+                    self._entries.move_to_end(key)
+        missing = [message_id for message_id in message_ids if message_id not in found]
+        if missing:
+            loaded = loader(missing)
+            found.update(loaded)
+            with self._lock:
+                self._entries.update(((db_path, message_id), value) for message_id, value in loaded.items())
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return found
+
+
+MARKDOWN_CACHE = MessageCache(max_entries=5000)
+SOURCES_CACHE = MessageCache(max_entries=500)
+
 
 class LegalAdvisorUI:
-    def __init__(self, chain, chat_store: ChatStore):
+    def __init__(
+        self,
+        chain,
+        chat_store: ChatStore,
+        *,
+        jobs: JobManager,
+        memory_mode: str = "window",
+        memory_embeddings=None,
+        memory_token_budget: int = 600,
+        act_options: list[tuple[str, str]] | None = None,
+        conversation: ConversationService | None = None,
+    ):
         self.chain = chain
         self.chat_store = chat_store
+        self.conversation = conversation or ConversationService(
+            chain,
+            chat_store,
+            memory_mode=memory_mode,
+            memory_embeddings=memory_embeddings,
+            memory_token_budget=memory_token_budget,
+        )
+        # Must outlive the UI object, which is rebuilt on every rerun; the app
+        # passes the registry's pool (ui/resources.py).
+        self.jobs = jobs
+        self.act_options = act_options
 
     @staticmethod
     def _ensure_state():
@@ -28,6 +102,100 @@ class LegalAdvisorUI:
         if "thread_search" not in st.session_state:
             st.session_state.thread_search = ""
 
+        if "history_limits" not in st.session_state:
+            st.session_state.history_limits = {}
+
+    def _render_export(self, user_id: str, active_thread: dict[str, Any]) -> None:
+        # Building an export reads every message, so it is built once per click
+        # and kept in the session until downloaded; reruns reuse the payload.
+        thread_id = active_thread["thread_id"]
+        file_title = (active_thread["title"] or "thread").strip().replace(" ", "_")[:40]
+        export_col, export_all_col = st.columns(2)
+        with export_col:
+            if st.button("Export Chat", use_container_width=True):
+                st.session_state.export_request = ("thread", thread_id)
+                st.session_state.pop("export_payload", None)
+        with export_all_col:
+            if st.button("Export All", use_container_width=True):
+                st.session_state.export_request = ("all", user_id)
+                st.session_state.pop("export_payload", None)
+
+        request = st.session_state.get("export_request")
+        if request == ("thread", thread_id):
+            export = partial(self.chat_store.iter_thread_export, user_id, thread_id)
+            file_name = f"{file_title}_{thread_id[:8]}.ndjson"
+        elif request == ("all", user_id):
+            export = partial(self.chat_store.iter_user_export, user_id)
+            file_name = "all_chats.ndjson"
+        else:
+            return
+        cached = st.session_state.get("export_payload")
+        if cached is None or cached[0] != request:
+            cached = (request, "".join(export()))
+            st.session_state.export_payload = cached
+        data = cached[1]
+
+        def clear_export() -> None:
+            st.session_state.pop("export_request", None)
+            st.session_state.pop("export_payload", None)
+
+        st.download_button(
+            "Download (NDJSON)",
+            data=data,
+            file_name=file_name,
+            mime="application/x-ndjson",
+            use_container_width=True,
+            on_click=clear_export,
+        )
+
+    @staticmethod
+    def _load_older(thread_id: str, limit: int) -> None:
+        st.session_state.history_limits[thread_id] = limit + HISTORY_PAGE_SIZE
+
+    def _render_history(self, thread_id: str) -> None:
+        # Only a window of recent messages is painted; text comes from the
+        # per-message cache, so a rerun reads just ids and roles from SQLite.
+        limit = st.session_state.history_limits.get(thread_id, HISTORY_PAGE_SIZE)
+        stats = self.chat_store.get_thread_stats(thread_id)
+        messages = self.chat_store.get_recent_messages(thread_id, limit=limit, with_content=False)
+        markdown = MARKDOWN_CACHE.get_many(
+            self.chat_store.db_path,
+            [message["message_id"] for message in messages],
+            self.chat_store.get_message_contents,
+        )
+
+        hidden = stats["message_count"] - len(messages)
+        if hidden > 0:
+            st.button(
+                f"Load earlier messages ({hidden} more)",
+                key=f"load_earlier_{thread_id}",
+                use_container_width=True,
+                on_click=self._load_older,
+                args=(thread_id, limit),
+            )
+
+        for message in messages:
+            with st.chat_message(message["role"]):
+                st.markdown(markdown.get(message["message_id"], ""))
+                if message["source_count"]:
+                    self._render_stored_sources(message["message_id"], message["source_count"])
+
+    @_fragment
+    def _render_stored_sources(self, message_id: int, source_count: int) -> None:
+        # A placeholder toggle until opened; as a fragment, opening or sorting
+        # one panel repaints only that panel.
+        show = st.toggle(
+            f"📚 Show sources ({source_count})",
+            key=f"show_sources_{message_id}",
+        )
+        if show:
+            sources = SOURCES_CACHE.get_many(
+                self.chat_store.db_path,
+                [message_id],
+                self.chat_store.get_message_sources,
+            )
+            self._render_sources(sources.get(message_id, []), key_prefix=f"hist_{message_id}", expanded=True)
+
     def _ensure_default_thread(self, user_id: str) -> str:
         threads = self.chat_store.list_threads(user_id=user_id)
         if not threads:
@@ -48,20 +216,7 @@ class LegalAdvisorUI:
         return metadata, content
 
     @staticmethod
-    def _serialize_sources(sources: list[Any]) -> list[dict[str, Any]]:
-        serialized = []
-        for source in sources:
-            metadata, content = LegalAdvisorUI._extract_source(source)
-            serialized.append(
-                {
-                    "metadata": metadata,
-                    "page_content": content,
-                }
-            )
-        return serialized
-
-    @staticmethod
-    def _render_sources(sources, key_prefix: str):
+    def _render_sources(sources, key_prefix: str, *, expanded: bool = False):
         if not sources:
             return
 
@@ -76,7 +231,7 @@ class LegalAdvisorUI:
                 return compact
             return compact[:limit].rstrip() + "…"
 
-        with st.expander(f"📚 Sources ({len(sources)} retrieved)", expanded=False):
+        with st.expander(f"📚 Sources ({len(sources)} retrieved)", expanded=expanded):
             acts = sorted({s["metadata"].get("act_abbrev") or "N/A" for s in normalized_sources})
             col1, col2, col3 = st.columns(3)
             col1.metric("Retrieved", len(normalized_sources))
@@ -109,9 +264,16 @@ class LegalAdvisorUI:
             else:
                 ordered_sources = list(normalized_sources)
 
-            overview_tab, detailed_tab = st.tabs(["Quick View", "Detailed View"])
+            # Unlike tabs, only the selected view is built.
+            view = st.radio(
+                "Source view",
+                ["Quick View", "Detailed View"],
+                horizontal=True,
+                key=f"{key_prefix}_source_view",
+                label_visibility="collapsed",
+            )
 
-            with overview_tab:
+            if view == "Quick View":
                 for idx, source in enumerate(ordered_sources, 1):
                     metadata, content = source["metadata"], source["page_content"]
                     citation = metadata.get("citation", "Unknown source")
@@ -133,8 +295,7 @@ class LegalAdvisorUI:
                         if metadata_line:
                             st.caption(metadata_line)
                         st.write(preview_text(content))
-
-            with detailed_tab:
+            else:
                 for idx, source in enumerate(ordered_sources, 1):
                     metadata, content = source["metadata"], source["page_content"]
                     citation = metadata.get("citation", "Unknown source")
@@ -169,11 +330,7 @@ class LegalAdvisorUI:
         if not st.session_state.active_thread_id:
             st.session_state.active_thread_id = self._ensure_default_thread(user_id)
 
-        root = Path(__file__).resolve().parents[1]
-        act_sources = [get_constitution_source(root)] + get_act_sources(root)
-        options = [("All", "All Acts")]
-        for act in act_sources:
-            options.append((act.act_abbrev, f"{act.act_abbrev} - {act.act}"))
+        options = self.act_options or get_act_options(Path(__file__).resolve().parents[1])
 
         with st.sidebar:
             st.subheader("Settings")
@@ -186,13 +343,17 @@ class LegalAdvisorUI:
             st.text_input(
                 "Search threads",
                 key="thread_search",
-                placeholder="Type to filter by title",
+                placeholder="Search titles and messages",
             )
 
-            all_threads = self.chat_store.list_threads(
-                user_id=user_id,
-                search=st.session_state.thread_search,
-            )
+            generating = {job.thread_id for job in self.jobs.active()}
+            if st.session_state.thread_search.strip():
+                all_threads = self.chat_store.search_threads(
+                    user_id=user_id,
+                    text=st.session_state.thread_search,
+                )
+            else:
+                all_threads = self.chat_store.list_threads(user_id=user_id)
 
             if st.button("New Thread", use_container_width=True):
                 new_thread_id = str(uuid4())
@@ -213,7 +374,9 @@ class LegalAdvisorUI:
                     index=current_ids.index(st.session_state.active_thread_id),
                     format_func=lambda thread_id: next(
                         (
-                            ("📌 " if thread.get("pinned") else "") + thread["title"]
+                            ("⏳ " if thread["thread_id"] in generating else "")
+                            + ("📌 " if thread.get("pinned") else "")
+                            + thread["title"]
                             for thread in all_threads
                             if thread["thread_id"] == thread_id
                         ),
@@ -222,6 +385,13 @@ class LegalAdvisorUI:
                     key="thread_selector",
                 )
 
+                selected_match = next(
+                    (thread for thread in all_threads if thread["thread_id"] == selected_thread_id),
+                    {},
+                )
+                if selected_match.get("snippet"):
+                    st.caption(selected_match["snippet"])
+
                 if selected_thread_id != st.session_state.active_thread_id:
                     st.session_state.active_thread_id = selected_thread_id
                     st.rerun()
@@ -286,100 +456,56 @@ class LegalAdvisorUI:
                             st.session_state.active_thread_id = self._ensure_default_thread(user_id)
                             st.rerun()
 
-                    export_payload = self.chat_store.export_thread(
-                        user_id=user_id,
-                        thread_id=active_thread["thread_id"],
-                    )
-                    if export_payload:
-                        file_title = (active_thread["title"] or "thread").strip().replace(" ", "_")[:40]
-                        st.download_button(
-                            "Export Chat (JSON)",
-                            data=json.dumps(export_payload, ensure_ascii=False, indent=2),
-                            file_name=f"{file_title}_{active_thread['thread_id'][:8]}.json",
-                            mime="application/json",
-                            use_container_width=True,
-                        )
+                    self._render_export(user_id, active_thread)
 
         active_thread_id = st.session_state.active_thread_id
         active_thread = self.chat_store.get_thread(user_id=user_id, thread_id=active_thread_id)
         act_abbrev = active_thread.get("scope_act") if active_thread else "All"
-        messages = self.chat_store.get_messages(active_thread_id)
 
-        for index, message in enumerate(messages):
-            with st.chat_message(message["role"]):
-                st.markdown(message["content"])
-                if message.get("sources"):
-                    self._render_sources(message["sources"], key_prefix=f"hist_{index}")
+        finished = self.jobs.pop_finished(active_thread_id)
+        job = self.jobs.get(active_thread_id)
+        self._render_history(active_thread_id)
+        if finished is not None and finished.status == "failed":
+            st.error(f"The last answer could not be generated: {finished.error}")
 
         query = st.chat_input("Ask a legal question")
         if not query:
+            if job is not None:
+                self._attach_job(job)
             return
 
-        active_thread = self.chat_store.get_thread(user_id=user_id, thread_id=active_thread_id)
-        if active_thread and active_thread["title"] == "New Chat":
-            auto_title = " ".join(query.split())[:60].strip() or "New Chat"
-            self.chat_store.rename_thread(
-                user_id=user_id,
-                thread_id=active_thread_id,
-                title=auto_title,
-            )
-
-        self.chat_store.add_message(
-            thread_id=active_thread_id,
-            role="user",
-            content=query,
-            sources=[],
-        )
+        if job is not None:
+            st.warning("Still answering the previous question in this thread.")
+            self._attach_job(job)
+            return
 
-        messages = self.chat_store.get_messages(active_thread_id)
-        summary = self.chat_store.get_summary(active_thread_id)
-        memory_context = compose_memory_context(
-            summary=summary,
-            messages=messages,
-            recent_messages=8,
+        title = None
+        if active_thread and active_thread["title"] == "New Chat":
+            title = auto_title(query)
+
+        # The turn runs on the job manager's worker pool, so a rerun (e.g. a
+        # sidebar click) no longer aborts it; the next run attaches to it.
+        self.jobs.submit(
+            active_thread_id,
+            query,
+            lambda: self.conversation.stream_turn(active_thread_id, query, act=act_abbrev, title=title),
         )
+        st.rerun()
 
+    def _attach_job(self, job: GenerationJob) -> None:
+        # Polls rather than blocks on the stream: any widget interaction stops
+        # this script run, but the job keeps going on its worker.
         with st.chat_message("user"):
-            st.markdown(query)
+            st.markdown(job.query)
 
         with st.chat_message("assistant"):
             placeholder = st.empty()
-            answer_text = ""
-            sources = []
-
             with st.spinner("Analyzing relevant provisions…"):
-                for event in self.chain.stream(
-                    {
-                        "query": query,
-                        "act": act_abbrev,
-                        "chat_history": memory_context,
-                    }
-                ):
-                    event_type = event.get("type")
-                    if event_type == "token":
-                        answer_text += event.get("content", "")
-                        placeholder.markdown(answer_text + "▌")
-                    elif event_type == "done":
-                        answer_text = event.get("content", answer_text)
-                        sources = event.get("sources", [])
-
-            placeholder.markdown(answer_text)
-            if sources:
-                self._render_sources(sources, key_prefix=f"current_{active_thread_id}")
-
-        serialized_sources = self._serialize_sources(sources)
-        self.chat_store.add_message(
-            thread_id=active_thread_id,
-            role="assistant",
-            content=answer_text,
-            sources=serialized_sources,
-        )
-
-        updated_messages = self.chat_store.get_messages(active_thread_id)
-        if len(updated_messages) > 8:
-            archived_messages = updated_messages[:-8]
-            new_summary = build_running_summary(summary, archived_messages)
-            self.chat_store.set_summary(active_thread_id, new_summary)
+                while not job.wait(timeout=POLL_SECONDS):
+                    if job.text:
+                        placeholder.markdown(job.text + "▌")
+            placeholder.markdown(job.text)
 
+        # The turn is persisted by now; rerun so history shows it with sources.
         st.rerun()
 